@@ -0,0 +1,266 @@
+"""
+批量渲染命令行：不需要图形界面，把一批绘图脚本分发到多个进程，渲染为 PNG/SVG
+
+用法示例：
+    python -m src.batch scripts/ -o out/ -j 8 --format png svg --summary out/summary.json
+    python -m src.batch "scripts/**/*.txt" -o out/
+    python -m src.batch scripts/ -o out/ --profile  # 摘要中记录每个脚本各阶段的耗时与计数器
+    generate_script | python -m src.batch - -o out/  # 从标准输入读入脚本，输出 out/stdin.png
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")  # 非交互式后端：在导入 pyplot 之前指定，不需要显示器
+from matplotlib.figure import Figure
+
+from src.semantics.Interpreter import Interpreter
+from src.semantics.Profiler import Profiler
+from src.semantics.SemanticContext import Context
+
+# 画布设置与图形界面（main.py）保持一致
+FIGURE_SIZE = (8, 6)
+FIGURE_DPI = 100
+DEFAULT_LIMITS = (-400, 400, -300, 300)
+AXIS_MARGIN = 50
+
+SUPPORTED_FORMATS = ("png", "svg")
+STDIN_SCRIPT = "-"  # 输入为 - 时从标准输入读入脚本（只能在主进程中处理）
+
+
+def collect_scripts(inputs: list[str], pattern: str = "*.txt") -> list[str]:
+    """展开输入：目录递归查找 pattern 匹配的脚本，其余按文件路径或通配符处理（去重并保持顺序）；- 表示标准输入"""
+    scripts = []
+    for item in inputs:
+        if item == STDIN_SCRIPT:
+            matches = [item]
+        elif os.path.isdir(item):
+            matches = sorted(glob.glob(os.path.join(item, "**", pattern), recursive=True))
+        elif glob.has_magic(item):
+            matches = sorted(glob.glob(item, recursive=True))
+        else:
+            matches = [item]
+        scripts.extend(path for path in matches if not os.path.isdir(path))
+    return list(dict.fromkeys(path if path == STDIN_SCRIPT else os.path.abspath(path) for path in scripts))
+
+def output_stem(script: str, root: str, output_dir: str) -> str:
+    """输出文件路径（不含扩展名）：保留脚本相对公共根目录的子目录结构，避免同名脚本互相覆盖；标准输入输出为 stdin"""
+    if script == STDIN_SCRIPT:
+        return os.path.join(output_dir, "stdin")
+    relative = os.path.relpath(os.path.splitext(script)[0], root)
+    return os.path.join(output_dir, relative)
+
+def new_axes() -> tuple[Figure, "matplotlib.axes.Axes"]:
+    """创建与图形界面相同设置的画布（不经过 pyplot，不注册到全局图形管理器）"""
+    fig = Figure(figsize=FIGURE_SIZE, dpi=FIGURE_DPI)
+    ax = fig.add_subplot()
+    x_min, x_max, y_min, y_max = DEFAULT_LIMITS
+    ax.set_xlim(x_min, x_max)
+    ax.set_ylim(y_min, y_max)
+    ax.set_aspect("equal")
+    ax.grid(True, alpha=0.3)
+    return fig, ax
+
+def set_axes_range(ax, ctx: Context) -> None:
+    """按执行后的坐标范围设置坐标轴并留出边距（同 main.py 的 set_axes_range）"""
+    axis_range = ctx.AxisRange
+    if axis_range["x_min"] is None:
+        return
+    ax.set_xlim(axis_range["x_min"] - AXIS_MARGIN, axis_range["x_max"] + AXIS_MARGIN)
+    ax.set_ylim(axis_range["y_min"] - AXIS_MARGIN, axis_range["y_max"] + AXIS_MARGIN)
+
+def render_script(job: tuple) -> dict:
+    """
+    工作进程：编译、执行并保存一个脚本，返回该脚本的结果记录
+    出错时记录出错阶段（compile / execute / render）与错误信息，不影响其他脚本
+    profile 为真时记录中附带剖析结果（见 Profiler.report），保存图片的耗时记为 savefig 阶段
+    """
+    script, stem, formats, options, cache, profile = job
+    record = {"script": script, "status": "ok", "outputs": [], "statements": 0,
+              "compile_time": 0.0, "execute_time": 0.0, "render_time": 0.0}
+    profiler = Profiler() if profile else None
+    stage = "compile"
+    start = time.perf_counter()
+    try:
+        interpreter = Interpreter(options, cache)
+        if script == STDIN_SCRIPT:
+            program = interpreter.compile_stream(sys.stdin.buffer, profiler)
+        else:
+            program = interpreter.compile(script, profiler)
+        record["statements"] = len(program)
+        record["compile_time"] = time.perf_counter() - start
+
+        stage = "execute"
+        mark = time.perf_counter()
+        fig, ax = new_axes()
+        ctx = interpreter.execute(program, ax, interpreter.new_context(profiler))
+        set_axes_range(ax, ctx)
+        record["execute_time"] = time.perf_counter() - mark
+
+        stage = "render"
+        mark = time.perf_counter()
+        os.makedirs(os.path.dirname(stem) or ".", exist_ok=True)
+        for fmt in formats:
+            path = f"{stem}.{fmt}"
+            if profiler is not None:
+                with profiler.phase("savefig"):
+                    fig.savefig(path, format=fmt)
+            else:
+                fig.savefig(path, format=fmt)
+            record["outputs"].append(path)
+        record["render_time"] = time.perf_counter() - mark
+    except Exception as e:
+        record["status"] = "error"
+        record["stage"] = stage
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["total_time"] = time.perf_counter() - start
+    if profiler is not None:
+        record["profile"] = profiler.report()
+    return record
+
+def run_batch(scripts: list[str], output_dir: str, formats=("png",), workers: int = None,
+              options: dict = None, cache: bool = False, profile: bool = False) -> dict:
+    """
+    批量渲染入口：按 workers 个进程并行处理（workers 为 1 或包含标准输入时在当前进程中顺序执行）
+    options：执行选项（见 SemanticContext.Options）；cache：使用磁盘程序缓存；profile：每条记录附带剖析结果
+    返回汇总信息（每个脚本一条记录，顺序与 scripts 相同）
+    """
+    workers = workers or os.cpu_count() or 1
+    options = options or {}
+    sequential = workers == 1 or len(scripts) <= 1 or STDIN_SCRIPT in scripts
+    job_options = options
+    if not sequential and "split_threshold" not in options and "workers" not in options:
+        # 脚本之间已按进程并行：调用方未明确要求时，工作进程里不再为单条大语句按 CPU 核数另开进程池
+        # （否则进程总数为 workers × CPU 核数）
+        job_options = dict(options, split_threshold=None)
+    files = [os.path.dirname(path) for path in scripts if path != STDIN_SCRIPT]
+    root = os.path.commonpath(files) if files else ""
+    jobs = [(script, output_stem(script, root, output_dir), tuple(formats), job_options, cache, profile)
+            for script in scripts]
+
+    start = time.perf_counter()
+    if sequential:
+        records = [render_script(job) for job in jobs]
+    else:
+        # 每个进程一次领取一批任务，脚本数量很多时减少进程间通信
+        chunk_size = max(1, len(jobs) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            records = list(pool.map(render_script, jobs, chunksize=chunk_size))
+    wall_time = time.perf_counter() - start
+
+    failed = sum(record["status"] != "ok" for record in records)
+    return {
+        "total": len(records),
+        "succeeded": len(records) - failed,
+        "failed": failed,
+        "workers": workers,
+        "formats": list(formats),
+        "options": options,
+        "cache": cache,
+        "wall_time": wall_time,
+        "cpu_time": sum(record["total_time"] for record in records),
+        "files": records,
+    }
+
+def merge_profiles(records: list[dict]) -> dict:
+    """汇总各脚本的剖析结果：各阶段的耗时与次数、各计数器分别求和"""
+    phases = {}
+    counters = {}
+    for record in records:
+        profile = record.get("profile")
+        if profile is None:
+            continue
+        for name, phase in profile["phases"].items():
+            total = phases.setdefault(name, {"wall": 0.0, "cpu": 0.0, "calls": 0})
+            for key in total:
+                total[key] += phase[key]
+        for name, value in profile["counters"].items():
+            counters[name] = counters.get(name, 0) + value
+    return {"phases": phases, "counters": counters}
+
+def main(argv: list[str] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Render DrawLang scripts to image files without a display")
+    arg_parser.add_argument("inputs", nargs="+",
+                            help="script files, directories or glob patterns ('-' reads a script from stdin)")
+    arg_parser.add_argument("-o", "--output", default="output", help="output directory (default: output)")
+    arg_parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    arg_parser.add_argument("-f", "--format", nargs="+", choices=SUPPORTED_FORMATS, default=["png"],
+                            help="output format(s) (default: png)")
+    arg_parser.add_argument("--pattern", default="*.txt", help="file pattern used inside directories (default: *.txt)")
+    arg_parser.add_argument("--engine", choices=("tree", "compiled", "numpy"), default=None,
+                            help="expression evaluation engine")
+    arg_parser.add_argument("--lexer", choices=("dfa", "regex"), default=None,
+                            help="lexer engine (default: dfa; both produce the same tokens)")
+    arg_parser.add_argument("--chunk-size", type=int, default=None,
+                            help="generate FOR points in chunks of this size (bounded memory for huge ranges)")
+    arg_parser.add_argument("--sampling", choices=("fixed", "adaptive"), default=None,
+                            help="FOR sampling mode (adaptive: refine only where the curve bends, STEP is the finest spacing)")
+    arg_parser.add_argument("--tolerance", type=float, default=None,
+                            help="adaptive sampling tolerance in drawing units (default: 0.5)")
+    arg_parser.add_argument("--no-decimate", action="store_true",
+                            help="pass every point to matplotlib instead of thinning points that share a pixel")
+    arg_parser.add_argument("--no-deferred", action="store_true",
+                            help="plot each FOR statement immediately instead of one LineCollection per style")
+    arg_parser.add_argument("--statement-workers", type=int, default=None,
+                            help="compute the FOR statements of each script in this many processes (use with -j 1)")
+    arg_parser.add_argument("--split-threshold", type=int, default=None,
+                            help="split a single FOR statement across processes above this many points (0: never)")
+    arg_parser.add_argument("--cache", action="store_true", help="use the on-disk compiled program cache")
+    arg_parser.add_argument("--summary", default=None, help="JSON summary path (default: <output>/summary.json)")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="record per-phase wall/CPU time and counters for every script in the summary")
+    arg_parser.add_argument("-v", "--verbose", action="store_true", help="show the parser's and executor's debug log")
+    args = arg_parser.parse_args(argv)
+    # 工作进程（fork）继承这里的日志设置
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, format="%(message)s")
+
+    scripts = collect_scripts(args.inputs, args.pattern)
+    if not scripts:
+        print("No scripts found", file=sys.stderr)
+        return 2
+
+    options = {"decimate": not args.no_decimate, "deferred": not args.no_deferred}
+    if args.engine:
+        options["engine"] = args.engine
+    if args.lexer:
+        options["lexer"] = args.lexer
+    if args.chunk_size:
+        options["chunk_size"] = args.chunk_size
+    if args.sampling:
+        options["sampling"] = args.sampling
+    if args.tolerance is not None:
+        options["tolerance"] = args.tolerance
+    if args.statement_workers:
+        options["workers"] = args.statement_workers
+    if args.split_threshold is not None:
+        options["split_threshold"] = args.split_threshold or None
+
+    summary = run_batch(scripts, args.output, args.format, args.workers, options, args.cache, args.profile)
+    if args.profile:
+        summary["profile"] = merge_profiles(summary["files"])
+    summary_path = args.summary or os.path.join(args.output, "summary.json")
+    os.makedirs(os.path.dirname(summary_path) or ".", exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8") as file:
+        json.dump(summary, file, ensure_ascii=False, indent=2)
+
+    for record in summary["files"]:
+        if record["status"] != "ok":
+            print(f"[{record['stage']}] {record['script']}: {record['error']}", file=sys.stderr)
+    print(f"Rendered {summary['succeeded']}/{summary['total']} script(s) with {summary['workers']} worker(s) "
+          f"in {summary['wall_time']:.2f}s, summary: {summary_path}")
+    if args.profile:
+        print(f"{'phase':<14} {'wall (s)':>10} {'cpu (s)':>10} {'calls':>10}")
+        for name, phase in summary["profile"]["phases"].items():
+            print(f"{name:<14} {phase['wall']:10.4f} {phase['cpu']:10.4f} {phase['calls']:10d}")
+        print("counters: " + ", ".join(f"{name}={value}" for name, value in summary["profile"]["counters"].items()))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+批量静态检查命令行：只做词法、语法分析与静态语义检查（见 parser/Checker.py），不计算坐标点、不绘图，
+每个脚本报告全部错误的行号、列号；脚本分发到多个进程并行检查，适合在渲染前校验大批脚本
+
+用法示例：
+    python -m src.check scripts/ -j 8
+    python -m src.check "scripts/**/*.txt" --summary report.json
+    generate_script | python -m src.check -  # 检查标准输入中的脚本
+输出每条诊断一行（脚本:行:列: [类别] 信息）；有脚本未通过检查时退出码为 1
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.batch import STDIN_SCRIPT, collect_scripts
+from src.parser.Checker import check_program, check_program_stream
+
+
+def check_script(job: tuple) -> dict:
+    """
+    工作进程：检查一个脚本，返回该脚本的结果记录
+    status：ok（没有诊断）、invalid（有诊断）或 error（无法读取脚本，错误信息见 error）
+    """
+    script, options = job
+    record = {"script": script, "status": "ok", "diagnostics": []}
+    start = time.perf_counter()
+    try:
+        if script == STDIN_SCRIPT:
+            record["diagnostics"] = check_program_stream(sys.stdin.buffer, **options)
+        else:
+            record["diagnostics"] = check_program(script, **options)
+        if record["diagnostics"]:
+            record["status"] = "invalid"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["check_time"] = time.perf_counter() - start
+    return record
+
+def run_check(scripts: list[str], workers: int = None, options: dict = None) -> dict:
+    """
+    批量检查入口：按 workers 个进程并行检查（workers 为 1 或包含标准输入时在当前进程中顺序执行）
+    返回汇总信息（每个脚本一条记录，顺序与 scripts 相同）
+    """
+    workers = workers or os.cpu_count() or 1
+    options = options or {}
+    jobs = [(script, options) for script in scripts]
+
+    start = time.perf_counter()
+    if workers == 1 or len(jobs) <= 1 or STDIN_SCRIPT in scripts:
+        records = [check_script(job) for job in jobs]
+    else:
+        # 单个脚本的检查只需毫秒级，按较大的批次领取任务以减少进程间通信
+        chunk_size = max(1, len(jobs) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            records = list(pool.map(check_script, jobs, chunksize=chunk_size))
+    wall_time = time.perf_counter() - start
+
+    invalid = sum(record["status"] == "invalid" for record in records)
+    errors = sum(record["status"] == "error" for record in records)
+    return {
+        "total": len(records),
+        "valid": len(records) - invalid - errors,
+        "invalid": invalid,
+        "errors": errors,
+        "diagnostics": sum(len(record["diagnostics"]) for record in records),
+        "workers": workers,
+        "options": options,
+        "wall_time": wall_time,
+        "cpu_time": sum(record["check_time"] for record in records),
+        "files": records,
+    }
+
+def main(argv: list[str] = None) -> int:
+    arg_parser = argparse.ArgumentParser(
+        description="Validate DrawLang scripts (lexing, parsing and static checks only, no rendering)")
+    arg_parser.add_argument("inputs", nargs="+",
+                            help="script files, directories or glob patterns ('-' reads a script from stdin)")
+    arg_parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    arg_parser.add_argument("--pattern", default="*.txt", help="file pattern used inside directories (default: *.txt)")
+    arg_parser.add_argument("--lexer", choices=("dfa", "regex"), default=None,
+                            help="lexer engine (default: dfa; both produce the same tokens)")
+    arg_parser.add_argument("--summary", default=None, help="write the JSON summary with every diagnostic to this path")
+    arg_parser.add_argument("-q", "--quiet", action="store_true", help="only print the final counts")
+    arg_parser.add_argument("-v", "--verbose", action="store_true", help="show the checker's debug log")
+    args = arg_parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, format="%(message)s")
+
+    scripts = collect_scripts(args.inputs, args.pattern)
+    if not scripts:
+        print("No scripts found", file=sys.stderr)
+        return 2
+
+    options = {}
+    if args.lexer:
+        options["lexer"] = args.lexer
+
+    summary = run_check(scripts, args.workers, options)
+    if args.summary:
+        os.makedirs(os.path.dirname(args.summary) or ".", exist_ok=True)
+        with open(args.summary, "w", encoding="utf-8") as file:
+            json.dump(summary, file, ensure_ascii=False, indent=2)
+
+    if not args.quiet:
+        for record in summary["files"]:
+            if record["status"] == "error":
+                print(f"{record['script']}: {record['error']}", file=sys.stderr)
+            for diagnostic in record["diagnostics"]:
+                print(f"{record['script']}:{diagnostic['line']}:{diagnostic['column']}: "
+                      f"[{diagnostic['kind']}] {diagnostic['message']}")
+    print(f"Checked {summary['total']} script(s) with {summary['workers']} worker(s) in {summary['wall_time']:.2f}s: "
+          f"{summary['valid']} valid, {summary['invalid']} invalid ({summary['diagnostics']} diagnostic(s)), "
+          f"{summary['errors']} unreadable", file=sys.stderr)
+    return 0 if summary["valid"] == summary["total"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,15 @@
+import logging
+import queue
+import threading
+import time
 import tkinter as tk
-from tkinter import filedialog, Menu
-from src.parser.Parser import parse
-import src.semantics.SemanticContext as sc
+from tkinter import filedialog, Menu, ttk
+import numpy as np
+from src.parser.Parser import parse_program
+from src.semantics.Executor import execute
+from src.semantics.PointSink import QueueSink, ExecutionCancelled
+from src.semantics.Decimator import decimate_for_axes
+from src.semantics.SemanticContext import Context
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
@@ -9,12 +17,71 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 # mpl.rcParams['font.sans-serif'] = ['SimHei']  # Windows 中文支持
 # mpl.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
 
+logger = logging.getLogger(__name__)
+
+GUI_CHUNK_SIZE = 20_000  # 后台执行时流式生成坐标点的块大小（每块绘制一次，也是取消的响应粒度）
+QUEUE_SIZE = 64  # 坐标块队列容量：界面来不及绘制时后台线程等待，避免坐标块堆积占用内存
+POLL_INTERVAL = 50  # 界面轮询队列的间隔（毫秒）
+POLL_BUDGET = 0.04  # 每次轮询最多用于绘制的时间（秒），超出的坐标块留到下次轮询，保证界面及时响应
+
+
+class ScriptJob:
+    """
+    在后台线程中编译并执行一个脚本：坐标块经 QueueSink 放入队列，由界面主线程轮询取出绘制
+    执行结束时放入 ("done", 绘图上下文) 或 ("error", 错误信息)；取消后不再放入任何元素
+    """
+
+    def __init__(self, file_path: str, **options):
+        self.file_path = file_path
+        self.options = {"chunk_size": GUI_CHUNK_SIZE, **options}
+        self.queue = queue.Queue(QUEUE_SIZE)
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def cancel(self) -> None:
+        """请求取消：后台线程在下一个坐标块或下一条语句处停止"""
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def run(self) -> None:
+        """后台线程：编译 + 执行，不接触任何 Tk 或 Matplotlib 对象"""
+        sink = QueueSink(self.queue, self.cancel_event)
+        try:
+            try:
+                program = parse_program(self.file_path, **self.options)
+            except SyntaxError as e:
+                logger.error("Syntax parsing failed: %s", e)
+                sink.put(("error", f"Syntax parsing failed: {e}"))
+                return
+            sink.check_cancelled()
+
+            ctx = Context(self.options)
+            try:
+                execute(program, ctx, None, sinks=[sink], progress=sink.progress)
+            except ExecutionCancelled:
+                raise
+            except Exception as e:
+                logger.error("Execution failed: %s", e)
+                sink.put(("error", f"Execution failed: {e}"))
+                return
+            sink.put(("done", ctx))
+        except ExecutionCancelled:
+            logger.info("执行已取消")
+
 
 class FuncPlotInterpreter:
     def __init__(self, root: tk.Tk):
         self.root = root
         self.root.title("Function Plotting Language Interpreter")
         self.root.geometry("800x600")
+        self.context = Context()  # 绘图上下文（坐标变换、样式与坐标范围）
+        self.job: ScriptJob | None = None  # 正在后台执行的脚本
 
         # ---------------------------
         # 初始化 Matplotlib 绘图环境
@@ -30,11 +97,25 @@ class FuncPlotInterpreter:
         # 3. 将 Matplotlib Figure 嵌入 Tkinter 窗口
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.root)
         self.canvas.draw()  # 初始化绘制
+
+        # 4. 状态栏：执行进度与取消按钮（先于画布放置，窗口缩小时保持可见）
+        self.create_status_bar()
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
         # 创建菜单（保持原有交互逻辑）
         self.create_menu()
 
+    def create_status_bar(self) -> None:
+        """底部状态栏：进度条、状态文字与取消按钮"""
+        status_bar = tk.Frame(self.root)
+        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.progress_bar = ttk.Progressbar(status_bar, mode="determinate", length=200)
+        self.progress_bar.pack(side=tk.LEFT, padx=5, pady=2)
+        self.status_label = tk.Label(status_bar, text="就绪", anchor="w")
+        self.status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.cancel_button = tk.Button(status_bar, text="取消", command=self.cancel_script, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.RIGHT, padx=5, pady=2)
+
     def create_menu(self) -> None:
         """保持原有菜单逻辑，仅修改绘图调用对象"""
         menu_bar = Menu(self.root)
@@ -49,34 +130,104 @@ class FuncPlotInterpreter:
         # 编辑菜单
         edit_menu = Menu(menu_bar, tearoff=0)
         edit_menu.add_command(label="清空画布", command=self.clear_canvas)
+        edit_menu.add_command(label="取消执行", command=self.cancel_script)
         menu_bar.add_cascade(label="编辑", menu=edit_menu)
 
         self.root.config(menu=menu_bar)
 
     def load_script(self) -> None:
-        """加载脚本：调用 parse 时传递 Matplotlib Axes 对象（self.ax）"""
+        """加载脚本：在后台线程中编译执行，坐标块经队列传回主线程逐块绘制（界面在执行期间保持响应）"""
         file_path = filedialog.askopenfilename(
             title="选择绘图脚本",
             filetypes=[("Plot Script", "*.txt"), ("All Files", "*.*")]
         )
         if file_path:
-            print(f"\n加载脚本：{file_path}")
-            self.clear_canvas()  # 清空画布
-            parse(file_path, self.ax)  # 传递 Axes 对象给 Parser
-
-            # 更新坐标轴范围
-            self.set_axes_range(sc.AxisRange["x_min"], sc.AxisRange["x_max"], sc.AxisRange["y_min"], sc.AxisRange["y_max"])
+            logger.info("加载脚本：%s", file_path)
+            self.clear_canvas()  # 清空画布（同时取消正在执行的脚本）
+            self.job = ScriptJob(file_path)
+            self.job.start()
+            self.set_status(f"正在执行：{file_path}", running=True)
+            self.root.after(POLL_INTERVAL, self.poll_queue, self.job)
+
+    def cancel_script(self) -> None:
+        """取消正在后台执行的脚本（已绘制的曲线保留）"""
+        if self.job is None:
+            return
+        self.job.cancel()
+        self.job = None
+        self.set_status("已取消", running=False)
+
+    def poll_queue(self, job: ScriptJob) -> None:
+        """主线程定时轮询后台任务的队列：绘制坐标块、更新进度，任务结束后停止轮询"""
+        if job is not self.job:
+            return  # 任务已被取消或被新任务取代
+        deadline = time.perf_counter() + POLL_BUDGET
+        drawn = False
+        try:
+            while time.perf_counter() < deadline:
+                item = job.queue.get_nowait()
+                kind = item[0]
+                if kind == "points":
+                    self.draw_chunk(*item[1:])
+                    drawn = True
+                elif kind == "progress":
+                    done, total = item[1:]
+                    self.progress_bar.config(maximum=max(total, 1), value=done)
+                    self.status_label.config(text=f"正在执行：{done}/{total} 条语句")
+                else:
+                    self.finish_script(item)
+                    return
+        except queue.Empty:
+            pass
+        if drawn:
+            self.canvas.draw_idle()
+        self.root.after(POLL_INTERVAL, self.poll_queue, job)
+
+    def draw_chunk(self, xs: np.ndarray, ys: np.ndarray, style: dict, new_curve: bool) -> None:
+        """绘制一个坐标块：先按已绘制的点扩大坐标轴范围，再按像素分辨率抽稀"""
+        finite = np.isfinite(xs) & np.isfinite(ys)
+        if finite.any():
+            x_min, x_max = self.ax.get_xlim()
+            y_min, y_max = self.ax.get_ylim()
+            self.ax.set_xlim(min(x_min, xs[finite].min() - 50), max(x_max, xs[finite].max() + 50))
+            self.ax.set_ylim(min(y_min, ys[finite].min() - 50), max(y_max, ys[finite].max() + 50))
+        xs, ys = decimate_for_axes(self.ax, xs, ys)
+        self.ax.plot(xs, ys, color=style["color"], linewidth=style["line_width"], alpha=style.get("opacity", 1.0))
+
+    def finish_script(self, item: tuple) -> None:
+        """后台任务结束：成功时按最终坐标范围设置坐标轴，失败时在状态栏显示错误"""
+        self.job = None
+        if item[0] == "done":
+            self.context = item[1]
+            axis_range = self.context.AxisRange
+            if axis_range["x_min"] is not None:
+                self.set_axes_range(axis_range["x_min"], axis_range["x_max"], axis_range["y_min"], axis_range["y_max"])
+            else:
+                self.canvas.draw_idle()
+            self.progress_bar.config(value=self.progress_bar.cget("maximum"))
+            self.set_status("完成", running=False)
+        else:
+            self.canvas.draw_idle()  # 出错前的曲线保留
+            self.set_status(item[1], running=False)
+
+    def set_status(self, text: str, running: bool) -> None:
+        """更新状态文字；执行期间启用取消按钮"""
+        self.status_label.config(text=text)
+        self.cancel_button.config(state=tk.NORMAL if running else tk.DISABLED)
+        if running:
+            self.progress_bar.config(value=0)
 
     def clear_canvas(self) -> None:
-        """Matplotlib 清空画布：清除所有绘制元素"""
+        """Matplotlib 清空画布：清除所有绘制元素（正在执行的脚本一并取消）"""
+        self.cancel_script()
         self.ax.clear()  # 清除坐标轴上的曲线/点
         self.ax.set_xlim(-400, 400)
         self.ax.set_ylim(-300, 300)
         self.ax.set_aspect("equal")
         self.ax.grid(True, alpha=0.3)  # 重新显示网格
         self.canvas.draw()  # 刷新画布
-        sc.reset_context()
-        print("画布已清空")
+        self.context.reset()
+        logger.info("画布已清空")
 
     def set_axes_range(self, x_min: float, x_max: float, y_min: float, y_max: float) -> None:
         """
@@ -97,6 +248,8 @@ class FuncPlotInterpreter:
 
 
 if __name__ == "__main__":
+    # 默认只输出 INFO 及以上；解析与执行过程的调试输出需要 DEBUG 级别
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     root = tk.Tk()
     app = FuncPlotInterpreter(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,166 @@
+import logging
+from src.scanner.Lexer import Lexer
+from src.scanner.TokenType import TokenType
+from src.semantics.SemanticUtils import get_expr_value, check_loop_range
+from src.semantics.SemanticContext import make_options
+from src.parser.ExprNode import ExprNode
+from src.parser.Parser import Parser, new_lexer
+from src.parser.Program import Program, Statement, OriginStatement, ScaleStatement, RotStatement, ForStatement
+
+logger = logging.getLogger(__name__)
+
+# 诊断类别：词法错误（非法字符、未结束的注释）、语法错误、静态语义错误
+LEXICAL = "lexical"
+SYNTAX = "syntax"
+SEMANTIC = "semantic"
+
+# FOR 语句中记录位置的关键字：其后的表达式出错时报告表达式的起始位置
+LOOP_KEYWORDS = (TokenType.FROM, TokenType.TO, TokenType.STEP)
+
+
+def make_diagnostic(location: tuple[int, int], kind: str, message: str, statement: int) -> dict:
+    """一条诊断：行号、列号（从 1 开始）、类别、错误信息与所在语句的序号（从 0 开始）"""
+    line, column = location
+    return {"line": line, "column": column, "kind": kind, "message": message, "statement": statement}
+
+
+class Checker(Parser):
+    """
+    静态检查（只检查不执行）：词法分析 + 语法分析 + 不需要计算坐标点的语义检查，不求坐标、不绘图
+    出错时不中止：记录诊断后跳到下一个分号继续分析，一次报告脚本中的全部错误
+    语义检查与执行时相同：透明度、粗细的范围，ORIGIN / SCALE / ROT 与 FOR 循环参数的求值（除零、定义域错误），
+    以及步长必须为正、起始值不大于结束值（见 check_loop_range）
+    """
+
+    def __init__(self, lexer: Lexer, options: dict = None):
+        # 检查不执行程序，不需要表达式优化与公共子表达式消除
+        super().__init__(lexer, make_options(options, optimize=False, cse=False))
+        self.diagnostics: list[dict] = []
+        self.statement_index = 0  # 当前语句的序号
+        self.statement_location = (1, 1)  # 当前语句第一个记号的位置
+        self.marks: dict[TokenType, tuple[int, int]] = {}  # FROM / TO / STEP 之后的表达式的起始位置
+
+    def report(self, kind: str, message: str, location: tuple[int, int] = None) -> None:
+        """记录一条诊断（location 默认为当前记号的位置）"""
+        diagnostic = make_diagnostic(location or self.lexer.location(), kind, message, self.statement_index)
+        logger.debug("%d:%d: [%s] %s", diagnostic["line"], diagnostic["column"], kind, message)
+        self.diagnostics.append(diagnostic)
+
+    def check_value(self, check, *args) -> None:
+        """语义校验失败时记录诊断并继续分析；同一个记号只报告第一个错误（与编译时抛出的错误相同）"""
+        try:
+            check(*args)
+        except SyntaxError as e:
+            location = self.lexer.location()
+            last = self.diagnostics[-1] if self.diagnostics else None
+            if last is None or (last["line"], last["column"]) != location:
+                self.report(SEMANTIC, str(e), location)
+
+    def match_token(self, expected_type: TokenType) -> None:
+        super().match_token(expected_type)
+        if expected_type in LOOP_KEYWORDS:
+            self.marks[expected_type] = self.lexer.location()
+
+    def recover(self, error: SyntaxError) -> None:
+        """错误恢复：记录诊断，跳过出错的语句"""
+        kind = LEXICAL if self.current_token.type == TokenType.ERRTOKEN else SYNTAX
+        self.report(kind, str(error))
+        self.next_statement()
+
+    def next_statement(self) -> None:
+        """跳过记号直到分号（其间的非法字符不再报告），再取下一个语句的第一个记号"""
+        while True:
+            while self.current_token.type not in (TokenType.SEMICO, TokenType.NONTOKEN):
+                self.current_token = self.get_token()
+            if self.current_token.type == TokenType.NONTOKEN:
+                return
+            try:
+                self.fetch_token()
+                return
+            except SyntaxError as e:
+                # 分号后紧跟非法字符：下一个语句也要跳过
+                self.statement_index += 1
+                self.report(LEXICAL, str(e))
+
+    def evaluate(self, expr: ExprNode, location: tuple[int, int]) -> float | None:
+        """按执行时的方式求值（不含 T 的表达式，T 取 0），求值出错时记录诊断并返回 None"""
+        try:
+            return get_expr_value(expr)
+        except (ArithmeticError, ValueError) as e:
+            self.report(SEMANTIC, f"Semantic Error: {e}", location)
+            return None
+
+    def check_statement(self, stmt: Statement) -> None:
+        """执行前就能确定的语义错误：语句中只在执行开始时求值一次的表达式"""
+        location = self.statement_location
+        if isinstance(stmt, (OriginStatement, ScaleStatement)):
+            self.evaluate(stmt.x_expr, location)
+            self.evaluate(stmt.y_expr, location)
+        elif isinstance(stmt, RotStatement):
+            self.evaluate(stmt.angle_expr, location)
+        elif isinstance(stmt, ForStatement):
+            start_location, end_location, step_location = (self.marks[keyword] for keyword in LOOP_KEYWORDS)
+            start_val = self.evaluate(stmt.start_expr, start_location)
+            end_val = self.evaluate(stmt.end_expr, end_location)
+            step_val = self.evaluate(stmt.step_expr, step_location)
+            if start_val is None or end_val is None or step_val is None:
+                return
+            try:
+                check_loop_range(start_val, end_val, step_val)
+            except SyntaxError as e:
+                self.report(SEMANTIC, str(e), step_location if step_val <= 0 else start_location)
+
+    def program(self) -> Program:
+        """同 Parser.program，出错的语句记录诊断后跳过，返回其余语句组成的 Program"""
+        statements = []
+        try:
+            self.fetch_token()
+        except SyntaxError as e:
+            # 第一个语句以非法字符开头
+            self.recover(e)
+            self.statement_index += 1
+        while self.current_token.type != TokenType.NONTOKEN:
+            self.statement_location = self.lexer.location()
+            try:
+                stmt = self.statement()
+                if self.current_token.type != TokenType.SEMICO:
+                    self.match_token(TokenType.SEMICO)  # 缺少分号：抛出与编译时相同的错误
+            except SyntaxError as e:
+                self.recover(e)
+            else:
+                # 语句已完整：先检查，再取分号后的记号（分号后的非法字符属于下一个语句）
+                statements.append(stmt)
+                self.check_statement(stmt)
+                self.next_statement()
+            self.statement_index += 1
+        logger.debug("Check completed: %d diagnostic(s)", len(self.diagnostics))
+        return Program(statements)
+
+
+def check_lexer(lexer: Lexer, options: dict = None) -> list[dict]:
+    """检查 lexer 读入的整个脚本，返回全部诊断（按源码顺序，没有错误时为空列表）"""
+    try:
+        checker = Checker(lexer, options)
+        checker.program()
+        return checker.diagnostics
+    finally:
+        lexer.close()
+
+def check_program(file_path: str, **options) -> list[dict]:
+    """
+    静态检查入口：只做词法、语法分析与静态语义检查，不执行、不绘图，比 parse 快得多
+    options：执行选项（检查只用到 lexer）
+    返回诊断列表，每条为 {"line", "column", "kind", "message", "statement"}（见 make_diagnostic）
+    """
+    options = make_options(options)
+    return check_lexer(new_lexer(options, file_path), options)
+
+def check_program_string(text: str | bytes, **options) -> list[dict]:
+    """同 check_program，源码直接取自内存中的 text（str 或 UTF-8 编码的 bytes）"""
+    options = make_options(options)
+    return check_lexer(new_lexer(options, text=text), options)
+
+def check_program_stream(stream, **options) -> list[dict]:
+    """同 check_program，源码从文本流或二进制流中分块读入，流由调用方负责关闭"""
+    options = make_options(options)
+    return check_lexer(new_lexer(options, stream=stream), options)
@@ -0,0 +1,125 @@
+import copy
+import math
+from src.parser.ExprNode import ExprNode
+from src.scanner.TokenType import TokenType
+
+# DAG 指令中表示一元取负的操作码（TokenType 中 MINUS 只表示二元减法）
+NEGATE = "NEGATE"
+
+# 指数为常数 2、3 的乘方按连乘求值（比 math.pow 快），DAG 中对应的操作码
+SQUARE = "SQUARE"
+CUBE = "CUBE"
+SMALL_POWERS = {2.0: SQUARE, 3.0: CUBE}
+
+
+def is_binary(node: ExprNode) -> bool:
+    """判断是否为二元运算节点（一元取负节点只挂 child）"""
+    return node.op_code in (TokenType.PLUS, TokenType.MINUS, TokenType.MUL, TokenType.DIV, TokenType.POWER) \
+        and node.child is None
+
+
+def small_power(node: ExprNode) -> float | None:
+    """乘方节点的指数为常数 2 或 3 时返回该指数（各求值引擎据此改用连乘），否则返回 None"""
+    right = node.right
+    if node.op_code == TokenType.POWER and right is not None and right.op_code == TokenType.CONST_ID \
+            and right.const_val in SMALL_POWERS:
+        return right.const_val
+    return None
+
+def checked_power(base: float, exponent: float) -> float:
+    """
+    连乘计算小整数幂（exponent 为 2 或 3）
+    乘积溢出为无穷大而底数有限时与 math.pow 一样抛出 OverflowError，不会悄悄得到 inf
+    """
+    result = base * base if exponent == 2.0 else base * base * base
+    if math.isinf(result) and math.isfinite(base):
+        raise OverflowError("math range error")
+    return result
+
+
+def hash_cons(*roots: ExprNode) -> tuple[ExprNode, ...]:
+    """
+    哈希合并：把多棵语法树中结构相同的子树合并为同一个节点对象
+    返回合并后的各个根节点（原树不被修改）
+    """
+    table: dict[ExprNode, ExprNode] = {}
+    visited: dict[int, ExprNode] = {}
+
+    def intern(node: ExprNode) -> ExprNode:
+        if node is None:
+            return None
+        if id(node) in visited:
+            return visited[id(node)]
+        left, right, child = intern(node.left), intern(node.right), intern(node.child)
+        candidate = node
+        if left is not node.left or right is not node.right or child is not node.child:
+            candidate = copy.copy(node)
+            candidate.left, candidate.right, candidate.child = left, right, child
+            candidate._hash = None
+        shared = table.setdefault(candidate, candidate)
+        visited[id(node)] = shared
+        return shared
+
+    return tuple(intern(root) for root in roots)
+
+
+class ExprDag:
+    """
+    哈希合并后的表达式 DAG
+    nodes：拓扑序（子节点在前）排列的不同节点，每个节点只计算一次
+    code：与 nodes 一一对应的指令 (操作码, 操作数1下标, 操作数2下标, 常数值/函数指针)
+    outputs：各个根节点在 nodes 中的下标
+    """
+
+    def __init__(self, *roots: ExprNode):
+        self.roots = hash_cons(*roots)
+        self.nodes: list[ExprNode] = []
+        visited: set[int] = set()
+
+        # 非递归后序遍历，生成拓扑序
+        for root in self.roots:
+            stack = [(root, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if node is None or (not expanded and id(node) in visited):
+                    continue
+                if expanded:
+                    self.nodes.append(node)
+                    continue
+                visited.add(id(node))
+                stack.append((node, True))
+                stack.extend((child, False) for child in (node.child, node.right, node.left))
+
+        # 缺失的操作数按 0.0 处理（与 get_expr_value(None) 一致）
+        zero = ExprNode(TokenType.CONST_ID)
+        if any(is_binary(node) and (node.left is None or node.right is None) for node in self.nodes):
+            self.nodes.insert(0, zero)
+        index = {id(node): i for i, node in enumerate(self.nodes)}
+        index[id(None)] = index.get(id(zero), -1)
+
+        self.code = []
+        for node in self.nodes:
+            op_code = node.op_code
+            if op_code == TokenType.CONST_ID:
+                self.code.append((op_code, -1, -1, node.const_val))
+            elif op_code == TokenType.T:
+                self.code.append((op_code, -1, -1, None))
+            elif op_code == TokenType.FUNC:
+                self.code.append((op_code, index[id(node.child)], -1, node.func_ptr))
+            elif small_power(node) is not None:
+                self.code.append((SMALL_POWERS[small_power(node)], index[id(node.left)], -1, None))
+            elif is_binary(node):
+                self.code.append((op_code, index[id(node.left)], index[id(node.right)], None))
+            else:
+                self.code.append((NEGATE, index[id(node.child)], -1, None))
+        self.outputs = [index[id(root)] if root is not None else -1 for root in self.roots]
+
+    def shared_count(self) -> int:
+        """被多处引用（即被消去重复计算）的内部节点数量"""
+        refs: dict[int, int] = {}
+        for node in self.nodes:
+            for child in (node.left, node.right, node.child):
+                if child is not None:
+                    refs[id(child)] = refs.get(id(child), 0) + 1
+        return sum(1 for node in self.nodes
+                   if refs.get(id(node), 0) > 1 and node.op_code not in (TokenType.CONST_ID, TokenType.T))
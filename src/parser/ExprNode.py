@@ -1,8 +1,11 @@
+import math
 from src.scanner.TokenType import TokenType
 
 
 class ExprNode:
-    """语法树节点类"""
+    """语法树节点类（__slots__：不为每个节点分配 __dict__）"""
+
+    __slots__ = ("op_code", "left", "right", "child", "const_val", "func_ptr", "_hash", "__weakref__")
 
     def __init__(self, op_code: TokenType):
         self.op_code = op_code  # 记号类型（如 PLUS、CONST_ID、FUNC 等）
@@ -10,8 +13,36 @@ class ExprNode:
         self.right = None  # 右子节点（二元运算用）
         self.child = None  # 子节点（函数调用/一元运算用）
         self.const_val = 0.0  # 常数值（CONST_ID 用）
-        self.param_ptr = None  # 参数指针（T 用，绑定全局参数 T）
         self.func_ptr = None  # 函数指针（FUNC 用）
+        self._hash = None  # 结构哈希缓存（节点构造完成后首次求哈希时计算）
+
+    def key(self) -> tuple:
+        """结构比较用的键：运算类型 + 本节点属性 + 子节点（子节点按结构比较）"""
+        if self.op_code == TokenType.CONST_ID:
+            # 区分 0.0 与 -0.0
+            return self.op_code, self.const_val, math.copysign(1.0, self.const_val)
+        return self.op_code, self.func_ptr, self.left, self.right, self.child
+
+    def __eq__(self, other) -> bool:
+        """结构相等：两棵子树形状、运算、常数、函数均相同"""
+        if self is other:
+            return True
+        if not isinstance(other, ExprNode):
+            return NotImplemented
+        return hash(self) == hash(other) and self.key() == other.key()
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(self.key())
+        return self._hash
+
+    def __getstate__(self) -> tuple:
+        """序列化（程序缓存用）：结构哈希依赖函数对象地址与进程的哈希种子，不保存"""
+        return self.op_code, self.left, self.right, self.child, self.const_val, self.func_ptr
+
+    def __setstate__(self, state: tuple) -> None:
+        self.op_code, self.left, self.right, self.child, self.const_val, self.func_ptr = state
+        self._hash = None
 
     def __str__(self, indent: int = 0) -> str:
         """递归打印语法树"""
@@ -29,4 +60,7 @@ class ExprNode:
                 res += self.left.__str__(indent + 1) + "\n"
             if self.right:
                 res += self.right.__str__(indent + 1)
+            if self.child:
+                # 一元取负节点
+                res += self.child.__str__(indent + 1)
             return res
\ No newline at end of file
@@ -0,0 +1,122 @@
+from src.parser.ExprNode import ExprNode
+from src.scanner.TokenType import TokenType
+from src.semantics.SemanticUtils import get_expr_value
+
+
+def make_const(value: float) -> ExprNode:
+    """创建常数节点"""
+    node = ExprNode(TokenType.CONST_ID)
+    node.const_val = value
+    return node
+
+def make_negate(child: ExprNode) -> ExprNode:
+    """创建一元取负节点：MINUS 节点只挂 child，不挂 left/right"""
+    if is_negate(child):
+        return child.child  # -(-x) → x
+    node = ExprNode(TokenType.MINUS)
+    node.child = child
+    return node
+
+def make_binary(op_code: TokenType, left: ExprNode, right: ExprNode) -> ExprNode:
+    """创建二元运算节点"""
+    node = ExprNode(op_code)
+    node.left = left
+    node.right = right
+    return node
+
+def is_negate(node: ExprNode) -> bool:
+    """判断是否为一元取负节点"""
+    return node is not None and node.op_code == TokenType.MINUS and node.child is not None
+
+def is_const(node: ExprNode, value: float = None) -> bool:
+    """判断是否为常数节点（可选：且值等于 value）"""
+    if node is None or node.op_code != TokenType.CONST_ID:
+        return False
+    return value is None or node.const_val == value
+
+def count_nodes(root: ExprNode) -> int:
+    """统计语法树（或共享子树的 DAG）中不同节点的数量"""
+    seen = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node is None or id(node) in seen:
+            continue
+        seen.add(id(node))
+        stack.extend((node.left, node.right, node.child))
+    return len(seen)
+
+def try_fold(node: ExprNode) -> ExprNode:
+    """
+    子节点均为常数时直接求值，折叠成常数节点
+    求值出错（除零、定义域错误等）时保留原节点，让错误在执行阶段按原样报告
+    """
+    try:
+        return make_const(get_expr_value(node))
+    except (ArithmeticError, ValueError):
+        return node
+
+def simplify(root: ExprNode) -> ExprNode:
+    """
+    后序遍历：常量折叠 + 代数化简，返回新的语法树（不修改原树）
+    """
+    if root is None:
+        return None
+
+    op_code = root.op_code
+    if op_code in (TokenType.CONST_ID, TokenType.T):
+        return root
+
+    if op_code == TokenType.FUNC:
+        node = ExprNode(TokenType.FUNC)
+        node.func_ptr = root.func_ptr
+        node.child = simplify(root.child)
+        return try_fold(node) if is_const(node.child) else node
+
+    if is_negate(root):
+        child = simplify(root.child)
+        if is_const(child):
+            return make_const(-child.const_val)
+        return make_negate(child)
+
+    left = simplify(root.left)
+    right = simplify(root.right)
+    node = make_binary(op_code, left, right)
+    if is_const(left) and is_const(right):
+        return try_fold(node)
+
+    if op_code == TokenType.PLUS:
+        if is_const(left, 0):
+            return right  # 0 + x → x
+        if is_const(right, 0):
+            return left  # x + 0 → x
+    elif op_code == TokenType.MINUS:
+        if is_const(right, 0):
+            return left  # x - 0 → x
+        if is_const(left, 0):
+            return make_negate(right)  # 0 - x → -x（一元负号在 Parser 中被改写为 0 - x）
+    elif op_code == TokenType.MUL:
+        if is_const(left, 1):
+            return right  # 1 * x → x
+        if is_const(right, 1):
+            return left  # x * 1 → x
+        if is_const(left, -1):
+            return make_negate(right)  # -1 * x → -x
+        if is_const(right, -1):
+            return make_negate(left)  # x * -1 → -x
+    elif op_code == TokenType.DIV:
+        if is_const(right, 1):
+            return left  # x / 1 → x
+    elif op_code == TokenType.POWER:
+        if is_const(right, 1):
+            return left  # x ** 1 → x
+        # x ** 2、x ** 3 保留为乘方节点：各求值引擎按连乘计算并检查溢出（见 ExprDag.small_power）
+
+    return node
+
+def optimize_expr(root: ExprNode) -> tuple[ExprNode, int]:
+    """
+    表达式优化入口：返回 (优化后的语法树, 被消去的节点数)
+    """
+    optimized = simplify(root)
+    return optimized, count_nodes(root) - count_nodes(optimized)
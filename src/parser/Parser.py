@@ -1,28 +1,17 @@
+import logging
 from src.scanner.Lexer import Lexer
+from src.scanner.RegexLexer import RegexLexer
 from src.scanner.Token import Token
 from src.semantics.SemanticUtils import *
-from src.semantics import SemanticContext as sc
+from src.semantics.SemanticContext import Context, make_options
+from src.parser.Optimizer import optimize_expr, count_nodes
+from src.parser.ExprDag import hash_cons
+from src.parser.Program import Program, Statement, OriginStatement, ScaleStatement, RotStatement, StyleStatement, ForStatement
+from src.parser.ProgramCache import ProgramCache, cache_key, get_default_cache
+from src.semantics.Executor import execute
+from src.semantics.Profiler import Profiler, measure, measure_statement, statement_kind
 
-# 全局变量：当前扫描到的记号
-current_token: Token | None = None
-
-def fetch_token(lexer: Lexer) -> None:
-    """获取下一个记号，更新 current_token"""
-    global current_token
-    current_token = lexer.get_token()
-    if current_token.type == TokenType.ERRTOKEN:
-        raise SyntaxError(f"Syntax Error: '{current_token.lexeme}'")
-
-
-def match_token(expected_type: TokenType, lexer: Lexer) -> None:
-    """匹配预期记号，不匹配则抛出语法错误"""
-    global current_token
-    if current_token.type != expected_type:
-        raise SyntaxError(
-            f"Syntax Error：Expect {expected_type.value}，got '{current_token.lexeme}'"
-        )
-    # 匹配成功，获取下一个记号
-    fetch_token(lexer)
+logger = logging.getLogger(__name__)
 
 def make_expr_node(op_code: TokenType, *args) -> ExprNode:
     """创建语法树节点（工厂函数）"""
@@ -31,8 +20,8 @@ def make_expr_node(op_code: TokenType, *args) -> ExprNode:
         # 常数节点：args 为 (常量值)
         node.const_val = args[0]
     elif op_code == TokenType.T:
-        # 参数节点：绑定全局 T
-        node.param_ptr = lambda: sc.Parameter_T  # 使用 lambda 模拟指针
+        # 参数节点：无需额外属性，求值时由执行引擎提供当前 T
+        pass
     elif op_code == TokenType.FUNC:
         # 函数节点：args 为 (函数指针, 子节点)
         node.func_ptr = args[0]
@@ -57,277 +46,436 @@ def check_opacity(value: float) -> None:
             f"Semantic Error: opacity must be between 0 and 1 (current value: {value})"
         )
 
-# --- 递归下降子程序 ---
-
-def atom(lexer: Lexer) -> ExprNode:
-    """Atom → CONST_ID | T | FUNC ( Expression ) | ( Expression )"""
-    global current_token
-    token = current_token
-    if token.type == TokenType.CONST_ID:
-        # CONST_ID
-        node = make_expr_node(TokenType.CONST_ID, token.value)
-        match_token(TokenType.CONST_ID, lexer)
-        return node
-    elif token.type == TokenType.T:
-        # T
-        node = make_expr_node(TokenType.T)
-        match_token(TokenType.T, lexer)
-        return node
-    elif token.type == TokenType.FUNC:
-        # FUNC ( Expression )
-        func_ptr = token.func_ptr
-        match_token(TokenType.FUNC, lexer)
-        match_token(TokenType.L_BRACKET, lexer)
-        expr_node = expression(lexer)
-        match_token(TokenType.R_BRACKET, lexer)
-        return make_expr_node(TokenType.FUNC, func_ptr, expr_node)
-    elif token.type == TokenType.L_BRACKET:
-        # ( Expression )
-        match_token(TokenType.L_BRACKET, lexer)
-        expr_node = expression(lexer)
-        match_token(TokenType.R_BRACKET, lexer)
-        return expr_node
-    else:
-        # 无效记号
-        raise SyntaxError(f"Syntax Error：Not a valid atom: '{token.lexeme}'")
-
-def component(lexer: Lexer) -> ExprNode:
-    """Component → Atom [ POWER Component ]（右结合）"""
-    left_node = atom(lexer)
-    global current_token
-    while current_token.type == TokenType.POWER:
-        op_token = current_token
-        match_token(TokenType.POWER, lexer)
-        # **右边如果是factor, 允许先进行一元+/-的计算
-        right_node = factor(lexer)
-        left_node = make_expr_node(op_token.type, left_node, right_node)
-    return left_node
-
-def factor(lexer: Lexer) -> ExprNode:
-    """Factor → ( PLUS | MINUS ) Factor | Component（一元运算）"""
-    global current_token
-    token = current_token
-    if token.type in (TokenType.PLUS, TokenType.MINUS):
-        op_token = token
-        match_token(op_token.type, lexer)
-        factor_node = factor(lexer)
-        zero_node = make_expr_node(TokenType.CONST_ID, 0.0)
-        return make_expr_node(op_token.type, zero_node, factor_node)
-    else:
-        return component(lexer)
-
-def term(lexer: Lexer) -> ExprNode:
-    """Term → Factor { ( MUL | DIV ) Factor }（左结合）"""
-    left_node = factor(lexer)
-    global current_token
-    while current_token.type in (TokenType.MUL, TokenType.DIV):
-        op_token = current_token
-        match_token(op_token.type, lexer)
-        right_node = factor(lexer)
-        left_node = make_expr_node(op_token.type, left_node, right_node)
-    return left_node
-
-def expression(lexer: Lexer) -> ExprNode:
-    """Expression → Term { ( PLUS | MINUS ) Term }（左结合）"""
-    left_node = term(lexer)
-    global current_token
-    # + - 都符合下一步
-    while current_token.type in (TokenType.PLUS, TokenType.MINUS):
-        op_token = current_token
-        match_token(op_token.type, lexer)
-        # 创建右节点
-        right_node = term(lexer)
-        # 将已有的左右节点整合为一颗子树, 作为新的左节点返回
-        left_node = make_expr_node(op_token.type, left_node, right_node)
-    return left_node
-
-
-def style_value(lexer: Lexer) -> tuple:
-    """STYLEVALUE → COLOR | CONST_ID | ( COLOR [, CONST_ID [, CONST_ID] ] )"""
-    global current_token
-    color = None
-    opacity = None
-    line_width = None
-
-    # 分支 1：STYLEVALUE = COLOR（仅颜色）
-    if current_token.type == TokenType.COLOR:
-        color = current_token.value  # 取预定义色值（如 #FF0000）
-        match_token(TokenType.COLOR, lexer)
-
-    # 分支 2：STYLEVALUE = CONST_ID（仅线条粗细）
-    elif current_token.type == TokenType.CONST_ID:
-        line_width = current_token.value
-        check_non_negative(line_width, "line_width")
-        match_token(TokenType.CONST_ID, lexer)
-
-    # 分支 3：STYLEVALUE = ( COLOR [, CONST_ID [, CONST_ID] ] )（括号包裹）
-    elif current_token.type == TokenType.L_BRACKET:
-        match_token(TokenType.L_BRACKET, lexer)  # 匹配左括号
-
-        # 括号内必须以颜色开头
-        if current_token.type != TokenType.COLOR:
-            raise SyntaxError("Syntax error: Parenthesized style value must start with a color keyword (e.g., red, blue)")
-        color = current_token.value
-        match_token(TokenType.COLOR, lexer)
-
-        # 可选第一个参数：透明度（CONST_ID）
-        if current_token.type == TokenType.COMMA:
-            match_token(TokenType.COMMA, lexer)  # 匹配逗号
-            if current_token.type != TokenType.CONST_ID:
-
-                raise SyntaxError("Syntax error: Opacity must be a numeric value")
-            opacity = current_token.value
-            check_non_negative(opacity, "Opacity")
-            check_opacity(opacity)
-            match_token(TokenType.CONST_ID, lexer)
-
-            # 可选第二个参数：线条粗细（CONST_ID）
-            if current_token.type == TokenType.COMMA:
-                match_token(TokenType.COMMA, lexer)  # 匹配逗号
-                if current_token.type != TokenType.CONST_ID:
-
-                    raise SyntaxError("Syntax error: Line width must be a numeric value")
-                line_width = current_token.value
-                check_non_negative(line_width, "line_width")
-                match_token(TokenType.CONST_ID, lexer)
-
-        # 匹配右括号
-        match_token(TokenType.R_BRACKET, lexer)
-
-    # 非法 STYLEVALUE
-    else:
-        raise SyntaxError("Syntax error: Invalid style value format (supported: color, numeric value, or (color[, opacity [, line_width]]))")
-
-    return color, opacity, line_width
-
-def origin_statement(lexer: Lexer) -> None:
-    """OriginStatment → ORIGIN IS ( Expression , Expression )"""
-    match_token(TokenType.ORIGIN, lexer)
-    match_token(TokenType.IS, lexer)
-    match_token(TokenType.L_BRACKET, lexer)
-    x_expr = expression(lexer)
-    match_token(TokenType.COMMA, lexer)
-    y_expr = expression(lexer)
-    match_token(TokenType.R_BRACKET, lexer)
-    # (测试用)打印树
-    print(f"parsed: ORIGIN IS ({x_expr}, {y_expr})")
-
-    # 语义动作: 计算并设置平移原点
-    sc.Origin_x = get_expr_value(x_expr)
-    sc.Origin_y = get_expr_value(y_expr)
-    print(f"Origin set to ({sc.Origin_x}, {sc.Origin_y})")
-
-def scale_statement(lexer: Lexer) -> None:
-    """ScaleStatment → SCALE IS ( Expression , Expression )"""
-    match_token(TokenType.SCALE, lexer)
-    match_token(TokenType.IS, lexer)
-    match_token(TokenType.L_BRACKET, lexer)
-    x_scale = expression(lexer)
-    match_token(TokenType.COMMA, lexer)
-    y_scale = expression(lexer)
-    match_token(TokenType.R_BRACKET, lexer)
-    # (测试用)打印树
-    print(f"parsed: SCALE IS ({x_scale}, {y_scale})")
-
-    # 语义动作: 计算缩放因子并设置
-    sc.Scale_x = get_expr_value(x_scale)
-    sc.Scale_y = get_expr_value(y_scale)
-    print(f"Scale set to ({sc.Scale_x}, {sc.Scale_y})")
-
-def rot_statement(lexer: Lexer) -> None:
-    """RotStatment → ROT IS Expression"""
-    match_token(TokenType.ROT, lexer)
-    match_token(TokenType.IS, lexer)
-    rot_expr = expression(lexer)
-    # (测试用)打印树
-    print(f"parsed: ROT IS {rot_expr}")
-
-    # 语义动作: 计算旋转角度并设置
-    sc.Rot_ang = get_expr_value(rot_expr)
-    print(f"Rot set to {sc.Rot_ang}")
-
-
-def style_statement(lexer: Lexer) -> None:
-    """StyleStatement → STYLE IS STYLEVALUE ;"""
-    match_token(TokenType.STYLE, lexer)  # 匹配 STYLE 关键字
-    match_token(TokenType.IS, lexer)  # 匹配 IS 关键字
-
-    # 解析 STYLEVALUE，获取配置项（未指定则为 None）
-    color, opacity, line_width = style_value(lexer)
-
-    # 更新全局配置（仅覆盖指定的项，未指定项保留默认值）
-    if color is not None:
-        sc.StyleConfig["color"] = color
-    if opacity is not None:
-        sc.StyleConfig["opacity"] = opacity
-    if line_width is not None:
-        sc.StyleConfig["line_width"] = line_width
-
-    # 打印解析结果（便于调试和验证）
-    print(
-        f"parsed: Style is Color={sc.StyleConfig['color']}, Opacity={sc.StyleConfig['opacity']:.2f}, Line Width={sc.StyleConfig['line_width']:.2f}")
-def for_statement(lexer: Lexer, ax: plt.Axes) -> None:
-    """ForStatment → FOR T FROM Expression TO Expression STEP Expression DRAW ( Expression , Expression )"""
-    match_token(TokenType.FOR, lexer)
-    match_token(TokenType.T, lexer)
-    match_token(TokenType.FROM, lexer)
-    start_expr = expression(lexer)
-    match_token(TokenType.TO, lexer)
-    end_expr = expression(lexer)
-    match_token(TokenType.STEP, lexer)
-    step_expr = expression(lexer)
-    match_token(TokenType.DRAW, lexer)
-    match_token(TokenType.L_BRACKET, lexer)
-    x_expr = expression(lexer)
-    match_token(TokenType.COMMA, lexer)
-    y_expr = expression(lexer)
-    match_token(TokenType.R_BRACKET, lexer)
-    # (测试用)打印树
-    print(f"parsed: FOR T FROM {start_expr} TO {end_expr} STEP {step_expr} DRAW ({x_expr}, {y_expr})")
-
-    # 语义动作: 绘制所有点
-    cache_points(start_expr, end_expr, step_expr, x_expr, y_expr)  # 缓存点
-    batch_draw(ax)  # 批量绘制
-
-def statement(lexer: Lexer, ax: plt.Axes) -> None:
-    """Statement → OriginStatment | ScaleStatment | RotStatment | ForStatment"""
-    global current_token
-    token_type = current_token.type
-    if token_type == TokenType.ORIGIN:
-        origin_statement(lexer)
-    elif token_type == TokenType.SCALE:
-        scale_statement(lexer)
-    elif token_type == TokenType.ROT:
-        rot_statement(lexer)
-    elif token_type == TokenType.FOR:
-        for_statement(lexer, ax)
-    elif token_type == TokenType.STYLE:
-        style_statement(lexer)
-    else:
-        raise SyntaxError(f"Syntax Error: Invalid statement starting with '{current_token.lexeme}'")
-
-def program(lexer: Lexer, ax: plt.Axes) -> None:
-    """Program → { Statement ; }（0 个或多个语句，以分号结束）"""
-    global current_token
-    # 初始化：获取第一个记号
-    fetch_token(lexer)
-    while current_token.type != TokenType.NONTOKEN:
-        # 解析一个语句
-        statement(lexer, ax)
-        # 匹配语句结束符分号
-        match_token(TokenType.SEMICO, lexer)
-
-    print("\nParsing completed: No syntax errors found")
-
-def parse(file_path: str, ax: plt.Axes = None) -> None:
-    """Parser 入口：初始化 Lexer，启动语法分析"""
-    # 初始化词法分析器
-    lexer = Lexer(file_path)
+class Parser:
+    """
+    递归下降语法分析器：当前记号与执行选项都保存在实例中，
+    每次编译使用独立的 Parser，多个线程可以同时编译不同脚本
+    """
+
+    def __init__(self, lexer: Lexer, options: dict = None, profiler: Profiler = None):
+        self.lexer = lexer
+        self.options = make_options(options)  # 编译选项（optimize / cse）
+        self.profiler = profiler  # 性能剖析（None 表示不剖析）
+        self.current_token: Token | None = None  # 当前扫描到的记号
+        # 取记号的函数：剖析时包装为逐次计时并计数的版本，否则直接调用 Lexer.get_token
+        self.get_token = lexer.get_token if profiler is None else profiler.timed("lex", lexer.get_token, "tokens")
+
+    def fetch_token(self) -> None:
+        """获取下一个记号，更新 current_token"""
+        self.current_token = self.get_token()
+        if self.current_token.type == TokenType.ERRTOKEN:
+            raise SyntaxError(f"Syntax Error: '{self.current_token.lexeme}'")
+
+    def match_token(self, expected_type: TokenType) -> None:
+        """匹配预期记号，不匹配则抛出语法错误"""
+        if self.current_token.type != expected_type:
+            raise SyntaxError(
+                f"Syntax Error：Expect {expected_type.value}，got '{self.current_token.lexeme}'"
+            )
+        # 匹配成功，获取下一个记号
+        self.fetch_token()
+
+    def check_value(self, check, *args) -> None:
+        """语义校验（check_opacity 等）：校验失败时抛出 SyntaxError（静态检查模式下记录诊断后继续，见 Checker）"""
+        check(*args)
+
+    def optimize_exprs(self, *exprs: ExprNode) -> tuple[ExprNode, ...]:
+        """按编译选项对语句中的表达式做常量折叠与代数化简"""
+        if self.profiler is not None:
+            self.profiler.count("ast_nodes", sum(count_nodes(expr) for expr in exprs))
+        if not self.options["optimize"]:
+            return exprs
+        results = []
+        removed = 0
+        with measure(self.profiler, "optimize"):
+            for expr in exprs:
+                optimized, count = optimize_expr(expr)
+                results.append(optimized)
+                removed += count
+        if removed:
+            logger.debug("optimized: removed %d node(s)", removed)
+        return tuple(results)
+
+    # --- 递归下降子程序 ---
+
+    def atom(self) -> ExprNode:
+        """Atom → CONST_ID | T | FUNC ( Expression ) | ( Expression )"""
+        token = self.current_token
+        if token.type == TokenType.CONST_ID:
+            # CONST_ID
+            node = make_expr_node(TokenType.CONST_ID, token.value)
+            self.match_token(TokenType.CONST_ID)
+            return node
+        elif token.type == TokenType.T:
+            # T
+            node = make_expr_node(TokenType.T)
+            self.match_token(TokenType.T)
+            return node
+        elif token.type == TokenType.FUNC:
+            # FUNC ( Expression )
+            func_ptr = token.func_ptr
+            self.match_token(TokenType.FUNC)
+            self.match_token(TokenType.L_BRACKET)
+            expr_node = self.expression()
+            self.match_token(TokenType.R_BRACKET)
+            return make_expr_node(TokenType.FUNC, func_ptr, expr_node)
+        elif token.type == TokenType.L_BRACKET:
+            # ( Expression )
+            self.match_token(TokenType.L_BRACKET)
+            expr_node = self.expression()
+            self.match_token(TokenType.R_BRACKET)
+            return expr_node
+        else:
+            # 无效记号
+            raise SyntaxError(f"Syntax Error：Not a valid atom: '{token.lexeme}'")
+
+    def component(self) -> ExprNode:
+        """Component → Atom [ POWER Component ]（右结合）"""
+        left_node = self.atom()
+        while self.current_token.type == TokenType.POWER:
+            op_token = self.current_token
+            self.match_token(TokenType.POWER)
+            # **右边如果是factor, 允许先进行一元+/-的计算
+            right_node = self.factor()
+            left_node = make_expr_node(op_token.type, left_node, right_node)
+        return left_node
+
+    def factor(self) -> ExprNode:
+        """Factor → ( PLUS | MINUS ) Factor | Component（一元运算）"""
+        token = self.current_token
+        if token.type in (TokenType.PLUS, TokenType.MINUS):
+            op_token = token
+            self.match_token(op_token.type)
+            factor_node = self.factor()
+            zero_node = make_expr_node(TokenType.CONST_ID, 0.0)
+            return make_expr_node(op_token.type, zero_node, factor_node)
+        else:
+            return self.component()
+
+    def term(self) -> ExprNode:
+        """Term → Factor { ( MUL | DIV ) Factor }（左结合）"""
+        left_node = self.factor()
+        while self.current_token.type in (TokenType.MUL, TokenType.DIV):
+            op_token = self.current_token
+            self.match_token(op_token.type)
+            right_node = self.factor()
+            left_node = make_expr_node(op_token.type, left_node, right_node)
+        return left_node
+
+    def expression(self) -> ExprNode:
+        """Expression → Term { ( PLUS | MINUS ) Term }（左结合）"""
+        left_node = self.term()
+        # + - 都符合下一步
+        while self.current_token.type in (TokenType.PLUS, TokenType.MINUS):
+            op_token = self.current_token
+            self.match_token(op_token.type)
+            # 创建右节点
+            right_node = self.term()
+            # 将已有的左右节点整合为一颗子树, 作为新的左节点返回
+            left_node = make_expr_node(op_token.type, left_node, right_node)
+        return left_node
+
+
+    def style_value(self) -> tuple:
+        """STYLEVALUE → COLOR | CONST_ID | ( COLOR [, CONST_ID [, CONST_ID] ] )"""
+        color = None
+        opacity = None
+        line_width = None
+
+        # 分支 1：STYLEVALUE = COLOR（仅颜色）
+        if self.current_token.type == TokenType.COLOR:
+            color = self.current_token.value  # 取预定义色值（如 #FF0000）
+            self.match_token(TokenType.COLOR)
+
+        # 分支 2：STYLEVALUE = CONST_ID（仅线条粗细）
+        elif self.current_token.type == TokenType.CONST_ID:
+            line_width = self.current_token.value
+            self.check_value(check_non_negative, line_width, "line_width")
+            self.match_token(TokenType.CONST_ID)
+
+        # 分支 3：STYLEVALUE = ( COLOR [, CONST_ID [, CONST_ID] ] )（括号包裹）
+        elif self.current_token.type == TokenType.L_BRACKET:
+            self.match_token(TokenType.L_BRACKET)  # 匹配左括号
+
+            # 括号内必须以颜色开头
+            if self.current_token.type != TokenType.COLOR:
+                raise SyntaxError("Syntax error: Parenthesized style value must start with a color keyword (e.g., red, blue)")
+            color = self.current_token.value
+            self.match_token(TokenType.COLOR)
+
+            # 可选第一个参数：透明度（CONST_ID）
+            if self.current_token.type == TokenType.COMMA:
+                self.match_token(TokenType.COMMA)  # 匹配逗号
+                if self.current_token.type != TokenType.CONST_ID:
+
+                    raise SyntaxError("Syntax error: Opacity must be a numeric value")
+                opacity = self.current_token.value
+                self.check_value(check_non_negative, opacity, "Opacity")
+                self.check_value(check_opacity, opacity)
+                self.match_token(TokenType.CONST_ID)
+
+                # 可选第二个参数：线条粗细（CONST_ID）
+                if self.current_token.type == TokenType.COMMA:
+                    self.match_token(TokenType.COMMA)  # 匹配逗号
+                    if self.current_token.type != TokenType.CONST_ID:
+
+                        raise SyntaxError("Syntax error: Line width must be a numeric value")
+                    line_width = self.current_token.value
+                    self.check_value(check_non_negative, line_width, "line_width")
+                    self.match_token(TokenType.CONST_ID)
+
+            # 匹配右括号
+            self.match_token(TokenType.R_BRACKET)
+
+        # 非法 STYLEVALUE
+        else:
+            raise SyntaxError("Syntax error: Invalid style value format (supported: color, numeric value, or (color[, opacity [, line_width]]))")
+
+        return color, opacity, line_width
+
+    def origin_statement(self) -> OriginStatement:
+        """OriginStatment → ORIGIN IS ( Expression , Expression )"""
+        self.match_token(TokenType.ORIGIN)
+        self.match_token(TokenType.IS)
+        self.match_token(TokenType.L_BRACKET)
+        x_expr = self.expression()
+        self.match_token(TokenType.COMMA)
+        y_expr = self.expression()
+        self.match_token(TokenType.R_BRACKET)
+        # (测试用)打印树
+        logger.debug("parsed: ORIGIN IS (%s, %s)", x_expr, y_expr)
+        return OriginStatement(*self.optimize_exprs(x_expr, y_expr))
+
+    def scale_statement(self) -> ScaleStatement:
+        """ScaleStatment → SCALE IS ( Expression , Expression )"""
+        self.match_token(TokenType.SCALE)
+        self.match_token(TokenType.IS)
+        self.match_token(TokenType.L_BRACKET)
+        x_scale = self.expression()
+        self.match_token(TokenType.COMMA)
+        y_scale = self.expression()
+        self.match_token(TokenType.R_BRACKET)
+        # (测试用)打印树
+        logger.debug("parsed: SCALE IS (%s, %s)", x_scale, y_scale)
+        return ScaleStatement(*self.optimize_exprs(x_scale, y_scale))
+
+    def rot_statement(self) -> RotStatement:
+        """RotStatment → ROT IS Expression"""
+        self.match_token(TokenType.ROT)
+        self.match_token(TokenType.IS)
+        rot_expr = self.expression()
+        # (测试用)打印树
+        logger.debug("parsed: ROT IS %s", rot_expr)
+        return RotStatement(*self.optimize_exprs(rot_expr))
+
+
+    def style_statement(self) -> StyleStatement:
+        """StyleStatement → STYLE IS STYLEVALUE ;"""
+        self.match_token(TokenType.STYLE)  # 匹配 STYLE 关键字
+        self.match_token(TokenType.IS)  # 匹配 IS 关键字
+
+        # 解析 STYLEVALUE，获取配置项（未指定则为 None，执行时保留原配置）
+        stmt = StyleStatement(*self.style_value())
+
+        # 打印解析结果（便于调试和验证）
+        logger.debug("parsed: %s", stmt)
+        return stmt
+
+    def for_statement(self) -> ForStatement:
+        """ForStatment → FOR T FROM Expression TO Expression STEP Expression DRAW ( Expression , Expression )"""
+        self.match_token(TokenType.FOR)
+        self.match_token(TokenType.T)
+        self.match_token(TokenType.FROM)
+        start_expr = self.expression()
+        self.match_token(TokenType.TO)
+        end_expr = self.expression()
+        self.match_token(TokenType.STEP)
+        step_expr = self.expression()
+        self.match_token(TokenType.DRAW)
+        self.match_token(TokenType.L_BRACKET)
+        x_expr = self.expression()
+        self.match_token(TokenType.COMMA)
+        y_expr = self.expression()
+        self.match_token(TokenType.R_BRACKET)
+        # (测试用)打印树
+        logger.debug("parsed: FOR T FROM %s TO %s STEP %s DRAW (%s, %s)", start_expr, end_expr, step_expr, x_expr, y_expr)
+        start_expr, end_expr, step_expr, x_expr, y_expr = self.optimize_exprs(start_expr, end_expr, step_expr, x_expr, y_expr)
+        if self.options["cse"]:
+            # 公共子表达式消除：五个表达式中结构相同的子树合并为同一节点
+            start_expr, end_expr, step_expr, x_expr, y_expr = hash_cons(start_expr, end_expr, step_expr, x_expr, y_expr)
+        return ForStatement(start_expr, end_expr, step_expr, x_expr, y_expr)
+
+    def statement(self) -> Statement:
+        """Statement → OriginStatment | ScaleStatment | RotStatment | ForStatment"""
+        token_type = self.current_token.type
+        if token_type == TokenType.ORIGIN:
+            return self.origin_statement()
+        elif token_type == TokenType.SCALE:
+            return self.scale_statement()
+        elif token_type == TokenType.ROT:
+            return self.rot_statement()
+        elif token_type == TokenType.FOR:
+            return self.for_statement()
+        elif token_type == TokenType.STYLE:
+            return self.style_statement()
+        else:
+            raise SyntaxError(f"Syntax Error: Invalid statement starting with '{self.current_token.lexeme}'")
+
+    def program(self) -> Program:
+        """Program → { Statement ; }（0 个或多个语句，以分号结束）"""
+        statements = []
+        # 初始化：获取第一个记号
+        self.fetch_token()
+        while self.current_token.type != TokenType.NONTOKEN:
+            # 解析一个语句（剖析时按语句记录记号数与节点数）
+            with measure_statement(self.profiler, len(statements), self.current_token.type.name):
+                statements.append(self.statement())
+                # 匹配语句结束符分号
+                self.match_token(TokenType.SEMICO)
+
+        logger.debug("Parsing completed: No syntax errors found")
+        return Program(statements)
+
+
+def compile_lexer(lexer: Lexer, source: str, options: dict = None, profiler: Profiler = None) -> Program:
+    """词法分析 + 语法分析（含表达式优化），按 options 编译出 Program；source 为提示用的源名称"""
+    try:
+        with measure(profiler, "compile"):
+            result = Parser(lexer, options, profiler).program()
+        result.source = source
+        return result
+    finally:
+        lexer.close()
+
+# 词法分析引擎（Options["lexer"]）
+LEXERS = {"dfa": Lexer, "regex": RegexLexer}
+
+def new_lexer(options: dict = None, file_path: str = None, **source) -> Lexer:
+    """按 options["lexer"] 新建词法分析器（options 为 None 时用进程默认值），源码参数同 Lexer"""
+    engine = make_options(options)["lexer"]
+    if engine not in LEXERS:
+        raise ValueError(f"Unknown lexer engine: '{engine}' (expected one of: {', '.join(LEXERS)})")
+    return LEXERS[engine](file_path, **source)
+
+def compile_program(file_path: str, options: dict = None, profiler: Profiler = None) -> Program:
+    """编译源文件"""
+    return compile_lexer(new_lexer(options, file_path), file_path, options, profiler)
+
+def compile_string(text: str | bytes, options: dict = None, profiler: Profiler = None) -> Program:
+    """编译内存中的源码（bytes 按 UTF-8 解码），不经过文件系统"""
+    return compile_lexer(new_lexer(options, text=text), "<string>", options, profiler)
+
+def compile_stream(stream, options: dict = None, profiler: Profiler = None) -> Program:
+    """编译文本流或二进制流中的源码（分块读入，见 Lexer），流由调用方负责关闭"""
+    name = getattr(stream, "name", None)
+    return compile_lexer(new_lexer(options, stream=stream), name if isinstance(name, str) else "<stream>",
+                         options, profiler)
+
+def resolve_cache(cache: bool | ProgramCache | None) -> ProgramCache | None:
+    """cache 参数：True 使用默认缓存目录，也可直接传入 ProgramCache 实例"""
+    if cache is True:
+        return get_default_cache()
+    return cache or None
+
+def load_or_compile(program_cache: ProgramCache, source: bytes, compile_func, options: dict) -> Program:
+    """按源码内容查找程序缓存，未命中时调用 compile_func() 编译并写入缓存"""
+    key = cache_key(source, options)
+    result = program_cache.load(key)
+    if result is not None:
+        logger.debug("Loaded compiled program from cache: %d statement(s)", len(result))
+        return result
+    result = compile_func()
+    program_cache.store(key, result)
+    return result
+
+def parse_program(file_path: str, cache: bool | ProgramCache = False, profiler: Profiler = None, **options) -> Program:
+    """
+    编译阶段：词法分析 + 语法分析（含表达式优化），返回可反复执行的 Program
+    cache：启用磁盘程序缓存，源码、编译器、符号表与编译选项均未变化时直接读取上次的编译结果
+    profiler：记录编译各阶段的耗时与记号数、节点数（命中缓存时没有这些记录）
+    options：覆盖进程默认值的执行选项（编译只用到 optimize / cse）
+    语法错误以 SyntaxError 抛出（出错的脚本不写入缓存）
+    """
+    options = make_options(options)
+    program_cache = resolve_cache(cache)
+    if program_cache is None:
+        return compile_program(file_path, options, profiler)
+    with open(file_path, "rb") as file:
+        source = file.read()
+    result = load_or_compile(program_cache, source, lambda: compile_program(file_path, options, profiler), options)
+    result.source = file_path
+    return result
+
+def parse_program_string(text: str | bytes, cache: bool | ProgramCache = False, profiler: Profiler = None,
+                         **options) -> Program:
+    """同 parse_program，源码直接取自内存中的 text（str 或 UTF-8 编码的 bytes）"""
+    options = make_options(options)
+    program_cache = resolve_cache(cache)
+    if program_cache is None:
+        return compile_string(text, options, profiler)
+    source = text.encode("utf-8") if isinstance(text, str) else bytes(text)
+    result = load_or_compile(program_cache, source, lambda: compile_string(text, options, profiler), options)
+    result.source = "<string>"
+    return result
+
+def parse_program_stream(stream, profiler: Profiler = None, **options) -> Program:
+    """
+    同 parse_program，源码从文本流或二进制流（如 sys.stdin）中分块读入
+    不使用程序缓存：计算缓存键需要先读完整个流
+    """
+    return compile_stream(stream, make_options(options), profiler)
+
+def run_program(compile_func, ax: plt.Axes, context: Context | None, profile: bool | Profiler,
+                options: dict) -> Program | None | tuple[Program | None, dict]:
+    """parse / parse_string / parse_stream 的公共部分：compile_func(profiler, options) 编译，再在 ax 上执行"""
+    ctx = context if context is not None else Context()
+    saved_profiler = ctx.profiler
+    if profile:
+        ctx.profiler = profile if isinstance(profile, Profiler) else Profiler()
+    profiler = ctx.profiler
+    result = None
     try:
-        # 启动语法分析
-        program(lexer, ax)
-    except SyntaxError as e:
-        print(f"\nSyntax parsing failed: {e}")
+        with ctx.override_options(**options):
+            try:
+                result = compile_func(profiler, ctx.Options)
+            except SyntaxError as e:
+                logger.error("Syntax parsing failed: %s", e)
+            else:
+                try:
+                    execute(result, ctx, ax)
+                except SyntaxError as e:
+                    logger.error("Execution failed: %s", e)
     finally:
-        # 关闭文件
-        lexer.close()
\ No newline at end of file
+        ctx.profiler = saved_profiler
+    if profile:
+        return result, profiler.report()
+    return result
+
+def parse(file_path: str, ax: plt.Axes = None, cache: bool | ProgramCache = False, context: Context = None,
+          profile: bool | Profiler = False, **options) -> Program | None | tuple[Program | None, dict]:
+    """
+    Parser 入口：先编译出 Program，再交给执行器在 ax 上执行
+    cache：是否使用磁盘程序缓存（见 parse_program）
+    context：执行用的绘图上下文（执行后可从中读取 AxisRange 等）；为 None 时新建一个
+    profile：记录编译与执行各阶段的耗时和计数器（也可直接传入 Profiler 实例）
+    options：本次调用覆盖的执行选项（见 SemanticContext.Options，如 engine="numpy"）
+    返回编译得到的 Program（语法分析失败时返回 None）；开启 profile 时返回 (Program, 剖析结果)，见 Profiler.report
+    """
+    return run_program(lambda profiler, opts: parse_program(file_path, cache, profiler, **opts),
+                       ax, context, profile, options)
+
+def parse_string(text: str | bytes, ax: plt.Axes = None, cache: bool | ProgramCache = False,
+                 context: Context = None, profile: bool | Profiler = False,
+                 **options) -> Program | None | tuple[Program | None, dict]:
+    """同 parse，源码直接取自内存中的 text（str 或 UTF-8 编码的 bytes），不需要先写入临时文件"""
+    return run_program(lambda profiler, opts: parse_program_string(text, cache, profiler, **opts),
+                       ax, context, profile, options)
+
+def parse_stream(stream, ax: plt.Axes = None, context: Context = None, profile: bool | Profiler = False,
+                 **options) -> Program | None | tuple[Program | None, dict]:
+    """
+    同 parse，源码从文本流或二进制流（如 sys.stdin、socket.makefile("rb")）中分块读入，大输入不会整个读进内存
+    不使用程序缓存（见 parse_program_stream）；流由调用方负责关闭
+    """
+    return run_program(lambda profiler, opts: parse_program_stream(stream, profiler, **opts),
+                       ax, context, profile, options)
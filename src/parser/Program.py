@@ -0,0 +1,94 @@
+from src.parser.ExprNode import ExprNode
+
+
+class Statement:
+    """语句基类：只保存语法分析结果，不执行语义动作"""
+
+    __slots__ = ()
+
+
+class OriginStatement(Statement):
+    """ORIGIN IS ( x_expr , y_expr )"""
+
+    __slots__ = ("x_expr", "y_expr")
+
+    def __init__(self, x_expr: ExprNode, y_expr: ExprNode):
+        self.x_expr = x_expr
+        self.y_expr = y_expr
+
+    def __str__(self) -> str:
+        return f"ORIGIN IS ({self.x_expr}, {self.y_expr})"
+
+
+class ScaleStatement(Statement):
+    """SCALE IS ( x_expr , y_expr )"""
+
+    __slots__ = ("x_expr", "y_expr")
+
+    def __init__(self, x_expr: ExprNode, y_expr: ExprNode):
+        self.x_expr = x_expr
+        self.y_expr = y_expr
+
+    def __str__(self) -> str:
+        return f"SCALE IS ({self.x_expr}, {self.y_expr})"
+
+
+class RotStatement(Statement):
+    """ROT IS angle_expr"""
+
+    __slots__ = ("angle_expr",)
+
+    def __init__(self, angle_expr: ExprNode):
+        self.angle_expr = angle_expr
+
+    def __str__(self) -> str:
+        return f"ROT IS {self.angle_expr}"
+
+
+class StyleStatement(Statement):
+    """STYLE IS STYLEVALUE（未指定的项为 None，执行时保留原配置）"""
+
+    __slots__ = ("color", "opacity", "line_width")
+
+    def __init__(self, color: str | None, opacity: float | None, line_width: float | None):
+        self.color = color
+        self.opacity = opacity
+        self.line_width = line_width
+
+    def __str__(self) -> str:
+        return f"STYLE IS (Color={self.color}, Opacity={self.opacity}, Line Width={self.line_width})"
+
+
+class ForStatement(Statement):
+    """FOR T FROM start_expr TO end_expr STEP step_expr DRAW ( x_expr , y_expr )"""
+
+    __slots__ = ("start_expr", "end_expr", "step_expr", "x_expr", "y_expr")
+
+    def __init__(self, start_expr: ExprNode, end_expr: ExprNode, step_expr: ExprNode,
+                 x_expr: ExprNode, y_expr: ExprNode):
+        self.start_expr = start_expr
+        self.end_expr = end_expr
+        self.step_expr = step_expr
+        self.x_expr = x_expr
+        self.y_expr = y_expr
+
+    def __str__(self) -> str:
+        return (f"FOR T FROM {self.start_expr} TO {self.end_expr} STEP {self.step_expr} "
+                f"DRAW ({self.x_expr}, {self.y_expr})")
+
+
+class Program:
+    """语法分析的产物：按源码顺序排列的语句列表，可反复交给执行器执行"""
+
+    def __init__(self, statements: list[Statement] = None, source: str = ""):
+        self.statements: list[Statement] = statements if statements is not None else []
+        self.source = source  # 源文件路径（仅用于提示）
+
+    def __iter__(self):
+        return iter(self.statements)
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def __getitem__(self, index: int) -> Statement:
+        return self.statements[index]
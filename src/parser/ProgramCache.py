@@ -0,0 +1,205 @@
+import gc
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import zlib
+from src.parser.Program import Program
+from src.scanner import Token as symbols
+
+# 编译器版本：Program / ExprNode 的序列化格式或编译语义变化时递增
+COMPILER_VERSION = "1"
+
+# 参与编译（而非仅影响执行）的选项，不同取值编译出的 Program 不同
+COMPILE_OPTIONS = ("optimize", "cse")
+
+# 文法指纹覆盖的编译器模块：其中任何一个源文件改动都使已有缓存失效
+GRAMMAR_MODULES = (
+    "src.scanner.TokenType",
+    "src.scanner.TokenDFA",
+    "src.scanner.Lexer",
+    "src.scanner.TokenRegex",
+    "src.scanner.RegexLexer",
+    "src.parser.ExprNode",
+    "src.parser.ExprDag",
+    "src.parser.Optimizer",
+    "src.parser.Program",
+    "src.parser.Parser",
+    "src.semantics.SemanticUtils",  # 常量折叠用它求值，折叠结果写入缓存
+)
+
+# 缓存目录默认位置（可用环境变量 DRAWLANG_CACHE_DIR 覆盖）与容量上限
+DEFAULT_CACHE_DIR = os.environ.get("DRAWLANG_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "drawlang")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_CACHE_SUFFIX = ".prog"
+_grammar_fingerprint: str | None = None
+
+
+def grammar_fingerprint() -> str:
+    """文法指纹：编译器各模块源文件内容的哈希（进程内只计算一次）"""
+    global _grammar_fingerprint
+    if _grammar_fingerprint is None:
+        digest = hashlib.sha256()
+        for name in GRAMMAR_MODULES:
+            module = sys.modules.get(name)
+            path = getattr(module, "__file__", None)
+            digest.update(name.encode())
+            if path and os.path.exists(path):
+                with open(path, "rb") as file:
+                    digest.update(file.read())
+        _grammar_fingerprint = digest.hexdigest()
+    return _grammar_fingerprint
+
+def symbol_fingerprint() -> str:
+    """
+    符号表指纹：运行时登记新的常数/函数/颜色后随之变化
+    常数参数的函数调用会被折叠进编译结果，运行时登记的函数按其行为版本（而非函数名）区分
+    """
+    digest = hashlib.sha256()
+    for lexeme, token_type, value, func_ptr in symbols.SYMBOL_TABLE:
+        func_name = "" if func_ptr is None else \
+            f"{getattr(func_ptr, '__module__', '')}.{getattr(func_ptr, '__qualname__', repr(func_ptr))}"
+        version = symbols.SYMBOL_VERSIONS.get(lexeme, "")
+        digest.update(f"{lexeme}|{token_type.name}|{value!r}|{func_name}|{version}\n".encode())
+    return digest.hexdigest()
+
+def cache_key(source: bytes, options: dict) -> str:
+    """缓存键：源码内容 + 编译器版本 + 文法指纹 + 符号表指纹 + 编译选项"""
+    digest = hashlib.sha256()
+    digest.update(f"DrawLang/{COMPILER_VERSION}\n".encode())
+    digest.update(grammar_fingerprint().encode())
+    digest.update(symbol_fingerprint().encode())
+    digest.update(repr([(name, options[name]) for name in COMPILE_OPTIONS]).encode())
+    digest.update(source)
+    return digest.hexdigest()
+
+
+class ProgramCache:
+    """
+    磁盘上的 Program 缓存：每个脚本一个文件（pickle + zlib 压缩）
+    命中时更新文件修改时间，写入后按修改时间淘汰最久未用的文件，使总大小不超过 max_bytes
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path_of(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + _CACHE_SUFFIX)
+
+    def load(self, key: str) -> Program | None:
+        """读取缓存的 Program；不存在或已损坏时返回 None（损坏的文件直接删除）"""
+        path = self.path_of(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError:
+            self.misses += 1
+            return None
+        # 反序列化一次创建大量节点对象，期间暂停循环垃圾回收（否则会被反复触发）
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            program = pickle.loads(zlib.decompress(data))
+            if not isinstance(program, Program):
+                raise TypeError(f"Unexpected cache content: {type(program).__name__}")
+        except Exception:
+            self.discard(path)
+            self.misses += 1
+            return None
+        finally:
+            if gc_enabled:
+                gc.enable()
+        try:
+            os.utime(path)  # LRU：记录最近一次使用
+        except OSError:
+            pass
+        self.hits += 1
+        return program
+
+    def store(self, key: str, program: Program) -> bool:
+        """
+        写入缓存（先写临时文件再原子替换，多个进程同时写同一脚本也不会读到半个文件）
+        无法序列化的 Program（如引用了运行时登记的 lambda 函数）不缓存，返回 False
+        """
+        try:
+            data = zlib.compress(pickle.dumps(program, protocol=pickle.HIGHEST_PROTOCOL))
+        except (pickle.PicklingError, AttributeError, TypeError, RecursionError):
+            return False
+        if len(data) > self.max_bytes:
+            return False
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, self.path_of(key))
+        except OSError:
+            if tmp_path is not None:
+                self.discard(tmp_path)
+            return False
+        self.evict()
+        return True
+
+    def entries(self) -> list[tuple[float, int, str]]:
+        """缓存文件列表：(修改时间, 大小, 路径)"""
+        result = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return result
+        for name in names:
+            if not name.endswith(_CACHE_SUFFIX):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            result.append((stat.st_mtime, stat.st_size, path))
+        return result
+
+    def size(self) -> int:
+        """缓存文件总字节数"""
+        return sum(entry_size for _, entry_size, _ in self.entries())
+
+    def evict(self) -> int:
+        """淘汰最久未使用的文件直到总大小不超过上限，返回删除的文件数"""
+        entries = sorted(self.entries())
+        total = sum(entry_size for _, entry_size, _ in entries)
+        removed = 0
+        for _, entry_size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if self.discard(path):
+                total -= entry_size
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """清空缓存目录中的所有缓存文件"""
+        for _, _, path in self.entries():
+            self.discard(path)
+
+    @staticmethod
+    def discard(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+
+_default_cache: ProgramCache | None = None
+
+def get_default_cache() -> ProgramCache:
+    """parse(..., cache=True) 使用的默认缓存"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ProgramCache()
+    return _default_cache
@@ -1,24 +1,109 @@
+import codecs
+import io
 from src.scanner.TokenDFA import *
 from src.scanner.Token import *
 from src.scanner.TokenType import TokenType
 
+STREAM_BLOCK_SIZE = 1 << 16  # 流式输入每次读取的字符（字节）数
+
+
+def new_decoder() -> io.IncrementalNewlineDecoder:
+    """UTF-8 增量解码器：与按文件读入相同，忽略非法字节并把 \r\n、\r 统一为 \n"""
+    return io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(errors="ignore"), translate=True)
+
 
 class Lexer:
-    def __init__(self, file_path: str):
-        self.file = open(file_path, "r", encoding="utf-8", errors="ignore")  # 打开源文件
+    """
+    源码三选一：
+      file_path：文件路径，一次性读入整个文件
+      text：内存中的源码（str，或按 UTF-8 解码的 bytes）
+      stream：文本流或二进制流（如 sys.stdin、sys.stdin.buffer、socket.makefile("rb")），
+              每次读入 block_size 个字符（字节），已扫描完的部分随即丢弃，大输入不会整个读进内存
+    """
+
+    def __init__(self, file_path: str = None, *, text: str | bytes = None, stream=None,
+                 block_size: int = STREAM_BLOCK_SIZE):
+        if (file_path is not None) + (text is not None) + (stream is not None) != 1:
+            raise ValueError("Exactly one of file_path, text or stream must be given")
+        self.stream = None  # 尚未读完的输入流（读完后置为 None）
+        self.decoder = None  # 二进制流的增量解码器（第一次读到 bytes 时创建）
+        self.block_size = block_size
+        if file_path is not None:
+            # 一次性读入整个源文件并统一转为大写（大小写不敏感），之后只移动整数游标
+            with open(file_path, "r", encoding="utf-8", errors="ignore") as file:
+                self.source: str = file.read().upper()
+        elif text is not None:
+            if isinstance(text, (bytes, bytearray, memoryview)):
+                text = new_decoder().decode(bytes(text), final=True)
+            self.source = text.upper()
+        else:
+            # 缓冲区只保存尚未扫描完的一段源码，get_token 扫描到末尾时再从流中读入下一块
+            self.stream = stream
+            self.source = ""
+        self.length: int = len(self.source)
         self.current_char: str = ""  # 当前读取的字符
-        self.position: int = 0  # 当前字符位置（用于错误提示）
+        self.position: int = 0  # 游标：下一个待读字符在缓冲区中的下标（也用于错误提示）
+        self.token_start: int = 0  # 最近一个记号的起始下标（记号本身不携带位置）；-1 表示该位置已被丢弃
+        self.token_location: tuple[int, int] = (1, 1)  # token_start 为 -1 时，丢弃前记下的记号位置
+        self.line_base: int = 0  # 已丢弃部分的行数
+        self.column_base: int = 0  # 已丢弃部分中当前行的字符数
+
+    def read_block(self) -> str | None:
+        """从流中读入下一块源码（二进制流按 UTF-8 增量解码）；流已读完时返回 None"""
+        while True:
+            chunk = self.stream.read(self.block_size)
+            if isinstance(chunk, str):
+                return chunk or None
+            if self.decoder is None:
+                self.decoder = new_decoder()
+            if not chunk:
+                return self.decoder.decode(b"", final=True) or None
+            text = self.decoder.decode(chunk)
+            if text:  # 整块都是不完整的多字节字符时继续读
+                return text
+
+    def fill(self, keep_from: int) -> bool:
+        """
+        流式输入：丢弃缓冲区中 keep_from 之前已扫描完的部分，再读入一块（各游标随之平移）
+        没有输入流或流已读完时缓冲区不变，返回 False
+        """
+        if self.stream is None:
+            return False
+        block = self.read_block()
+        if block is None:
+            self.stream = None
+            return False
+        source = self.source
+        if self.token_start < keep_from:
+            self.token_location = self.location()
+            self.token_start = -1
+        else:
+            self.token_start -= keep_from
+        newlines = source.count("\n", 0, keep_from)
+        if newlines:
+            self.line_base += newlines
+            self.column_base = keep_from - (source.rfind("\n", 0, keep_from) + 1)
+        else:
+            self.column_base += keep_from
+        self.source = source[keep_from:] + block.upper()
+        self.length = len(self.source)
+        self.position = max(self.position - keep_from, 0)
+        return True
 
     def get_char(self) -> str:
-        """读取下一个字符，统一转为大写（大小写不敏感）"""
-        self.current_char = self.file.read(1).upper()
+        """读取下一个字符（源码已统一转为大写）"""
+        if self.position >= self.length:
+            self.fill(self.position)
+        if self.position < self.length:
+            self.current_char = self.source[self.position]
+        else:
+            self.current_char = ""
         self.position += 1
         return self.current_char
 
     def back_char(self) -> None:
         """回退一个字符（文件结束或换行不回退）"""
         if self.current_char != "" and self.current_char != "\n":
-            self.file.seek(self.file.tell() - 1)
             self.position -= 1
             self.current_char = ""
 
@@ -32,45 +117,56 @@ class Lexer:
                 return ch
 
     def get_token(self) -> Token | None:
-        """核心函数：识别并返回一个记号"""
+        """核心函数：识别并返回一个记号（在缓冲区上移动游标，记号文本直接切片得到）"""
+        source = self.source
+        length = self.length
+        pos = min(self.position, length)
+        char_types = CHAR_TYPE_ARRAY
+        transitions = DENSE_TRANSITION_TABLE
         token = Token()
         while True:
             # 步骤1：预处理，跳过空白字符
-            first_char = self.pre_process()
-            if first_char == "":  # 文件结束
+            while pos < length and source[pos].isspace():
+                pos += 1
+            if pos >= length and self.fill(pos):  # 流式输入：缓冲区已扫描完，读入下一块
+                source, length, pos = self.source, self.length, 0
+                continue
+            if pos >= length:  # 文件结束
+                self.position = self.token_start = pos
                 token.type = TokenType.NONTOKEN
                 return token
 
             # 步骤2：DFA状态转移，扫描记号
-            current_state = 0  # 初态
-            token.lexeme = first_char  # 初始化记号文本
-            char_type = get_char_type(first_char)
-            current_state = TRANSITION_TABLE.get((current_state, char_type), -1) # 根据状态转移表获取下一个状态
+            start = self.token_start = pos
+            current_state = transitions[0][char_type_of(source[pos])] # 根据状态转移表获取下一个状态
+            pos += 1
 
             if current_state == -1:  # 初态转移失败（非法字符）
+                self.position = pos
                 token.type = TokenType.ERRTOKEN
-                token.lexeme = first_char
+                token.lexeme = source[start:pos]
                 return token
 
             # 继续扫描后续字符，直到无法转移
-            while True:
-                next_char = self.get_char()
-                if next_char == "":  # 文件结束，终止扫描
-                    break
-                next_char_type = get_char_type(next_char)
-                next_state = TRANSITION_TABLE.get((current_state, next_char_type), -1)
-                if next_state == -1:  # 无法转移，回退字符
-                    self.back_char()
+            while pos < length:
+                code = ord(source[pos])
+                next_char_type = char_types[code] if code < ASCII_TABLE_SIZE else get_char_type(source[pos])
+                next_state = transitions[current_state][next_char_type]
+                if next_state == -1:  # 无法转移，游标停在该字符上
                     break
-                # 可以转移，更新状态和记号文本
                 current_state = next_state
-                token.lexeme += next_char
+                pos += 1
+            if pos >= length and self.fill(start):
+                # 流式输入：记号可能延续到下一块，保留记号开头读入下一块后重新扫描
+                source, length, pos = self.source, self.length, 0
+                continue
+            self.position = pos
+            token.lexeme = source[start:pos]
 
             # 步骤3：后处理，根据终态确定记号类型
-            token.type = FINAL_STATE_TABLE.get(current_state, TokenType.ERRTOKEN)
+            token.type = FINAL_STATE_LIST[current_state]
             if token.type == TokenType.ERRTOKEN:
                 # 非终态，标记为非法记号
-                token.lexeme = token.lexeme  # 保留非法文本
                 return token
             elif token.type == TokenType.ID:
                 # 查符号表，细分ID类型
@@ -85,33 +181,64 @@ class Lexer:
                 return token
             elif token.type == TokenType.COMMENT:
                 # 跳过注释到行尾，重新扫描下一个记号
-                while True:
-                    comment_char = self.get_char()
-                    if comment_char == "" or comment_char == "\n":
-                        break
+                pos = self.skip_line_comment(pos)
+                source, length = self.source, self.length
                 continue  # 重新进入循环，获取下一个记号
             elif token.type == TokenType.COMMENT_START:
                 # 多行注释开始，跳过到结束符 */
-                while True:
-                    comment_char = self.get_char()
-                    if comment_char == "":  # 文件结束
-                        token.type = TokenType.ERRTOKEN
-                        token.lexeme = "Unterminated comment"
-                        return token
-                    if comment_char == "*":
-                        # 检查下一个字符是否为 /
-                        next_char = self.get_char()
-                        if next_char == "/":
-                            # 找到结束符 */
-                            break
-                        else:
-                            # 不是结束符，回退字符
-                            self.back_char()
+                pos = self.skip_block_comment(pos)
+                source, length = self.source, self.length
+                if pos == -1:  # 文件结束
+                    return self.unterminated_comment()
                 continue  # 继续进入循环，获取下一个记号
             else:
                 # 其他记号（运算符、分隔符、保留字）直接返回
                 return token
 
+    def skip_line_comment(self, pos: int) -> int:
+        """从 pos 跳过行注释到下一行开头，返回新的游标（流式输入时可能读入新块，调用方需重新读取 source）"""
+        source, length = self.source, self.length
+        line_end = source.find("\n", pos)
+        while line_end == -1 and self.fill(length):  # 流式输入：注释延续到下一块
+            source, length = self.source, self.length
+            line_end = source.find("\n")
+        return length if line_end == -1 else line_end + 1
+
+    def skip_block_comment(self, pos: int) -> int:
+        """从 pos 跳过多行注释到结束符 */ 之后，返回新的游标；没有结束符时返回 -1"""
+        source, length = self.source, self.length
+        comment_end = source.find("*/", pos)
+        while comment_end == -1 and self.fill(max(pos, length - 1)):
+            # 流式输入：保留最后一个字符（可能是 * ），读入下一块后继续查找
+            source, length, pos = self.source, self.length, 0
+            comment_end = source.find("*/")
+        return -1 if comment_end == -1 else comment_end + 2
+
+    def unterminated_comment(self) -> Token:
+        """多行注释没有结束符：游标移到末尾，返回非法记号"""
+        self.position = self.length
+        token = Token()
+        token.type = TokenType.ERRTOKEN
+        token.lexeme = "Unterminated comment"
+        return token
+
+    def location(self, index: int = None) -> tuple[int, int]:
+        """
+        把缓冲区下标换算为 (行号, 列号)，均从 1 开始；默认取最近一个记号的起始位置
+        流式输入时行号、列号从整个输入的开头算起
+        """
+        if index is None:
+            if self.token_start < 0:
+                return self.token_location
+            index = self.token_start
+        index = min(index, self.length)
+        line_start = self.source.rfind("\n", 0, index) + 1
+        line = self.line_base + self.source.count("\n", 0, index) + 1
+        column = index - line_start + 1 + (self.column_base if line_start == 0 else 0)
+        return line, column
+
     def close(self) -> None:
-        """关闭文件"""
-        self.file.close()
\ No newline at end of file
+        """释放缓冲区（文件在构造时已读完并关闭；输入流由调用方负责关闭）"""
+        self.source = ""
+        self.length = 0
+        self.stream = None
@@ -0,0 +1,80 @@
+from src.scanner.Lexer import Lexer
+from src.scanner.Token import Token, FrozenToken, lookup_symbol
+from src.scanner.TokenRegex import (GROUP_INDEX, ID_GROUP, CONST_ID_GROUP, COMMENT_GROUP, COMMENT_START_GROUP,
+                                    master_pattern, last_comment_marker)
+from src.scanner.TokenType import TokenType
+
+# 文本固定的运算符、分隔符记号：各分组共享一个只读记号（与符号表中的记号一样，语法分析器不修改记号）
+FIXED_TOKENS: dict[int, FrozenToken] = {
+    GROUP_INDEX[token_type.name]: FrozenToken(token_type, token_type.value)
+    for token_type in (TokenType.POWER, TokenType.MUL, TokenType.DIV, TokenType.MINUS, TokenType.PLUS,
+                       TokenType.SEMICO, TokenType.L_BRACKET, TokenType.R_BRACKET, TokenType.COMMA)
+}
+
+
+class RegexLexer(Lexer):
+    """
+    正则表达式引擎的词法分析器：每次 get_token 用主正则表达式（见 TokenRegex）匹配一次，
+    空白、注释与记号内部的逐字符扫描都在 re 引擎中完成；记号流（含 ERRTOKEN 与行列号）与 DFA 引擎逐个相同
+    源码输入、流式读入与 location 均沿用 Lexer
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.match = master_pattern().match
+
+    def get_token(self) -> Token:
+        """识别并返回一个记号"""
+        match_at = self.match
+        pos = min(self.position, self.length)
+        marker = ""  # 本次调用中最后跳过的注释开头（文件结束时作为 NONTOKEN 的文本，与 DFA 引擎一致）
+        while True:
+            source = self.source
+            length = self.length
+            match = match_at(source, pos)
+            end = match.end()
+            group = match.lastindex  # 匹配到的记号分组（None 表示只跳过了空白与注释）
+            if group is None and end > pos:
+                marker = last_comment_marker(source, pos, end) or marker
+            if end >= length and self.fill(end if group is None else match.start(group)):
+                # 流式输入：扫描到缓冲区末尾，记号可能延续到下一块，保留记号开头读入下一块后重新匹配
+                pos = 0
+                continue
+            if group is None:  # 文件结束
+                self.position = self.token_start = end
+                token = Token()
+                token.type = TokenType.NONTOKEN
+                token.lexeme = marker
+                return token
+
+            start = self.token_start = match.start(group)
+            self.position = end
+            fixed = FIXED_TOKENS.get(group)
+            if fixed is not None:
+                # 运算符、分隔符
+                return fixed
+            if group == ID_GROUP:
+                # 查符号表，细分ID类型
+                return lookup_symbol(source[start:end])
+            if group == COMMENT_GROUP:
+                # 没有换行的行注释：跳到行尾（流式输入时可能读入新块）
+                marker = source[start:end]
+                pos = self.skip_line_comment(end)
+                continue
+            if group == COMMENT_START_GROUP:
+                # 结束符不在缓冲区中的多行注释
+                marker = source[start:end]
+                pos = self.skip_block_comment(end)
+                if pos == -1:
+                    return self.unterminated_comment()
+                continue
+            token = Token()
+            token.lexeme = source[start:end]
+            if group == CONST_ID_GROUP:
+                # 转换为数值
+                try:
+                    token.value = float(token.lexeme)
+                    token.type = TokenType.CONST_ID
+                except ValueError:
+                    pass  # 无法转换（如上标数字），保持 ERRTOKEN
+            return token  # ERRTOKEN 分组：Token 的默认类别即为 ERRTOKEN
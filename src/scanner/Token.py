@@ -1,7 +1,11 @@
+import itertools
 import math
+import uuid
 from src.scanner.TokenType import TokenType
 
 class Token:
+    __slots__ = ("type", "lexeme", "value", "func_ptr")
+
     def __init__(self):
         self.type: TokenType = TokenType.ERRTOKEN  # 记号类别
         self.lexeme: str = ""  # 原始输入字符串
@@ -15,6 +19,30 @@ class Token:
         return (f"TOKEN_TYPE: {self.type.value:12} | TEXT: {self.lexeme:8} | "
                 f"VALUE:  {value_str} | FUNC_PTR: {func_addr}")
 
+
+class FrozenToken(Token):
+    """符号表中共享的只读记号模板（位置信息不存于记号，由 Lexer 单独记录）"""
+
+    __slots__ = ()
+
+    def __init__(self, token_type: TokenType, lexeme: str, value=0.0, func_ptr=None):
+        object.__setattr__(self, "type", token_type)
+        object.__setattr__(self, "lexeme", lexeme)
+        object.__setattr__(self, "value", value)
+        object.__setattr__(self, "func_ptr", func_ptr)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Token template '{self.lexeme}' is immutable")
+
+    def copy(self, lexeme: str = None) -> Token:
+        """复制为可修改的普通记号"""
+        token = Token()
+        token.type = self.type
+        token.lexeme = self.lexeme if lexeme is None else lexeme
+        token.value = self.value
+        token.func_ptr = self.func_ptr
+        return token
+
 # STYLE颜色映射表
 COLOR_MAP = {
     'RED': '#FF0000',
@@ -59,17 +87,58 @@ SYMBOL_TABLE = [
     ("WHITE", TokenType.COLOR, COLOR_MAP['WHITE'], None),
 ]
 
+# 符号表索引：lexeme → 共享的只读记号模板（导入时由 SYMBOL_TABLE 构建，O(1) 查找）
+SYMBOL_INDEX: dict[str, FrozenToken] = {
+    sym_lex: FrozenToken(sym_type, sym_lex, sym_val, sym_func)
+    for sym_lex, sym_type, sym_val, sym_func in SYMBOL_TABLE
+}
+
+# 允许运行时登记的记号类别
+REGISTRABLE_TYPES = (TokenType.CONST_ID, TokenType.FUNC, TokenType.COLOR)
+
+# 运行时登记的函数 → 行为版本标识（程序缓存据此区分同名的不同函数实现，内置函数不在其中）
+SYMBOL_VERSIONS: dict[str, str] = {}
+# 未给出 version 时的默认标识：本进程的随机前缀 + 登记序号，每次登记都不同
+_PROCESS_SALT = uuid.uuid4().hex
+_REGISTRATIONS = itertools.count()
+
+def register_symbol(lexeme: str, token_type: TokenType, value=0.0, func_ptr=None, replace: bool = False,
+                    version: str | None = None) -> FrozenToken:
+    """
+    运行时登记新的常数/函数/颜色，登记后与内置符号一样 O(1) 查找
+    replace 为假时不允许覆盖已有符号；为真时也只能覆盖已有的常数/函数/颜色，保留字、T 等不可覆盖
+    version：函数行为的版本标识，函数实现改变时必须随之改变（优化器会把常数参数的调用折叠进编译结果）
+             不给出时每次登记生成一个只在本进程内有效的标识，编译结果不会跨进程复用
+    """
+    lexeme_upper = lexeme.upper()
+    if not lexeme_upper or not (lexeme_upper[0].isalpha() or lexeme_upper[0] == "_") \
+            or not all(ch.isalnum() or ch == "_" for ch in lexeme_upper):
+        raise ValueError(f"Invalid symbol name: '{lexeme}'")
+    if token_type not in REGISTRABLE_TYPES:
+        raise ValueError(f"Cannot register symbol of type {token_type.value}")
+    if token_type == TokenType.FUNC and not callable(func_ptr):
+        raise ValueError(f"Function symbol '{lexeme}' requires a callable func_ptr")
+    existing = SYMBOL_INDEX.get(lexeme_upper)
+    if existing is not None:
+        if not replace:
+            raise ValueError(f"Symbol '{lexeme_upper}' is already defined")
+        if existing.type not in REGISTRABLE_TYPES:
+            raise ValueError(f"Cannot replace reserved symbol '{lexeme_upper}' ({existing.type.value})")
+
+    template = FrozenToken(token_type, lexeme_upper, value, func_ptr)
+    SYMBOL_TABLE[:] = [entry for entry in SYMBOL_TABLE if entry[0] != lexeme_upper]
+    SYMBOL_TABLE.append((lexeme_upper, token_type, value, func_ptr))
+    SYMBOL_INDEX[lexeme_upper] = template
+    SYMBOL_VERSIONS.pop(lexeme_upper, None)
+    if token_type == TokenType.FUNC:
+        SYMBOL_VERSIONS[lexeme_upper] = version if version is not None else f"{_PROCESS_SALT}:{next(_REGISTRATIONS)}"
+    return template
+
 def lookup_symbol(lexeme: str) -> Token:
-    """根据lexeme查询符号表，返回对应的Token"""
-    lexeme_upper = lexeme.upper()  # 大小写不敏感
-    for sym_lex, sym_type, sym_val, sym_func in SYMBOL_TABLE:
-        if sym_lex == lexeme_upper:
-            token = Token()
-            token.type = sym_type
-            token.lexeme = lexeme
-            token.value = sym_val
-            token.func_ptr = sym_func
-            return token
+    """根据lexeme查询符号表，返回对应的Token（符号表中的记号为共享只读模板）"""
+    template = SYMBOL_INDEX.get(lexeme.upper())  # 大小写不敏感
+    if template is not None:
+        return template if template.lexeme == lexeme else template.copy(lexeme)
     # 未找到：返回ID类型（理论上不会触发，因所有合法ID均在符号表中）
     token = Token()
     token.type = TokenType.ID
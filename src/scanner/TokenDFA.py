@@ -91,4 +91,27 @@ def get_char_type(ch: str) -> int:
     elif ch == "#":
         return 12
     else:
-        return 11  # 其他字符(空格也会到这里)
\ No newline at end of file
+        return 11  # 其他字符(空格也会到这里)
+
+# ---------------------------
+# 编译后的查表结构：导入时由上面的可读形式生成，词法分析器逐字符只做下标访问
+# ---------------------------
+CHAR_TYPE_COUNT = 13  # 字符类型数量（0~12）
+ASCII_TABLE_SIZE = 256  # 字符类型数组覆盖的码点范围，其余字符回退到 get_char_type
+
+# 码点 → 字符类型
+CHAR_TYPE_ARRAY: list[int] = [get_char_type(chr(code)) for code in range(ASCII_TABLE_SIZE)]
+
+# 稠密转移矩阵：DENSE_TRANSITION_TABLE[状态][字符类型] -> 下一状态（-1 表示无法转移）
+STATE_COUNT = 1 + max(max(state, next_state) for (state, _), next_state in TRANSITION_TABLE.items())
+DENSE_TRANSITION_TABLE: list[list[int]] = [[-1] * CHAR_TYPE_COUNT for _ in range(STATE_COUNT)]
+for (_state, _char_type), _next_state in TRANSITION_TABLE.items():
+    DENSE_TRANSITION_TABLE[_state][_char_type] = _next_state
+
+# 终态列表：FINAL_STATE_LIST[状态] -> 记号类别（非终态为 ERRTOKEN）
+FINAL_STATE_LIST: list[TokenType] = [FINAL_STATE_TABLE.get(state, TokenType.ERRTOKEN) for state in range(STATE_COUNT)]
+
+def char_type_of(ch: str) -> int:
+    """查表得到字符类型：码点在表内直接下标访问，否则回退到逐条判断"""
+    code = ord(ch)
+    return CHAR_TYPE_ARRAY[code] if code < ASCII_TABLE_SIZE else get_char_type(ch)
@@ -0,0 +1,94 @@
+import re
+import sys
+from functools import cache
+from src.scanner.TokenDFA import is_letter, is_digit
+from src.scanner.TokenType import TokenType
+
+# ---------------------------
+# 主正则表达式：把 TokenDFA 描述的整套记号文法写成一个带命名分组的正则表达式，
+# 逐字符的扫描交给 C 实现的 re 引擎，每个记号只在 Python 层做一次匹配
+# ---------------------------
+
+# 可以整段跳过的内容：空白、以换行结束的行注释、完整的多行注释
+# （没有换行的行注释与没有结束符的多行注释由记号分组 COMMENT / COMMENT_START 匹配开头，交给 Lexer 处理）
+SKIP_PATTERN = r"(?:\s+|(?://|--|\#)[^\n]*\n|/\*.*?\*/)*+"
+
+# 记号分组：按 DFA 的最长匹配规则排列，同一起始字符的多字符记号在前
+# 分组名即 TokenType 的成员名；编译时 {letter} 替换为一个字母，{word} 替换为一段字母或数字，{digits} 替换为一段数字
+TOKEN_PATTERNS = (
+    ("ID", "{letter}{word}*+"),
+    ("CONST_ID", r"{digits}++(?:\.{digits}*+)?"),
+    ("POWER", r"\*\*"),
+    ("MUL", r"\*"),
+    ("COMMENT", r"//|--|\#"),
+    ("COMMENT_START", r"/\*"),
+    ("DIV", "/"),
+    ("MINUS", "-"),
+    ("PLUS", r"\+"),
+    ("SEMICO", ";"),
+    ("L_BRACKET", r"\("),
+    ("R_BRACKET", r"\)"),
+    ("COMMA", ","),
+    ("ERRTOKEN", "."),  # 其余任何非空白字符（含单独的小数点）：初态转移失败
+)
+
+# SKIP_PATTERN 中的单项：第 1、2 分组为注释的开头
+SKIP_ITEM_PATTERN = re.compile(r"\s+|(//|--|\#)[^\n]*\n|(/\*).*?\*/", re.DOTALL)
+
+# 分组序号 → 记号类别（match.lastindex 直接作下标；0 号不用）
+GROUP_TYPES: list[TokenType | None] = [None] + [TokenType[name] for name, _ in TOKEN_PATTERNS]
+GROUP_INDEX: dict[str, int] = {name: index for index, (name, _) in enumerate(TOKEN_PATTERNS, 1)}
+ID_GROUP = GROUP_INDEX["ID"]
+CONST_ID_GROUP = GROUP_INDEX["CONST_ID"]
+COMMENT_GROUP = GROUP_INDEX["COMMENT"]
+COMMENT_START_GROUP = GROUP_INDEX["COMMENT_START"]
+
+
+def char_class(predicate, low: int, high: int) -> str:
+    """把字符判定函数在码点 [low, high) 上转换为等价的正则字符类（逐个码点判断，合并为区间）"""
+    ranges = []
+    start = None
+    for code in range(low, high + 1):
+        if code < high and predicate(chr(code)):
+            if start is None:
+                start = code
+        elif start is not None:
+            ranges.append(re.escape(chr(start)) if start == code - 1
+                          else f"{re.escape(chr(start))}-{re.escape(chr(code - 1))}")
+            start = None
+    return "[" + "".join(ranges) + "]"
+
+def split_class(predicate, run: bool) -> str:
+    """
+    predicate 对应的正则表达式（run 为真时匹配一段，否则匹配一个字符）：ASCII 字符直接查小字符类，
+    其余码点先用前瞻排除 ASCII 再查全 Unicode 的大字符类——re 对大字符类做不匹配检查时要逐个比较区间，
+    记号末尾的空格、运算符等每次都要做这种检查，不加前瞻时比 DFA 引擎还慢
+    """
+    ascii_class = char_class(predicate, 0, 0x80)
+    unicode_class = char_class(predicate, 0x80, sys.maxunicode + 1)
+    return f"(?:{ascii_class}{'++' if run else ''}|(?=[^\\x00-\\x7f]){unicode_class})"
+
+@cache
+def master_pattern() -> re.Pattern:
+    """
+    编译主正则表达式（首次使用时编译一次，约 0.2 秒）：跳过空白与注释，再匹配一个可选的记号分组
+    字符类由 TokenDFA 的 is_letter / is_digit 生成（含全部 Unicode 码点），与 DFA 的字符分类逐字符相同
+    """
+    classes = {
+        "letter": split_class(is_letter, run=False),
+        "word": split_class(lambda ch: is_letter(ch) or is_digit(ch), run=True),
+        "digits": split_class(is_digit, run=True),
+    }
+    tokens = "|".join(f"(?P<{name}>{pattern.format(**classes)})" for name, pattern in TOKEN_PATTERNS)
+    return re.compile(f"{SKIP_PATTERN}(?:{tokens})?", re.DOTALL)
+
+def last_comment_marker(source: str, start: int, end: int) -> str | None:
+    """
+    source[start:end] 是 SKIP_PATTERN 跳过的内容，返回其中最后一个注释的开头（//、--、# 或 /*），没有注释时返回 None
+    DFA 引擎在同一次 get_token 中跳过注释后遇到文件结束时，NONTOKEN 的文本为注释开头，正则引擎据此保持一致
+    """
+    marker = None
+    for item in SKIP_ITEM_PATTERN.finditer(source, start, end):
+        if item.lastindex is not None:
+            marker = item.group(item.lastindex)
+    return marker
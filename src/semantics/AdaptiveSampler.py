@@ -0,0 +1,59 @@
+import numpy as np
+
+# 初始均匀划分的段数：先用粗网格覆盖整条曲线，避免整段被一次弦高检查误判为平直
+INITIAL_SEGMENTS = 64
+
+
+def adaptive_indices(count: int, eval_points, tolerance: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    自适应采样：在 0 ~ count-1 号网格点（即固定步长的各个 T）中选出需要求值的点
+    eval_points(indices) 返回这些网格点变换后的坐标 (xs, ys)
+    一段 [i, j] 的弦与曲线在中间网格点 m 处的距离超过 tolerance（或出现非有限值）时二分该段，
+    相邻网格点之间不再细分，因此 STEP 就是最细的取样间隔
+    逐层广度优先：每层所有待检查段的中点一次求值（numpy 引擎可整层向量化）
+    返回按 T 排序的 (网格下标, xs, ys)
+    """
+    if count <= 0:
+        empty = np.empty(0)
+        return empty.astype(np.int64), empty, empty
+
+    spacing = max(1, (count - 1) // INITIAL_SEGMENTS)
+    indices = np.unique(np.append(np.arange(0, count, spacing), count - 1))
+    xs, ys = eval_points(indices)
+    all_indices, all_xs, all_ys = [indices], [xs], [ys]
+
+    # 待检查的段：相邻两点之间还有未取样的网格点
+    gaps = np.diff(indices) > 1
+    left, right = indices[:-1][gaps], indices[1:][gaps]
+    left_x, left_y = xs[:-1][gaps], ys[:-1][gaps]
+    right_x, right_y = xs[1:][gaps], ys[1:][gaps]
+
+    while len(left):
+        mid = (left + right) // 2
+        mid_x, mid_y = eval_points(mid)
+        all_indices.append(mid)
+        all_xs.append(mid_x)
+        all_ys.append(mid_y)
+
+        with np.errstate(invalid="ignore"):
+            # 中间网格点不一定正好在段的正中（段长为奇数时），弦上的对应点按下标比例插值
+            frac = (mid - left) / (right - left)
+            deviation = np.hypot(mid_x - (left_x + frac * (right_x - left_x)),
+                                 mid_y - (left_y + frac * (right_y - left_y)))
+            split = ~(deviation <= tolerance)  # NaN / 无穷大也继续细分
+
+        # 需要细分的段拆成 [left, mid] 与 [mid, right]，只保留仍有空隙的子段
+        left_half = split & (mid - left > 1)
+        right_half = split & (right - mid > 1)
+        left, right, left_x, left_y, right_x, right_y = (
+            np.concatenate((left[left_half], mid[right_half])),
+            np.concatenate((mid[left_half], right[right_half])),
+            np.concatenate((left_x[left_half], mid_x[right_half])),
+            np.concatenate((left_y[left_half], mid_y[right_half])),
+            np.concatenate((mid_x[left_half], right_x[right_half])),
+            np.concatenate((mid_y[left_half], right_y[right_half])),
+        )
+
+    indices = np.concatenate(all_indices)
+    order = np.argsort(indices, kind="stable")
+    return indices[order], np.concatenate(all_xs)[order], np.concatenate(all_ys)[order]
@@ -0,0 +1,83 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:  # 没有 numpy 时整段变换使用纯 Python 实现
+    np = None
+
+# 2×3 仿射矩阵 (a, b, c, d, e, f)：
+#   x' = a * x + b * y + e
+#   y' = c * x + d * y + f
+Affine = tuple[float, float, float, float, float, float]
+
+IDENTITY: Affine = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+def translate(dx: float, dy: float) -> Affine:
+    """平移"""
+    return 1.0, 0.0, 0.0, 1.0, dx, dy
+
+def scale(sx: float, sy: float) -> Affine:
+    """缩放"""
+    return sx, 0.0, 0.0, sy, 0.0, 0.0
+
+def rotate(angle: float) -> Affine:
+    """旋转（弧度）：与 ROT 语句的定义一致，x' = x·cos + y·sin，y' = y·cos − x·sin"""
+    cos_ang = math.cos(angle)
+    sin_ang = math.sin(angle)
+    return cos_ang, sin_ang, -sin_ang, cos_ang, 0.0, 0.0
+
+def compose(*matrices: Affine) -> Affine:
+    """
+    复合变换：compose(m1, m2, ..., mn) 先做 mn，最后做 m1（与矩阵乘法 m1 · m2 · ... · mn 相同）
+    变换栈可以把栈中各层依次复合为一个矩阵，逐点只需一次矩阵运算
+    """
+    result = IDENTITY
+    for a2, b2, c2, d2, e2, f2 in matrices:
+        a1, b1, c1, d1, e1, f1 = result
+        result = (
+            a1 * a2 + b1 * c2,
+            a1 * b2 + b1 * d2,
+            c1 * a2 + d1 * c2,
+            c1 * b2 + d1 * d2,
+            a1 * e2 + b1 * f2 + e1,
+            c1 * e2 + d1 * f2 + f1,
+        )
+    return result
+
+def drawing_transform(origin_x: float, origin_y: float, rot_ang: float, scale_x: float, scale_y: float) -> Affine:
+    """
+    ORIGIN / SCALE / ROT 语句确定的绘图变换：原始坐标 → 缩放 → 旋转 → 平移
+    各项直接写出，不经过 compose，避免与单位矩阵相乘带来的额外舍入
+    """
+    cos_ang = math.cos(rot_ang)
+    sin_ang = math.sin(rot_ang)
+    return (scale_x * cos_ang, scale_y * sin_ang,
+            -scale_x * sin_ang, scale_y * cos_ang,
+            origin_x, origin_y)
+
+
+def apply_point(matrix: Affine, x: float, y: float) -> tuple[float, float]:
+    """变换一个点"""
+    a, b, c, d, e, f = matrix
+    return a * x + b * y + e, c * x + d * y + f
+
+def apply_lists(matrix: Affine, xs, ys) -> tuple[list[float], list[float]]:
+    """纯 Python 实现：一次变换整段坐标（逐点结果与 apply_arrays 逐位相同）"""
+    a, b, c, d, e, f = matrix
+    return ([a * x + b * y + e for x, y in zip(xs, ys)],
+            [c * x + d * y + f for x, y in zip(xs, ys)])
+
+def apply_arrays(matrix: Affine, xs, ys):
+    """numpy 实现：整段坐标一次变换，返回两个新数组（NaN/无穷大按 IEEE 规则传播，不报警告）"""
+    a, b, c, d, e, f = matrix
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    with np.errstate(all="ignore"):
+        return a * xs + b * ys + e, c * xs + d * ys + f
+
+def apply_points(matrix: Affine, xs, ys):
+    """变换整段坐标：有 numpy 时返回数组，否则退回纯 Python 实现返回列表"""
+    if np is None:
+        return apply_lists(matrix, xs, ys)
+    return apply_arrays(matrix, xs, ys)
@@ -0,0 +1,60 @@
+import logging
+import numpy as np
+import matplotlib.pyplot as plt
+
+logger = logging.getLogger(__name__)
+
+# 抽稀网格的边长（像素）：同一网格内连续的点只保留首尾两个，偏差不超过该值
+DECIMATE_CELL_PIXELS = 0.5
+
+
+def cell_size(ax: plt.Axes, xs: np.ndarray, ys: np.ndarray) -> tuple[float, float]:
+    """
+    抽稀网格的大小（数据坐标单位）：取坐标轴当前分辨率与最终分辨率下界中较细的一个
+    执行结束后坐标轴范围会按所有曲线重新设置，范围至少覆盖本曲线，
+    因此 "本曲线跨度 / 坐标轴像素数" 不大于最终每像素对应的数据长度
+    """
+    origin_x, origin_y = ax.transData.transform((0.0, 0.0))
+    unit_x, unit_y = ax.transData.transform((1.0, 1.0))
+    current_x = 1.0 / abs(unit_x - origin_x)
+    current_y = 1.0 / abs(unit_y - origin_y)
+
+    position = ax.get_position(original=True)
+    width_px = position.width * ax.figure.bbox.width
+    height_px = position.height * ax.figure.bbox.height
+    span_x = float(np.nanmax(xs) - np.nanmin(xs))
+    span_y = float(np.nanmax(ys) - np.nanmin(ys))
+
+    cell_x = min(current_x, span_x / width_px) if span_x > 0 else current_x
+    cell_y = min(current_y, span_y / height_px) if span_y > 0 else current_y
+    return cell_x * DECIMATE_CELL_PIXELS, cell_y * DECIMATE_CELL_PIXELS
+
+def decimate_points(xs: np.ndarray, ys: np.ndarray, cell_x: float, cell_y: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    折线抽稀：按网格划分平面，连续落在同一网格内的一串点只保留第一个和最后一个
+    曲线离开网格的位置不变，视觉偏差不超过一个网格；NaN/无穷大点及其前后的点都保留
+    """
+    if len(xs) <= 2:
+        return xs, ys
+    with np.errstate(invalid="ignore"):
+        cell_col = np.floor(xs / cell_x)
+        cell_row = np.floor(ys / cell_y)
+    changed = (cell_col[1:] != cell_col[:-1]) | (cell_row[1:] != cell_row[:-1])
+    keep = np.ones(len(xs), dtype=bool)
+    # 保留每串的首点（与前一点不同格）和末点（与后一点不同格）
+    keep[1:-1] = changed[:-1] | changed[1:]
+    return xs[keep], ys[keep]
+
+def decimate_for_axes(ax: plt.Axes, xs, ys) -> tuple[np.ndarray, np.ndarray]:
+    """按坐标轴像素分辨率抽稀一条曲线"""
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    if len(xs) <= 2 or not np.isfinite(xs).any() or not np.isfinite(ys).any():
+        return xs, ys
+    cell_x, cell_y = cell_size(ax, xs[np.isfinite(xs)], ys[np.isfinite(ys)])
+    return decimate_points(xs, ys, cell_x, cell_y)
+
+def report_decimation(before: int, after: int) -> None:
+    """打印抽稀前后的点数与压缩比"""
+    ratio = before / after if after else 1.0
+    logger.debug("抽稀后绘制点数：%d（原 %d 个，%.1f×）", after, before, ratio)
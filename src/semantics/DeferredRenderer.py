@@ -0,0 +1,72 @@
+import logging
+import numpy as np
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from src.semantics.Profiler import Profiler, measure
+
+logger = logging.getLogger(__name__)
+
+
+def split_finite(xs: np.ndarray, ys: np.ndarray) -> list[np.ndarray]:
+    """按 NaN/无穷大点把曲线断开（与 ax.plot 的处理一致），返回各段的 (N, 2) 坐标数组"""
+    points = np.column_stack((xs, ys))
+    finite = np.isfinite(points).all(axis=1)
+    if finite.all():
+        return [points] if len(points) else []
+    # 连续有限点的起止下标
+    edges = np.diff(np.concatenate(([False], finite, [False])).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    stops = np.flatnonzero(edges == -1)
+    return [points[start:stop] for start, stop in zip(starts, stops)]
+
+
+class DeferredRenderer:
+    """
+    延迟绘制：执行期间只记录每条曲线及其样式，程序结束时按样式合并为 LineCollection 一次性加入坐标轴
+    样式相同的曲线共用一个 LineCollection；不同样式之间的叠放顺序按样式首次出现的顺序
+    """
+
+    def __init__(self, ax: plt.Axes, profiler: Profiler = None):
+        self.ax = ax
+        self.profiler = profiler  # 性能剖析（None 表示不剖析）
+        self.groups: dict[tuple, list[np.ndarray]] = {}  # (颜色, 透明度, 线宽) → 曲线段列表
+        self.curve_count = 0
+        self.point_count = 0
+
+    def add(self, xs, ys, style: dict, new_curve: bool = True) -> None:
+        """按样式（StyleConfig 格式）记录一条曲线；流式绘制时同一曲线的后续各块 new_curve 为假"""
+        key = (style["color"], style.get("opacity", 1.0), style["line_width"])
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        self.groups.setdefault(key, []).extend(split_finite(xs, ys))
+        self.curve_count += new_curve
+        self.point_count += len(xs)
+
+    def flush(self) -> int:
+        """把记录的曲线加入坐标轴并重绘一次画布，返回生成的 LineCollection 数量"""
+        collections = 0
+        for (color, alpha, line_width), segments in self.groups.items():
+            if not segments:
+                continue
+            collection = LineCollection(
+                segments,
+                colors=color,
+                linewidths=line_width,
+                alpha=alpha,
+                capstyle=mpl.rcParams["lines.solid_capstyle"],
+                joinstyle=mpl.rcParams["lines.solid_joinstyle"],
+            )
+            self.ax.add_collection(collection)
+            collections += 1
+        if self.curve_count:
+            logger.debug("延迟绘制：%d 条曲线（%d 个点）合并为 %d 个 LineCollection",
+                         self.curve_count, self.point_count, collections)
+        self.groups = {}
+        self.curve_count = self.point_count = 0
+        with measure(self.profiler, "canvas_draw"):
+            self.ax.figure.canvas.draw()
+        if self.profiler is not None:
+            self.profiler.count("draw_calls", collections)
+            self.profiler.count("canvas_draws")
+        return collections
@@ -0,0 +1,191 @@
+import logging
+from collections.abc import Callable
+from collections import deque
+import numpy as np
+import matplotlib.pyplot as plt
+from src.parser.Program import Program, Statement, OriginStatement, ScaleStatement, RotStatement, StyleStatement, ForStatement
+from src.semantics.SemanticUtils import get_expr_value, cache_points, batch_draw, stream_points
+from src.semantics.PointSink import PointSink, BoundsSink, AxesSink
+from src.semantics.DeferredRenderer import DeferredRenderer
+from src.semantics.SemanticContext import Context
+from src.semantics.ParallelEval import get_pool, submit_for, collect_for, discard_for, split_for
+from src.semantics.Profiler import measure, measure_statement, statement_kind
+
+logger = logging.getLogger(__name__)
+
+
+def exec_origin(ctx: Context, stmt: OriginStatement) -> None:
+    """语义动作: 计算并设置平移原点"""
+    ctx.Origin_x = get_expr_value(stmt.x_expr)
+    ctx.Origin_y = get_expr_value(stmt.y_expr)
+    ctx.update_transform()
+    count_evaluations(ctx, 2)
+    logger.debug("Origin set to (%s, %s)", ctx.Origin_x, ctx.Origin_y)
+
+def exec_scale(ctx: Context, stmt: ScaleStatement) -> None:
+    """语义动作: 计算缩放因子并设置"""
+    ctx.Scale_x = get_expr_value(stmt.x_expr)
+    ctx.Scale_y = get_expr_value(stmt.y_expr)
+    ctx.update_transform()
+    count_evaluations(ctx, 2)
+    logger.debug("Scale set to (%s, %s)", ctx.Scale_x, ctx.Scale_y)
+
+def exec_rot(ctx: Context, stmt: RotStatement) -> None:
+    """语义动作: 计算旋转角度并设置"""
+    ctx.Rot_ang = get_expr_value(stmt.angle_expr)
+    ctx.update_transform()
+    count_evaluations(ctx, 1)
+    logger.debug("Rot set to %s", ctx.Rot_ang)
+
+def exec_style(ctx: Context, stmt: StyleStatement) -> None:
+    """语义动作: 更新上下文中的样式配置（仅覆盖指定的项，未指定项保留原值）"""
+    if stmt.color is not None:
+        ctx.StyleConfig["color"] = stmt.color
+    if stmt.opacity is not None:
+        ctx.StyleConfig["opacity"] = stmt.opacity
+    if stmt.line_width is not None:
+        ctx.StyleConfig["line_width"] = stmt.line_width
+    logger.debug("Style set to Color=%s, Opacity=%.2f, Line Width=%.2f",
+                 ctx.StyleConfig["color"], ctx.StyleConfig["opacity"], ctx.StyleConfig["line_width"])
+
+def exec_for(ctx: Context, stmt: ForStatement, ax: plt.Axes, sinks: list[PointSink] = (), renderer: DeferredRenderer = None) -> None:
+    """
+    语义动作: 计算所有点并绘制
+    设置了 chunk_size 选项时改为流式生成，坐标点逐块交给坐标范围统计、ax 以及 sinks
+    renderer 不为 None 时曲线只记入延迟绘制队列
+    """
+    chunk_size = ctx.Options["chunk_size"]
+    if chunk_size:
+        stream_sinks = [BoundsSink(ctx)]
+        if ax is not None:
+            stream_sinks.append(AxesSink(ctx, ax, renderer))
+        stream_sinks.extend(sinks)
+        with measure(ctx.profiler, "stream"):
+            total = stream_points(ctx, stmt.start_expr, stmt.end_expr, stmt.step_expr, stmt.x_expr, stmt.y_expr,
+                                  stream_sinks, chunk_size)
+        count_points(ctx, total)
+        return
+    # 缓存点（点数很多时按 T 分段交给多个进程）
+    with measure(ctx.profiler, "cache_points"):
+        if not split_for(ctx, stmt):
+            cache_points(ctx, stmt.start_expr, stmt.end_expr, stmt.step_expr, stmt.x_expr, stmt.y_expr)
+    count_points(ctx, len(ctx.CachedPoints["x"]))
+    draw_cached(ctx, ax, sinks, renderer)
+
+def draw_cached(ctx: Context, ax: plt.Axes, sinks: list[PointSink] = (), renderer: DeferredRenderer = None) -> None:
+    """绘制 ctx.CachedPoints 中的一条曲线，并交给各个 sinks"""
+    with measure(ctx.profiler, "draw"):
+        batch_draw(ctx, ax, renderer)  # 批量绘制
+    for sink in sinks:
+        sink.begin(ctx.StyleConfig)
+        sink.write(np.asarray(ctx.CachedPoints["x"], dtype=float), np.asarray(ctx.CachedPoints["y"], dtype=float))
+        sink.end()
+
+def count_evaluations(ctx: Context, evaluations: int) -> None:
+    """剖析时累计表达式求值次数"""
+    if ctx.profiler is not None:
+        ctx.profiler.count("evaluations", evaluations)
+
+def count_points(ctx: Context, points: int) -> None:
+    """剖析时累计一条 FOR 语句的坐标点数与求值次数（起止值、步长各一次，每点 x、y 各一次）"""
+    if ctx.profiler is not None:
+        ctx.profiler.count("points", points)
+        ctx.profiler.count("evaluations", 3 + 2 * points)
+
+def execute_statement(ctx: Context, stmt: Statement, ax: plt.Axes, sinks: list[PointSink] = (),
+                      renderer: DeferredRenderer = None) -> None:
+    """按语句类型分派语义动作"""
+    if isinstance(stmt, ForStatement):
+        exec_for(ctx, stmt, ax, sinks, renderer)
+    elif isinstance(stmt, OriginStatement):
+        exec_origin(ctx, stmt)
+    elif isinstance(stmt, ScaleStatement):
+        exec_scale(ctx, stmt)
+    elif isinstance(stmt, RotStatement):
+        exec_rot(ctx, stmt)
+    elif isinstance(stmt, StyleStatement):
+        exec_style(ctx, stmt)
+    else:
+        raise TypeError(f"Unknown statement type: {type(stmt).__name__}")
+
+def parallel_workers(ctx: Context) -> int:
+    """语句级并行的工作进程数；不并行时返回 0（流式生成要求逐块处理，不并行）"""
+    workers = ctx.Options["workers"]
+    if not workers or workers <= 1 or ctx.Options["chunk_size"]:
+        return 0
+    return workers
+
+def execute_parallel(program: Program, ctx: Context, ax: plt.Axes = None, sinks: list[PointSink] = (),
+                     renderer: DeferredRenderer = None, progress: Callable[[int, int], None] = None) -> None:
+    """
+    语句级并行执行：ORIGIN/SCALE/ROT/STYLE 语句在本进程中依次执行，
+    每条 FOR 语句连同当时的坐标变换与样式快照交给进程池计算坐标点，结果经共享内存取回后按源码顺序绘制
+    出错时先绘制出错语句之前的曲线再抛出错误，与逐条执行一致
+    """
+    pool = get_pool(parallel_workers(ctx))
+    pending = deque()  # (语句序号, 上下文快照, FOR 语句, Future)，按源码顺序
+    error = None
+    try:
+        for index, stmt in enumerate(program):
+            if isinstance(stmt, ForStatement):
+                snapshot = ctx.snapshot()
+                pending.append((index, snapshot, stmt, submit_for(pool, snapshot, stmt)))
+            else:
+                with measure_statement(ctx.profiler, index, statement_kind(stmt)):
+                    execute_statement(ctx, stmt, ax, sinks, renderer)
+    except Exception as e:
+        error = e
+
+    try:
+        while pending:
+            index, snapshot, stmt, future = pending.popleft()
+            snapshot.AxisRange = ctx.AxisRange
+            snapshot.profiler = ctx.profiler
+            with measure_statement(ctx.profiler, index, "FOR"):
+                with measure(ctx.profiler, "collect"):
+                    collect_for(snapshot, stmt, future)
+                count_points(snapshot, len(snapshot.CachedPoints["x"]))
+                draw_cached(snapshot, ax, sinks, renderer)
+            ctx.CachedPoints, ctx.AxisRange, ctx.Parameter_T = snapshot.CachedPoints, snapshot.AxisRange, snapshot.Parameter_T
+            if progress is not None:
+                progress(index + 1, len(program))
+    finally:
+        for _, _, _, future in pending:
+            discard_for(future)
+    if error is not None:
+        raise error
+    if progress is not None:
+        progress(len(program), len(program))
+
+def execute(program: Program, ctx: Context, ax: plt.Axes = None, reset: bool = True,
+            sinks: list[PointSink] = (), progress: Callable[[int, int], None] = None) -> None:
+    """
+    执行器入口：在绘图上下文 ctx 中按顺序执行 Program 的所有语句（执行选项取自 ctx.Options）
+    ax：绘图目标（为 None 时只计算坐标与范围，不绘制）
+    reset：执行前重置绘图上下文，使同一 Program 可以反复执行
+    sinks：额外的坐标点接收端（如 FileSink），每条 FOR 语句的点都会交给它们，执行结束后关闭
+    开启 deferred 选项时所有曲线在程序结束后按样式合并为 LineCollection，只重绘一次画布
+    workers 选项大于 1 时各条 FOR 语句在进程池中并行计算（见 execute_parallel）
+    progress：进度回调 progress(已执行语句数, 语句总数)，每条语句执行（并行时每条曲线绘制）后调用，可在其中抛出异常中止执行
+    ctx.profiler 不为 None 时记录各阶段耗时与按语句的计数器（见 Profiler）
+    """
+    if reset:
+        ctx.reset()
+    profiler = ctx.profiler
+    renderer = DeferredRenderer(ax, profiler) if ax is not None and ctx.Options["deferred"] else None
+    with measure(profiler, "execute"):
+        try:
+            if parallel_workers(ctx):
+                execute_parallel(program, ctx, ax, sinks, renderer, progress)
+            else:
+                for index, stmt in enumerate(program):
+                    with measure_statement(profiler, index, statement_kind(stmt)):
+                        execute_statement(ctx, stmt, ax, sinks, renderer)
+                    if progress is not None:
+                        progress(index + 1, len(program))
+        finally:
+            for sink in sinks:
+                sink.close()
+            if renderer is not None:
+                with measure(profiler, "draw"):
+                    renderer.flush()  # 出错时也绘制已执行语句的曲线，与逐条绘制一致
@@ -0,0 +1,157 @@
+import math
+import weakref
+from typing import Callable
+from src.parser.ExprNode import ExprNode
+from src.parser.ExprDag import ExprDag, small_power
+from src.scanner.TokenType import TokenType
+
+# 已编译函数缓存：语法树根节点 / DAG → Python 函数（语法树释放后自动失效）
+_COMPILE_CACHE: "weakref.WeakKeyDictionary[ExprNode | ExprDag, Callable]" = weakref.WeakKeyDictionary()
+
+# FOR 语句 (x, y) 两个根节点 → 合并编译的函数：x 根 → {y 根 → 函数}（任一语法树释放后自动失效）
+_XY_CACHE: "weakref.WeakKeyDictionary[ExprNode, weakref.WeakKeyDictionary[ExprNode, Callable]]" = \
+    weakref.WeakKeyDictionary()
+
+_BINARY_OPS = {
+    TokenType.PLUS: "+",
+    TokenType.MINUS: "-",
+    TokenType.MUL: "*",
+    TokenType.DIV: "/",
+}
+
+
+class _CodeGen:
+    """
+    把语法树展开为三地址形式的 Python 源码（每个内部节点一个临时变量）
+    同一个节点对象（DAG 中的共享子表达式）只生成一次
+    """
+
+    def __init__(self):
+        self.lines: list[str] = []
+        self.namespace: dict = {"_pow": math.pow, "_isinf": math.isinf, "_isfinite": math.isfinite}
+        self.temp_count = 0
+        self.emitted: dict[int, str] = {}
+
+    def bind(self, prefix: str, value) -> str:
+        """把常数/函数指针绑定到生成代码的全局名字空间，返回引用名"""
+        name = f"_{prefix}{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def new_temp(self) -> str:
+        name = f"_v{self.temp_count}"
+        self.temp_count += 1
+        return name
+
+    def emit(self, root: ExprNode) -> str:
+        """生成计算 root 的语句，返回保存结果的名字"""
+        if root is None:
+            return "0.0"
+        if id(root) not in self.emitted:
+            self.emitted[id(root)] = self.emit_node(root)
+        return self.emitted[id(root)]
+
+    def emit_node(self, root: ExprNode) -> str:
+
+        op_code = root.op_code
+        if op_code == TokenType.CONST_ID:
+            return self.bind("c", root.const_val)
+        elif op_code == TokenType.T:
+            return "T"
+        elif op_code == TokenType.FUNC:
+            child = self.emit(root.child)
+            if root.func_ptr is None:
+                return "0.0"
+            func = self.bind("f", root.func_ptr)
+            temp = self.new_temp()
+            self.lines.append(f"{temp} = {func}({child})")
+            return temp
+        elif op_code == TokenType.MINUS and root.child is not None:
+            child = self.emit(root.child)
+            temp = self.new_temp()
+            self.lines.append(f"{temp} = -{child}")
+            return temp
+        elif op_code in _BINARY_OPS or op_code == TokenType.POWER:
+            left = self.emit(root.left)
+            right = self.emit(root.right)
+            temp = self.new_temp()
+            if op_code == TokenType.POWER:
+                exponent = small_power(root)
+                if exponent is None:
+                    self.lines.append(f"{temp} = _pow({left}, {right})")
+                    return temp
+                # 小整数幂展开为连乘；溢出时与 math.pow 一样报错（见 ExprDag.checked_power）
+                product = f"{left} * {left}" if exponent == 2.0 else f"{left} * {left} * {left}"
+                self.lines.append(f"{temp} = {product}")
+                self.lines.append(f"if _isinf({temp}) and _isfinite({left}): raise OverflowError('math range error')")
+                return temp
+            if op_code == TokenType.DIV and not (root.right is not None
+                                                 and root.right.op_code == TokenType.CONST_ID
+                                                 and root.right.const_val != 0):
+                self.lines.append(f"if {right} == 0: raise ZeroDivisionError('Division by zero in expression')")
+            self.lines.append(f"{temp} = {left} {_BINARY_OPS[op_code]} {right}")
+            return temp
+        else:
+            return "0.0"
+
+
+def build_function(roots: tuple[ExprNode, ...], as_tuple: bool) -> Callable:
+    """生成并编译函数源码；as_tuple 为真时返回各根节点值组成的元组"""
+    gen = _CodeGen()
+    results = [gen.emit(root) for root in roots]
+    body = "".join(f"    {line}\n" for line in gen.lines)
+    result = f"({', '.join(results)},)" if as_tuple else results[0]
+    source = f"def _expr(T):\n{body}    return {result}\n"
+    exec(compile(source, "<ExprCompiler>", "exec"), gen.namespace)
+    func = gen.namespace["_expr"]
+    func.source = source
+    return func
+
+
+def compile_expr(root: ExprNode) -> Callable[[float], float]:
+    """
+    把表达式语法树编译为一个 Python 函数 f(T) -> float
+    结果按语法树缓存，同一棵树只编译一次
+    """
+    try:
+        return _COMPILE_CACHE[root]
+    except (KeyError, TypeError):
+        pass
+
+    func = build_function((root,), as_tuple=False)
+    if root is not None:
+        _COMPILE_CACHE[root] = func
+    return func
+
+
+def compile_dag(dag: ExprDag) -> Callable[[float], tuple]:
+    """
+    把 DAG 的全部根节点编译为一个函数 f(T) -> (值1, 值2, ...)
+    共享子表达式在函数体内只计算一次
+    """
+    try:
+        return _COMPILE_CACHE[dag]
+    except KeyError:
+        pass
+
+    func = build_function(dag.roots, as_tuple=True)
+    _COMPILE_CACHE[dag] = func
+    return func
+
+
+def compile_xy(x_expr: ExprNode, y_expr: ExprNode) -> Callable[[float], tuple]:
+    """
+    把 FOR 语句的 x/y 表达式合并编译为一个函数 f(T) -> (x, y)（共享子表达式只计算一次）
+    结果按 (x_expr, y_expr) 根节点对缓存：同一语句每次执行都不再重新构建 DAG、生成代码
+    """
+    by_y = _XY_CACHE.get(x_expr)
+    if by_y is None:
+        by_y = _XY_CACHE[x_expr] = weakref.WeakKeyDictionary()
+    try:
+        return by_y[y_expr]
+    except KeyError:
+        pass
+
+    func = build_function(ExprDag(x_expr, y_expr).roots, as_tuple=True)
+    by_y[y_expr] = func
+    return func
@@ -0,0 +1,51 @@
+import matplotlib.pyplot as plt
+from src.parser.Parser import parse_program, parse_program_string, parse_program_stream
+from src.parser.Program import Program
+from src.parser.ProgramCache import ProgramCache
+from src.semantics.Executor import execute
+from src.semantics.PointSink import PointSink
+from src.semantics.Profiler import Profiler
+from src.semantics.SemanticContext import Context, make_options
+
+
+class Interpreter:
+    """
+    解释器：保存执行选项与程序缓存设置，每次执行使用一个新的 Context（绘图上下文）
+    解释器本身执行期间不被修改，同一个实例可以在线程池中同时渲染多个脚本
+    """
+
+    def __init__(self, options: dict = None, cache: bool | ProgramCache = False, **overrides):
+        self.options = make_options(options, **overrides)  # 进程默认值 + options + overrides
+        self.cache = cache  # 见 parse_program 的 cache 参数
+
+    def new_context(self, profiler: Profiler = None) -> Context:
+        """按本解释器的选项新建一个绘图上下文（profiler 不为 None 时记录执行各阶段的耗时与计数器）"""
+        return Context(self.options, profiler)
+
+    def compile(self, file_path: str, profiler: Profiler = None) -> Program:
+        """编译脚本（语法错误以 SyntaxError 抛出）"""
+        return parse_program(file_path, self.cache, profiler, **self.options)
+
+    def compile_string(self, text: str | bytes, profiler: Profiler = None) -> Program:
+        """编译内存中的源码（str 或 UTF-8 编码的 bytes）"""
+        return parse_program_string(text, self.cache, profiler, **self.options)
+
+    def compile_stream(self, stream, profiler: Profiler = None) -> Program:
+        """编译文本流或二进制流中的源码（分块读入，不使用程序缓存）"""
+        return parse_program_stream(stream, profiler, **self.options)
+
+    def execute(self, program: Program, ax: plt.Axes = None, context: Context = None,
+                sinks: list[PointSink] = ()) -> Context:
+        """
+        在 context（为 None 时新建）中执行 Program，返回执行后的上下文（可从中读取 AxisRange 等）
+        执行选项取自 context.Options
+        """
+        ctx = context if context is not None else self.new_context()
+        execute(program, ctx, ax, sinks=sinks)
+        return ctx
+
+    def run(self, file_path: str, ax: plt.Axes = None, context: Context = None,
+            sinks: list[PointSink] = ()) -> tuple[Program, Context]:
+        """编译并执行一个脚本，返回 (Program, 执行后的上下文)"""
+        program = self.compile(file_path)
+        return program, self.execute(program, ax, context, sinks)
@@ -0,0 +1,293 @@
+import logging
+import math
+import os
+import pickle
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from src.parser.Program import ForStatement
+from src.semantics.SemanticContext import Context
+from src.semantics.SemanticUtils import get_expr_value, cache_points, make_point_func, transform_points
+from src.semantics.VectorEval import ScalarFallback, iter_t_chunks, calc_coord_array
+
+logger = logging.getLogger(__name__)
+# 本项目所有日志的上级 logger（src）：工作进程中收集其下的日志记录
+package_logger = logging.getLogger(__name__.split(".")[0])
+
+# 单条 FOR 语句分段并行时扫描与求值 T 序列的块大小
+SPLIT_CHUNK = 1 << 16
+
+# 工作进程池按进程数缓存，同一进程内的多次执行共用（避免每次执行都重新启动进程）
+_pools: dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """获取（必要时创建）有 workers 个工作进程的进程池"""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            # 先启动资源跟踪器，工作进程与主进程共用同一个：共享内存块无论由谁创建，都由主进程释放
+            resource_tracker.ensure_running()
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return pool
+
+def shutdown_pools() -> None:
+    """关闭所有缓存的进程池"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(cancel_futures=True)
+
+
+def to_shared(xs: np.ndarray, ys: np.ndarray) -> str | None:
+    """把坐标写入新建的共享内存块（前一半 x，后一半 y），返回块名；没有点时返回 None（由主进程读取后释放）"""
+    count = len(xs)
+    if count == 0:
+        return None
+    shm = SharedMemory(create=True, size=2 * count * np.dtype(float).itemsize)
+    try:
+        buffer = np.ndarray((2, count), dtype=float, buffer=shm.buf)
+        buffer[0] = xs
+        buffer[1] = ys
+        del buffer
+        return shm.name
+    finally:
+        shm.close()
+
+def from_shared(name: str | None, count: int) -> tuple[np.ndarray, np.ndarray]:
+    """读出共享内存块中的坐标并释放该块"""
+    if name is None:
+        return np.empty(0), np.empty(0)
+    shm = SharedMemory(name=name)
+    try:
+        points = np.ndarray((2, count), dtype=float, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return points[0], points[1]
+
+
+class LogCollector(logging.Handler):
+    """收集日志记录为 (logger 名, 级别, 消息)，交给主进程按语句顺序重新输出"""
+
+    def __init__(self):
+        super().__init__()
+        self.records: list[tuple[str, int, str]] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append((record.name, record.levelno, record.getMessage()))
+
+@contextmanager
+def collect_logs(level: int):
+    """工作进程：按主进程的日志级别收集本项目的日志（不直接输出），产出记录列表"""
+    collector = LogCollector()
+    saved = package_logger.level, package_logger.propagate
+    package_logger.addHandler(collector)
+    package_logger.setLevel(level)
+    package_logger.propagate = False
+    try:
+        yield collector.records
+    finally:
+        package_logger.removeHandler(collector)
+        package_logger.setLevel(saved[0])
+        package_logger.propagate = saved[1]
+
+def replay_logs(records: list[tuple[str, int, str]]) -> None:
+    """主进程：输出工作进程收集的日志记录"""
+    for name, level, message in records:
+        logging.getLogger(name).log(level, "%s", message)
+
+
+def compute_for_points(job: tuple[Context, ForStatement, int]) -> tuple[str | None, int, list, float]:
+    """
+    工作进程：在上下文快照中计算一条 FOR 语句的全部坐标点
+    返回 (共享内存块名, 点数, 计算过程的日志, 循环结束时的 T)，日志由主进程按语句顺序输出
+    """
+    ctx, stmt, log_level = job
+    with collect_logs(log_level) as log:
+        cache_points(ctx, stmt.start_expr, stmt.end_expr, stmt.step_expr, stmt.x_expr, stmt.y_expr)
+    xs = np.asarray(ctx.CachedPoints["x"], dtype=float)
+    ys = np.asarray(ctx.CachedPoints["y"], dtype=float)
+    return to_shared(xs, ys), len(xs), log, ctx.Parameter_T
+
+
+def is_picklable(stmt: ForStatement) -> bool:
+    """语句能否交给工作进程（引用了 lambda 等函数的语句无法序列化）"""
+    try:
+        pickle.dumps(stmt)
+        return True
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+
+def submit_for(pool: ProcessPoolExecutor, ctx: Context, stmt: ForStatement) -> Future | None:
+    """
+    把一条 FOR 语句交给进程池计算；语句无法序列化或将按 T 分段并行时返回 None，由调用方在本进程调度
+    """
+    if should_split(ctx, stmt) or not is_picklable(stmt):
+        return None
+    return pool.submit(compute_for_points, (ctx, stmt, package_logger.getEffectiveLevel()))
+
+def collect_for(ctx: Context, stmt: ForStatement, future: Future | None) -> None:
+    """
+    取回一条 FOR 语句的计算结果放入 ctx.CachedPoints（future 为 None 时在本进程计算）
+    工作进程中的错误在这里原样抛出
+    """
+    if future is None:
+        if not split_for(ctx, stmt):
+            cache_points(ctx, stmt.start_expr, stmt.end_expr, stmt.step_expr, stmt.x_expr, stmt.y_expr)
+        return
+    name, count, log, last_t = future.result()
+    replay_logs(log)
+    ctx.CachedPoints["x"], ctx.CachedPoints["y"] = from_shared(name, count)
+    ctx.Parameter_T = last_t
+
+def discard_for(future: Future | None) -> None:
+    """放弃一条已提交语句的结果：尚未开始的取消，已完成或正在计算的等结果出来后释放其共享内存"""
+    if future is None or future.cancel():
+        return
+    try:
+        name, count, _, _ = future.result()
+    except Exception:
+        return
+    from_shared(name, count)
+
+
+def split_workers(ctx: Context) -> int:
+    """单条 FOR 语句分段并行的进程数：workers 选项，未设置时为 CPU 核数"""
+    workers = ctx.Options["workers"]
+    return workers if workers is not None else os.cpu_count() or 1
+
+def loop_range(stmt: ForStatement) -> tuple[float, float, float] | None:
+    """FOR 语句的 (起始值, 结束值, 步长)；不合法或含非有限值时返回 None（交给逐条执行按原样报错）"""
+    start_val = get_expr_value(stmt.start_expr)
+    end_val = get_expr_value(stmt.end_expr)
+    step_val = get_expr_value(stmt.step_expr)
+    if not all(map(math.isfinite, (start_val, end_val, step_val))) or step_val <= 0 or start_val > end_val:
+        return None
+    return start_val, end_val, step_val
+
+def should_split(ctx: Context, stmt: ForStatement) -> bool:
+    """
+    按估计点数判断一条 FOR 语句是否按 T 分段并行计算
+    只用于固定步长取样的整条缓存；自适应采样与流式生成不分段
+    """
+    threshold = ctx.Options["split_threshold"]
+    if not threshold or split_workers(ctx) <= 1 or ctx.Options["sampling"] != "fixed" or ctx.Options["chunk_size"]:
+        return False
+    try:
+        bounds = loop_range(stmt)
+    except (ArithmeticError, ValueError):
+        return False
+    if bounds is None:
+        return False
+    start_val, end_val, step_val = bounds
+    return (end_val - start_val) / step_val + 1 >= threshold
+
+def plan_t_ranges(start_val: float, end_val: float, step_val: float, parts: int) -> tuple[int, list[tuple[float, int, int]]]:
+    """
+    按块扫描一遍 T 序列（与逐点循环相同的累加顺序），把它划分为 parts 段连续的子区间
+    返回 (总点数, [(子区间的首个 T, 偏移, 点数)])；各段首个 T 与逐点累加得到的值逐位相同
+    """
+    # 块不大于每段的估计点数，保证能划分出 parts 段
+    estimate = (end_val - start_val) / step_val + 1
+    chunk_size = max(1, min(SPLIT_CHUNK, int(estimate // parts)))
+    chunk_starts = []  # (块的首个 T, 偏移)
+    count = 0
+    for t_values in iter_t_chunks(start_val, end_val, step_val, chunk_size):
+        chunk_starts.append((float(t_values[0]), count))
+        count += len(t_values)
+    parts = max(1, min(parts, len(chunk_starts)))
+    ranges = []
+    for k in range(parts):
+        first_t, offset = chunk_starts[k * len(chunk_starts) // parts]
+        stop = chunk_starts[(k + 1) * len(chunk_starts) // parts][1] if k + 1 < parts else count
+        ranges.append((first_t, offset, stop - offset))
+    return count, ranges
+
+def compute_t_range(job: tuple) -> tuple[bool, float]:
+    """
+    工作进程：计算从 first_t 开始的 count 个 T 的坐标，写入共享内存块中 x、y 两段的 [offset, offset + count) 处
+    numpy 引擎某块需要逐点回退时立即返回 (False, 0.0)，由主进程改为全部逐点计算（与逐条执行的回退一致）
+    返回 (是否完成, 最后一个 T 再累加一次步长后的值)
+    """
+    ctx, stmt, first_t, end_val, step_val, offset, count, total, shm_name, scalar = job
+    item = np.dtype(float).itemsize
+    shm = SharedMemory(name=shm_name)
+    try:
+        point_func = None
+        pos = 0
+        last_t = first_t
+        for t_values in iter_t_chunks(first_t, end_val, step_val, SPLIT_CHUNK):
+            t_values = t_values[:count - pos]
+            if scalar:
+                if point_func is None:
+                    point_func = make_point_func(ctx, stmt.x_expr, stmt.y_expr)
+                xs, ys = transform_points(ctx, point_func, t_values)
+            else:
+                try:
+                    xs, ys = calc_coord_array(ctx, stmt.x_expr, stmt.y_expr, t_values)
+                except (ScalarFallback, ArithmeticError, ValueError):
+                    return False, 0.0
+            # 逐块按字节写入，不保留指向共享内存的数组（否则出错时无法关闭共享内存）
+            x_start = (offset + pos) * item
+            y_start = (total + offset + pos) * item
+            shm.buf[x_start:x_start + xs.nbytes] = xs.tobytes()
+            shm.buf[y_start:y_start + ys.nbytes] = ys.tobytes()
+            pos += len(t_values)
+            last_t = float(t_values[-1])
+            if pos >= count:
+                break
+    finally:
+        shm.close()
+    return True, last_t + step_val
+
+def split_for(ctx: Context, stmt: ForStatement) -> bool:
+    """
+    数据并行：把一条 FOR 语句的 T 区间划分为连续的子区间交给进程池，坐标按预先算好的偏移写入同一个共享内存块
+    结果（点数、顺序与每个坐标）与逐条执行逐位相同；点数低于 split_threshold 选项或不能分段时返回 False
+    """
+    if not should_split(ctx, stmt) or not is_picklable(stmt):
+        return False
+    start_val, end_val, step_val = loop_range(stmt)
+    workers = split_workers(ctx)
+    try:
+        count, ranges = plan_t_ranges(start_val, end_val, step_val, workers)
+    except SyntaxError:
+        return False  # T 不前进：交给逐条执行
+    if count < ctx.Options["split_threshold"] or len(ranges) < 2:
+        return False
+
+    pool = get_pool(workers)
+    snapshot = ctx.snapshot()  # 只把坐标变换与选项交给工作进程，不带上一条曲线的坐标缓存
+    shm = SharedMemory(create=True, size=2 * count * np.dtype(float).itemsize)
+    try:
+        # numpy 引擎先向量化求值，任何一段需要回退时全部改为逐点求值（与 cache_points 的回退方式相同）
+        modes = (False, True) if ctx.Options["engine"] == "numpy" else (True,)
+        for scalar in modes:
+            futures = [pool.submit(compute_t_range, (snapshot, stmt, first_t, end_val, step_val, offset, size, count,
+                                                     shm.name, scalar))
+                       for first_t, offset, size in ranges]
+            try:
+                results = [future.result() for future in futures]  # 按顺序取结果：最先出错的一段的错误最先抛出
+            finally:
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+            if all(done for done, _ in results):
+                break
+        points = np.ndarray((2, count), dtype=float, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    ctx.CachedPoints["x"], ctx.CachedPoints["y"] = points[0], points[1]
+    if scalar:
+        ctx.Parameter_T = results[-1][1]
+    logger.debug("分段并行：%d 段，%d 个进程", len(ranges), workers)
+    logger.debug("缓存坐标点数量：%d", count)
+    return True
@@ -0,0 +1,185 @@
+import queue
+import threading
+import numpy as np
+import matplotlib.pyplot as plt
+from src.semantics.SemanticContext import Context
+from src.semantics.DeferredRenderer import DeferredRenderer
+from src.semantics.Decimator import decimate_for_axes, report_decimation
+from src.semantics.Profiler import measure
+
+
+class PointSink:
+    """
+    流式坐标点的接收端：每条 FOR 语句依次调用 begin → write（每块一次）→ end，
+    整个程序执行完后调用 close；begin 的参数为该条曲线的样式（StyleConfig 格式）
+    """
+
+    def begin(self, style: dict) -> None:
+        pass
+
+    def write(self, xs: np.ndarray, ys: np.ndarray) -> None:
+        raise NotImplementedError
+
+    def end(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class BoundsSink(PointSink):
+    """逐块更新包围盒；每条语句结束时合并进 ctx.AxisRange"""
+
+    def __init__(self, ctx: Context):
+        self.ctx = ctx
+        self.x_min = self.x_max = self.y_min = self.y_max = None
+
+    def begin(self, style: dict) -> None:
+        self.x_min = self.x_max = self.y_min = self.y_max = None
+
+    def write(self, xs: np.ndarray, ys: np.ndarray) -> None:
+        if len(xs) == 0:
+            return
+        x_min, x_max = float(xs.min()), float(xs.max())
+        y_min, y_max = float(ys.min()), float(ys.max())
+        self.x_min = x_min if self.x_min is None else min(self.x_min, x_min)
+        self.x_max = x_max if self.x_max is None else max(self.x_max, x_max)
+        self.y_min = y_min if self.y_min is None else min(self.y_min, y_min)
+        self.y_max = y_max if self.y_max is None else max(self.y_max, y_max)
+
+    def end(self) -> None:
+        if self.x_min is None:
+            return
+        axis_range = self.ctx.AxisRange
+        self.ctx.AxisRange = {
+            "x_min": self.x_min if axis_range["x_min"] is None else min(self.x_min, axis_range["x_min"]),
+            "x_max": self.x_max if axis_range["x_max"] is None else max(self.x_max, axis_range["x_max"]),
+            "y_min": self.y_min if axis_range["y_min"] is None else min(self.y_min, axis_range["y_min"]),
+            "y_max": self.y_max if axis_range["y_max"] is None else max(self.y_max, axis_range["y_max"]),
+        }
+
+
+class AxesSink(PointSink):
+    """
+    逐块绘制到 Matplotlib 坐标轴：每块接上前一块的最后一个点，保证曲线连续
+    注意：坐标轴上的线条对象仍会保存全部点，需要严格限制内存时配合 BoundsSink / FileSink 使用
+    """
+
+    def __init__(self, ctx: Context, ax: plt.Axes, renderer: DeferredRenderer = None):
+        self.ctx = ctx
+        self.ax = ax
+        self.renderer = renderer  # 延迟绘制时各块记入 renderer，程序结束后统一绘制
+        self.last_point = None
+        self.style = {}
+        self.points_in = self.points_out = 0  # 抽稀前后的点数
+
+    def begin(self, style: dict) -> None:
+        self.last_point = None
+        self.points_in = self.points_out = 0
+        self.style = {
+            "color": style["color"],
+            "linewidth": style["line_width"],
+            "alpha": style.get("opacity", 1.0),
+        }
+
+    def write(self, xs: np.ndarray, ys: np.ndarray) -> None:
+        if len(xs) == 0:
+            return
+        self.points_in += len(xs)
+        if self.ctx.Options["decimate"]:
+            xs, ys = decimate_for_axes(self.ax, xs, ys)
+        self.points_out += len(xs)
+        if self.last_point is not None:
+            xs = np.concatenate(([self.last_point[0]], xs))
+            ys = np.concatenate(([self.last_point[1]], ys))
+        if self.renderer is not None:
+            self.renderer.add(xs, ys, {"color": self.style["color"], "opacity": self.style["alpha"],
+                                       "line_width": self.style["linewidth"]}, new_curve=self.last_point is None)
+        else:
+            self.ax.plot(xs, ys, **self.style)
+            if self.ctx.profiler is not None:
+                self.ctx.profiler.count("draw_calls")
+        self.last_point = (xs[-1], ys[-1])
+
+    def end(self) -> None:
+        if self.ctx.Options["decimate"]:
+            report_decimation(self.points_in, self.points_out)
+        if self.renderer is None:
+            with measure(self.ctx.profiler, "canvas_draw"):
+                self.ax.figure.canvas.draw()
+            if self.ctx.profiler is not None:
+                self.ctx.profiler.count("canvas_draws")
+
+
+class FileSink(PointSink):
+    """把坐标点逐块写入文本文件：每行 "x,y"，每条曲线以 "# curve N" 开头"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.file = None
+        self.curve_count = 0
+
+    def begin(self, style: dict) -> None:
+        if self.file is None:
+            self.file = open(self.file_path, "w", encoding="utf-8")
+        self.curve_count += 1
+        self.file.write(f"# curve {self.curve_count}\n")
+
+    def write(self, xs: np.ndarray, ys: np.ndarray) -> None:
+        np.savetxt(self.file, np.column_stack((xs, ys)), fmt="%.17g", delimiter=",")
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class ExecutionCancelled(Exception):
+    """执行被取消（见 QueueSink）"""
+
+
+class QueueSink(PointSink):
+    """
+    把坐标块放入队列，由其他线程（如图形界面的主线程）取出绘制
+    队列元素：("points", xs, ys, 样式, 是否新曲线)，以及 progress 回调放入的 ("progress", 已执行语句数, 语句总数)
+    每块接上前一块的最后一个点，保证曲线连续；cancel_event 被设置后在下一块（或下一条语句）处抛出 ExecutionCancelled
+    队列有容量上限时，放入前会等待取出方，等待期间也会响应取消
+    """
+
+    def __init__(self, out_queue: queue.Queue, cancel_event: threading.Event = None):
+        self.queue = out_queue
+        self.cancel_event = cancel_event
+        self.style = {}
+        self.last_point = None
+
+    def check_cancelled(self) -> None:
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise ExecutionCancelled("Execution cancelled")
+
+    def put(self, item: tuple) -> None:
+        while True:
+            self.check_cancelled()
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def begin(self, style: dict) -> None:
+        self.check_cancelled()
+        self.style = dict(style)
+        self.last_point = None
+
+    def write(self, xs: np.ndarray, ys: np.ndarray) -> None:
+        if len(xs) == 0:
+            return
+        new_curve = self.last_point is None
+        if not new_curve:
+            xs = np.concatenate(([self.last_point[0]], xs))
+            ys = np.concatenate(([self.last_point[1]], ys))
+        self.put(("points", xs, ys, self.style, new_curve))
+        self.last_point = (xs[-1], ys[-1])
+
+    def progress(self, done: int, total: int) -> None:
+        """可作为 execute 的 progress 回调"""
+        self.put(("progress", done, total))
@@ -0,0 +1,118 @@
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+# 未启用剖析时 measure / measure_statement 返回的空上下文（可重复进入）
+NO_PROFILE = nullcontext()
+
+
+class Profiler:
+    """
+    性能剖析：按阶段记录墙钟时间与 CPU 时间，并累计计数器，计数器同时按语句分别记录
+    阶段：compile（编译，含 lex / optimize）、lex（Lexer.get_token）、optimize（表达式优化）、
+          execute（执行，含以下各项）、cache_points（取点）、stream（流式取点与绘制）、collect（取回并行计算的坐标）、
+          draw（绘制曲线，含 canvas_draw）、canvas_draw（重绘画布）；阶段可以嵌套，每个阶段的时间包含其内部的阶段
+    计数器：tokens（记号数）、ast_nodes（优化前的语法树节点数）、evaluations（表达式求值次数，FOR 语句按每点 x、y 各一次）、
+          points（坐标点数）、draw_calls（ax.plot / add_collection 调用次数）、canvas_draws（画布重绘次数）
+    不启用时 Profiler 为 None，各处只做一次 is None 判断，逐记号、逐点的路径上没有任何额外开销
+    """
+
+    def __init__(self):
+        self.phases: dict[str, list] = {}  # 阶段名 → [墙钟时间, CPU 时间, 次数]
+        self.counters = Counter()
+        self.statements: dict[int, dict] = {}  # 语句序号 → 该语句的耗时与计数器
+        self.current: dict | None = None  # 正在编译或执行的语句
+
+    def add_time(self, name: str, wall: float, cpu: float, calls: int = 1) -> None:
+        record = self.phases.setdefault(name, [0.0, 0.0, 0])
+        record[0] += wall
+        record[1] += cpu
+        record[2] += calls
+
+    @contextmanager
+    def phase(self, name: str):
+        """记录一个阶段的耗时（同名阶段累加）"""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """累加计数器（同时计入当前语句）"""
+        self.counters[name] += value
+        if self.current is not None:
+            self.current["counters"][name] += value
+
+    @contextmanager
+    def statement(self, index: int, kind: str = None):
+        """记录一条语句（编译与执行分别进入一次，按序号合并）的耗时与计数器"""
+        record = self.statements.get(index)
+        if record is None:
+            record = self.statements[index] = {"index": index, "kind": kind, "wall": 0.0, "cpu": 0.0,
+                                               "counters": Counter()}
+        elif kind is not None:
+            record["kind"] = kind
+        saved = self.current
+        self.current = record
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall"] += time.perf_counter() - wall
+            record["cpu"] += time.process_time() - cpu
+            self.current = saved
+
+    def timed(self, name: str, func, counter: str = None):
+        """包装 func：每次调用计入阶段 name，并把计数器 counter 加一（用于逐次调用的函数，如 Lexer.get_token）"""
+        perf_counter, process_time = time.perf_counter, time.process_time
+
+        def wrapper(*args, **kwargs):
+            wall, cpu = perf_counter(), process_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add_time(name, perf_counter() - wall, process_time() - cpu)
+                if counter is not None:
+                    self.count(counter)
+        return wrapper
+
+    def report(self) -> dict:
+        """结构化的剖析结果（可直接写入 JSON）"""
+        return {
+            "phases": {name: {"wall": wall, "cpu": cpu, "calls": calls}
+                       for name, (wall, cpu, calls) in self.phases.items()},
+            "counters": dict(self.counters),
+            "statements": [
+                {"index": record["index"], "kind": record["kind"], "wall": record["wall"], "cpu": record["cpu"],
+                 "counters": dict(record["counters"])}
+                for _, record in sorted(self.statements.items())
+            ],
+        }
+
+    def format_report(self, top: int = 10) -> str:
+        """文本形式的剖析结果：各阶段耗时、计数器与最耗时的 top 条语句"""
+        lines = [f"{'阶段':<14} {'墙钟(秒)':>10} {'CPU(秒)':>10} {'次数':>10}"]
+        for name, (wall, cpu, calls) in self.phases.items():
+            lines.append(f"{name:<14} {wall:10.4f} {cpu:10.4f} {calls:10d}")
+        lines.append("计数器：" + "，".join(f"{name}={value}" for name, value in self.counters.items()))
+        slowest = sorted(self.statements.values(), key=lambda record: record["wall"], reverse=True)[:top]
+        if slowest:
+            lines.append(f"最耗时的 {len(slowest)} 条语句：")
+            for record in slowest:
+                counters = "，".join(f"{name}={value}" for name, value in record["counters"].items())
+                lines.append(f"  #{record['index']:<5} {record['kind'] or '?':<7} {record['wall']:10.4f}s  {counters}")
+        return "\n".join(lines)
+
+
+def measure(profiler: Profiler | None, name: str):
+    """profiler 为 None 时返回空上下文，否则记录阶段 name"""
+    return NO_PROFILE if profiler is None else profiler.phase(name)
+
+def measure_statement(profiler: Profiler | None, index: int, kind: str = None):
+    """profiler 为 None 时返回空上下文，否则记录第 index 条语句"""
+    return NO_PROFILE if profiler is None else profiler.statement(index, kind)
+
+def statement_kind(stmt) -> str:
+    """语句类型的关键字（ForStatement → FOR）"""
+    return type(stmt).__name__.removesuffix("Statement").upper()
@@ -1,56 +1,123 @@
+from contextlib import contextmanager
+from src.semantics.Profiler import Profiler
+from src.semantics.AffineTransform import Affine, drawing_transform
+
 # ---------------------------
-# 全局绘图上下文（语义分析核心变量）
+# 默认执行选项（进程级默认值，新建 Context 时复制一份，执行期间只读各自的副本）
 # ---------------------------
-# 坐标变换参数
-Origin_x: float = 0.0  # 平移原点 X
-Origin_y: float = 0.0  # 平移原点 Y
-Rot_ang: float = 0.0   # 旋转角度（弧度）
-Scale_x: float = 1.0   # X轴缩放因子
-Scale_y: float = 1.0   # Y轴缩放因子
-
-# 全局参数 T（循环变量）
-Parameter_T: float = 0.0
-
-# 绘图样式
-StyleConfig = {
-    "color": "#000000",    # 线条颜色（默认黑色）
-    "opacity": 1.0,        # 透明度（0~1，默认不透明）
-    "line_width": 1.0,     # 线条宽度（默认1.0）
+Options = {
+    "engine": "tree",  # 表达式求值引擎：tree（逐点遍历语法树）/ compiled（编译为 Python 函数）/ numpy（整段 T 数组向量化求值）
+    "lexer": "dfa",  # 词法分析引擎：dfa（逐字符查 DFA 转移表）/ regex（主正则表达式，见 TokenRegex），两者的记号流相同
+    "optimize": True,  # 执行前对表达式做常量折叠与代数化简
+    "cse": True,  # 公共子表达式消除：FOR 语句中结构相同的子表达式每个 T 只计算一次
+    "chunk_size": None,  # 流式生成坐标点的块大小；None 表示一次缓存整条曲线
+    "sampling": "fixed",  # FOR 语句取样方式：fixed（按 STEP 逐点）/ adaptive（按弯曲程度自适应，STEP 为最细间隔）
+    "tolerance": 0.5,  # 自适应采样的容差：弦中点与曲线的最大距离（绘图坐标单位）
+    "decimate": False,  # 绘制前按坐标轴像素分辨率抽稀折线（同一像素内连续的点只保留首尾）
+    "deferred": False,  # 延迟绘制：程序结束后按样式合并为 LineCollection，只重绘一次画布
+    "workers": None,  # 语句级并行：FOR 语句的坐标点交给该数量的工作进程计算；None 或 1 表示在当前进程中逐条计算
+    "split_threshold": 2_000_000,  # 单条 FOR 语句点数达到该值时按 T 分段交给多个进程（进程数取 workers，未设置时为 CPU 核数）；None 表示不分段
 }
 
-# 坐标缓存列表（用于批量绘制）
-CachedPoints = {
-    "x": [],  # 缓存所有变换后的 X 坐标
-    "y": []   # 缓存所有变换后的 Y 坐标
-}
 
-AxisRange = {
-    "x_min": None,
-    "x_max": None,
-    "y_min": None,
-    "y_max": None
-}
+def check_options(options: dict) -> None:
+    """校验选项名，未知选项抛出 ValueError"""
+    unknown = set(options) - set(Options)
+    if unknown:
+        raise ValueError(f"Unknown option(s): {', '.join(sorted(unknown))}")
+
+
+def make_options(options: dict = None, **overrides) -> dict:
+    """合并执行选项：进程默认值 + options + overrides，返回新的字典"""
+    merged = dict(Options)
+    for extra in (options or {}, overrides):
+        check_options(extra)
+        merged.update(extra)
+    return merged
+
+
+class Context:
+    """
+    绘图上下文（语义分析核心变量）：每次执行一个独立的 Context，
+    不同线程各用各的 Context 即可同时执行多个脚本
+    """
+
+    def __init__(self, options: dict = None, profiler: Profiler = None, **overrides):
+        # 执行选项（不随 reset 重置）：进程默认值 + options + overrides
+        self.Options = make_options(options, **overrides)
+        # 性能剖析（见 Profiler；None 表示不剖析），不随 reset 重置，也不复制到快照中
+        self.profiler = profiler
+        self.reset()
+
+    def reset(self) -> None:
+        """重置绘图上下文（清空缓存、重置参数）"""
+        # 坐标变换参数
+        self.Origin_x: float = 0.0  # 平移原点 X
+        self.Origin_y: float = 0.0  # 平移原点 Y
+        self.Rot_ang: float = 0.0   # 旋转角度（弧度）
+        self.Scale_x: float = 1.0   # X轴缩放因子
+        self.Scale_y: float = 1.0   # Y轴缩放因子
+        # 以上参数复合成的 2×3 仿射矩阵（缩放 → 旋转 → 平移），只在参数改变时重新计算（见 update_transform）
+        self.Transform: Affine = drawing_transform(0.0, 0.0, 0.0, 1.0, 1.0)
+
+        # 参数 T（循环变量，逐点遍历语法树时使用）
+        self.Parameter_T: float = 0.0
+
+        # 绘图样式
+        self.StyleConfig = {
+            "color": "#000000",    # 线条颜色（默认黑色）
+            "opacity": 1.0,        # 透明度（0~1，默认不透明）
+            "line_width": 1.0,     # 线条宽度（默认1.0）
+        }
+
+        # 坐标缓存（用于批量绘制）
+        self.CachedPoints = {
+            "x": [],  # 缓存所有变换后的 X 坐标
+            "y": []   # 缓存所有变换后的 Y 坐标
+        }
+
+        self.AxisRange = {
+            "x_min": None,
+            "x_max": None,
+            "y_min": None,
+            "y_max": None
+        }
+
+    def update_transform(self) -> None:
+        """ORIGIN / SCALE / ROT 语句修改坐标变换参数后调用，重新复合仿射矩阵"""
+        self.Transform = drawing_transform(self.Origin_x, self.Origin_y, self.Rot_ang, self.Scale_x, self.Scale_y)
+
+    def snapshot(self) -> "Context":
+        """复制执行选项、坐标变换与样式（不复制坐标缓存与范围），供其他进程独立计算一条 FOR 语句"""
+        copy = Context(self.Options)
+        copy.Origin_x, copy.Origin_y = self.Origin_x, self.Origin_y
+        copy.Rot_ang = self.Rot_ang
+        copy.Scale_x, copy.Scale_y = self.Scale_x, self.Scale_y
+        copy.Transform = self.Transform
+        copy.StyleConfig = dict(self.StyleConfig)
+        return copy
+
+    @contextmanager
+    def override_options(self, **options):
+        """临时覆盖本上下文的执行选项，退出时恢复原值"""
+        check_options(options)
+        saved = dict(self.Options)
+        self.Options.update(options)
+        try:
+            yield self.Options
+        finally:
+            self.Options.clear()
+            self.Options.update(saved)
+
 
-# 重置全局参数
-def reset_context() -> None:
-    """重置全局绘图上下文（清空缓存、重置参数）"""
-    global Origin_x, Origin_y, Rot_ang, Scale_x, Scale_y, Parameter_T, StyleConfig, AxisRange
-    Origin_x = 0.0
-    Origin_y = 0.0
-    Rot_ang = 0.0
-    Scale_x = 1.0
-    Scale_y = 1.0
-    Parameter_T = 0.0
-    CachedPoints["x"].clear()
-    CachedPoints["y"].clear()
-    StyleConfig = {
-        "color": "#000000",
-        "opacity": 1.0,
-        "line_width": 1.0
-    }
-    AxisRange = {
-        "x_min": None,
-        "x_max": None,
-        "y_min": None,
-        "y_max": None
-    }
\ No newline at end of file
+@contextmanager
+def override_options(**options):
+    """临时覆盖进程默认执行选项（影响期间新建的 Context），退出时恢复原值"""
+    check_options(options)
+    saved = dict(Options)
+    Options.update(options)
+    try:
+        yield Options
+    finally:
+        Options.clear()
+        Options.update(saved)
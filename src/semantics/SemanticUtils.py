@@ -1,13 +1,27 @@
+import logging
 import math
+import numpy as np
 import matplotlib.pyplot as plt
 from src.parser.ExprNode import ExprNode
+from src.parser.ExprDag import ExprDag, NEGATE, SQUARE, CUBE, small_power, checked_power
 from src.scanner.TokenType import TokenType
-from src.semantics import SemanticContext as sc
+from src.semantics.SemanticContext import Context
+from src.semantics.ExprCompiler import compile_expr, compile_xy
+from src.semantics.VectorEval import ScalarFallback, make_t_array, iter_t_chunks, count_t_values, calc_coord_array
+from src.semantics.PointSink import PointSink
+from src.semantics.AdaptiveSampler import adaptive_indices
+from src.semantics.DeferredRenderer import DeferredRenderer
+from src.semantics.Decimator import decimate_for_axes, report_decimation
+from src.semantics.Profiler import measure
+from src.semantics.AffineTransform import apply_point, apply_arrays, apply_points
 
+logger = logging.getLogger(__name__)
 
-def get_expr_value(root: ExprNode) -> float:
+
+def get_expr_value(root: ExprNode, t: float = 0.0) -> float:
     """
     深度优先后序遍历语法树，计算表达式值
+    t：参数 T 的当前值（不含 T 的表达式可省略）
     """
     if root is None:
         return 0.0
@@ -17,16 +31,19 @@ def get_expr_value(root: ExprNode) -> float:
         # 常数节点：直接返回常数值
         return root.const_val
     elif op_code == TokenType.T:
-        # 参数节点：返回全局变量T的值
-        return Parameter_T
+        # 参数节点：返回当前 T 值
+        return t
     elif op_code == TokenType.FUNC:
         # 函数节点：计算子表达式值后调用函数指针
-        child_val = get_expr_value(root.child)
+        child_val = get_expr_value(root.child, t)
         return root.func_ptr(child_val) if root.func_ptr else 0.0
+    elif op_code == TokenType.MINUS and root.child is not None:
+        # 一元取负节点（由优化器生成）
+        return -get_expr_value(root.child, t)
     elif op_code in (TokenType.PLUS, TokenType.MINUS, TokenType.MUL, TokenType.DIV, TokenType.POWER):
         # 二元运算节点：递归计算左右子树
-        left_val = get_expr_value(root.left)
-        right_val = get_expr_value(root.right)
+        left_val = get_expr_value(root.left, t)
+        right_val = get_expr_value(root.right, t)
         if op_code == TokenType.PLUS:
             return left_val + right_val
         elif op_code == TokenType.MINUS:
@@ -39,44 +56,89 @@ def get_expr_value(root: ExprNode) -> float:
                 raise ZeroDivisionError("Division by zero in expression")
             return left_val / right_val
         elif op_code == TokenType.POWER:
+            exponent = small_power(root)
+            if exponent is not None:
+                return checked_power(left_val, exponent)
             return math.pow(left_val, right_val)
     else:
         return 0.0
 
 
-def calc_coord(x_expr: ExprNode, y_expr: ExprNode) -> tuple[float, float]:
+def get_dag_values(dag: ExprDag, t: float) -> list[float]:
+    """
+    按拓扑序计算 DAG 中每个节点（共享子表达式只计算一次），返回各根节点的值
+    """
+    values = []
+    append = values.append
+    for op_code, a, b, payload in dag.code:
+        if op_code is TokenType.CONST_ID:
+            append(payload)
+        elif op_code is TokenType.T:
+            append(t)
+        elif op_code is TokenType.FUNC:
+            append(payload(values[a]) if payload else 0.0)
+        elif op_code is NEGATE:
+            append(-values[a])
+        elif op_code is TokenType.PLUS:
+            append(values[a] + values[b])
+        elif op_code is TokenType.MINUS:
+            append(values[a] - values[b])
+        elif op_code is TokenType.MUL:
+            append(values[a] * values[b])
+        elif op_code is TokenType.DIV:
+            if values[b] == 0:
+                raise ZeroDivisionError("Division by zero in expression")
+            append(values[a] / values[b])
+        elif op_code is SQUARE:
+            append(checked_power(values[a], 2.0))
+        elif op_code is CUBE:
+            append(checked_power(values[a], 3.0))
+        elif op_code is TokenType.POWER:
+            append(math.pow(values[a], values[b]))
+        else:
+            append(0.0)
+    return [values[i] if i >= 0 else 0.0 for i in dag.outputs]
+
+
+def calc_coord(ctx: Context, x_expr: ExprNode, y_expr: ExprNode, t: float) -> tuple[float, float]:
     """
     坐标变换：原始坐标 → 缩放 → 旋转 → 平移
     返回变换后的实际窗口坐标（x, y）
     """
 
     # 1. 计算原始坐标（基于T的表达式值）
-    local_x = get_expr_value(x_expr)
-    local_y = get_expr_value(y_expr)
+    local_x = get_expr_value(x_expr, t)
+    local_y = get_expr_value(y_expr, t)
 
-    # 2. 缩放变换
-    local_x *= sc.Scale_x
-    local_y *= sc.Scale_y
+    return transform_coord(ctx, local_x, local_y)
 
-    # 3. 旋转变换（弧度制，逆时针为正）
-    cos_ang = math.cos(sc.Rot_ang)
-    sin_ang = math.sin(sc.Rot_ang)
-    temp_x = local_x * cos_ang + local_y * sin_ang
-    temp_y = local_y * cos_ang - local_x * sin_ang
-    local_x, local_y = temp_x, temp_y
+def transform_coord(ctx: Context, local_x: float, local_y: float) -> tuple[float, float]:
+    """
+    对原始坐标依次做缩放、旋转、平移变换（使用 ctx.Transform 中预先复合好的仿射矩阵）
+    大量点请用 transform_points 整段变换
+    """
+    return apply_point(ctx.Transform, local_x, local_y)
 
-    # 4. 平移变换（窗口坐标系：Y轴向下，需翻转Y值以符合数学习惯）
-    actual_x = sc.Origin_x + local_x
-    actual_y = sc.Origin_y + local_y
+def transform_points(ctx: Context, point_func, t_values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """逐点求出各个 T 的原始坐标（point_func 见 make_point_func），再整段一次做仿射变换"""
+    local_xs = np.empty(len(t_values))
+    local_ys = np.empty(len(t_values))
+    for i, t in enumerate(t_values.tolist()):
+        local_xs[i], local_ys[i] = point_func(t)
+    return apply_arrays(ctx.Transform, local_xs, local_ys)
 
-    return actual_x, actual_y
+def check_loop_range(start_val: float, end_val: float, step_val: float) -> None:
+    """校验 FOR 语句的循环参数：步长必须为正，且起始值不大于结束值（静态检查模式也用它，报错与执行时相同）"""
+    if step_val <= 0:
+        raise SyntaxError("Step value must be positive")
+    if start_val > end_val:
+        raise SyntaxError("Start/End/Step mismatch (loop will not execute)")
 
-def cache_points(start_expr: ExprNode, end_expr: ExprNode, step_expr: ExprNode, x_expr: ExprNode, y_expr: ExprNode) -> None:
+def cache_points(ctx: Context, start_expr: ExprNode, end_expr: ExprNode, step_expr: ExprNode, x_expr: ExprNode, y_expr: ExprNode) -> None:
     """
     新增：缓存所有坐标点（替换原 draw_loop 的逐点绘制）
-    遍历 T 值，计算坐标并存入 CachedPoints
+    遍历 T 值，计算坐标并存入 ctx.CachedPoints
     """
-    global Parameter_T
 
     # 计算循环参数（起始值、结束值、步长）
     start_val = get_expr_value(start_expr)
@@ -84,59 +146,222 @@ def cache_points(start_expr: ExprNode, end_expr: ExprNode, step_expr: ExprNode,
     step_val = get_expr_value(step_expr)
 
     # 校验步长合法性
-    if step_val <= 0:
-        raise SyntaxError("Step value must be positive")
-    if (start_val > end_val and step_val > 0) or (start_val < end_val and step_val < 0):
-        raise SyntaxError("Start/End/Step mismatch (loop will not execute)")
+    check_loop_range(start_val, end_val, step_val)
+
+    # 自适应采样：只在曲线弯曲处按 STEP 加密取样
+    if ctx.Options["sampling"] == "adaptive":
+        ctx.CachedPoints["x"], ctx.CachedPoints["y"] = adaptive_points(ctx, start_val, end_val, step_val, x_expr, y_expr)
+        return
+
+    # 向量化求值：整段 T 数组一次求出所有坐标
+    if ctx.Options["engine"] == "numpy" and all(map(math.isfinite, (start_val, end_val, step_val))):
+        try:
+            t_values = make_t_array(start_val, end_val, step_val)
+            ctx.CachedPoints["x"], ctx.CachedPoints["y"] = calc_coord_array(ctx, x_expr, y_expr, t_values)
+            logger.debug("缓存坐标点数量：%d", len(ctx.CachedPoints["x"]))
+            return
+        except (ScalarFallback, ArithmeticError, ValueError):
+            # 出现除零/定义域错误时回退逐点求值，保证报错与逐点路径一致
+            pass
 
     # 清空当前缓存（避免多轮绘制叠加）
-    sc.CachedPoints["x"].clear()
-    sc.CachedPoints["y"].clear()
+    ctx.CachedPoints["x"] = []
+    ctx.CachedPoints["y"] = []
+
+    # 逐点求值只计算原始坐标，循环结束后整段一次做仿射变换
+    local_xs = []
+    local_ys = []
+
+    # 编译求值：每个表达式编译为一个 Python 函数，逐点直接调用
+    if ctx.Options["engine"] == "compiled":
+        if ctx.Options["cse"]:
+            # x/y 共用一个函数，共享子表达式每个 T 只计算一次
+            xy_func = compile_xy(x_expr, y_expr)
+        else:
+            x_func, y_func = compile_expr(x_expr), compile_expr(y_expr)
+            xy_func = lambda t: (x_func(t), y_func(t))
+        t = start_val
+        while t <= end_val:
+            x, y = xy_func(t)
+            local_xs.append(x)
+            local_ys.append(y)
+            t += step_val
+        ctx.Parameter_T = t
+
+    # 按 DAG 逐点求值：共享子表达式每个 T 只计算一次
+    elif ctx.Options["cse"]:
+        dag = ExprDag(x_expr, y_expr)
+        t = start_val
+        while t <= end_val:
+            x, y = get_dag_values(dag, t)
+            local_xs.append(x)
+            local_ys.append(y)
+            t += step_val
+        ctx.Parameter_T = t
 
     # 遍历 T 值，缓存坐标
-    Parameter_T = start_val
-    while (step_val > 0 and Parameter_T <= end_val) or (step_val < 0 and Parameter_T >= end_val):
-        x, y = calc_coord(x_expr, y_expr)
-        sc.CachedPoints["x"].append(x)
-        sc.CachedPoints["y"].append(y)
-        Parameter_T += step_val
+    else:
+        ctx.Parameter_T = start_val
+        while (step_val > 0 and ctx.Parameter_T <= end_val) or (step_val < 0 and ctx.Parameter_T >= end_val):
+            local_xs.append(get_expr_value(x_expr, ctx.Parameter_T))
+            local_ys.append(get_expr_value(y_expr, ctx.Parameter_T))
+            ctx.Parameter_T += step_val
+
+    ctx.CachedPoints["x"], ctx.CachedPoints["y"] = apply_points(ctx.Transform, local_xs, local_ys)
+    logger.debug("缓存坐标点数量：%d", len(ctx.CachedPoints["x"]))
+
+
+def make_point_func(ctx: Context, x_expr: ExprNode, y_expr: ExprNode):
+    """按执行选项选择逐点求值方式，返回 T → (原始 x, 原始 y) 的函数"""
+    if ctx.Options["engine"] == "compiled":
+        if ctx.Options["cse"]:
+            return compile_xy(x_expr, y_expr)
+        x_func, y_func = compile_expr(x_expr), compile_expr(y_expr)
+        return lambda t: (x_func(t), y_func(t))
+    if ctx.Options["cse"]:
+        dag = ExprDag(x_expr, y_expr)
+        return lambda t: get_dag_values(dag, t)
+
+    def tree_point(t: float) -> tuple[float, float]:
+        ctx.Parameter_T = t
+        return get_expr_value(x_expr, t), get_expr_value(y_expr, t)
+    return tree_point
+
+def iter_point_chunks(ctx: Context, start_val: float, end_val: float, step_val: float, x_expr: ExprNode, y_expr: ExprNode,
+                      chunk_size: int):
+    """
+    分块生成变换后的坐标点，每次产出 (xs, ys) 两个长度不超过 chunk_size 的数组
+    每块结果与 cache_points 对应位置的点完全相同；numpy 引擎某块出错时只有该块回退逐点求值
+    """
+    point_func = None
+    for t_values in iter_t_chunks(start_val, end_val, step_val, chunk_size):
+        if ctx.Options["engine"] == "numpy":
+            try:
+                yield calc_coord_array(ctx, x_expr, y_expr, t_values)
+                continue
+            except (ScalarFallback, ArithmeticError, ValueError):
+                pass
+        if point_func is None:
+            point_func = make_point_func(ctx, x_expr, y_expr)
+        yield transform_points(ctx, point_func, t_values)
+
+def adaptive_points(ctx: Context, start_val: float, end_val: float, step_val: float, x_expr: ExprNode, y_expr: ExprNode) \
+        -> tuple[np.ndarray, np.ndarray]:
+    """
+    自适应采样：取样点是固定步长各个 T 的子集，弦中点偏离曲线超过 tolerance 选项（绘图坐标单位，默认画布上约为像素）处才加密
+    第 i 个 T 按 start + i * step 计算（与逐点累加的 T 可能有末位舍入差异），最后一个 T 与逐点循环相同
+    """
+    count, last_t = count_t_values(start_val, end_val, step_val)
+    point_func = None
+
+    def eval_points(indices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        nonlocal point_func
+        t_values = start_val + indices * step_val
+        t_values[indices == count - 1] = last_t
+        if ctx.Options["engine"] == "numpy":
+            try:
+                return calc_coord_array(ctx, x_expr, y_expr, t_values)
+            except (ScalarFallback, ArithmeticError, ValueError):
+                pass
+        if point_func is None:
+            point_func = make_point_func(ctx, x_expr, y_expr)
+        return transform_points(ctx, point_func, t_values)
+
+    _, xs, ys = adaptive_indices(count, eval_points, ctx.Options["tolerance"])
+    saved = count - len(xs)
+    ratio = count / len(xs) if len(xs) else 1.0
+    logger.debug("自适应采样坐标点数量：%d（固定步长为 %d，节省 %d 个，%.1f×）", len(xs), count, saved, ratio)
+    return xs, ys
+
+def stream_points(ctx: Context, start_expr: ExprNode, end_expr: ExprNode, step_expr: ExprNode, x_expr: ExprNode, y_expr: ExprNode,
+                  sinks: list[PointSink], chunk_size: int) -> int:
+    """
+    流式执行 FOR 语句：坐标点按块交给各个接收端（见 PointSink），不在 CachedPoints 中缓存
+    峰值内存只与 chunk_size 有关，与循环次数无关；返回生成的点数
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive (current value: {chunk_size})")
+
+    start_val = get_expr_value(start_expr)
+    end_val = get_expr_value(end_expr)
+    step_val = get_expr_value(step_expr)
+    check_loop_range(start_val, end_val, step_val)
+
+    if ctx.Options["sampling"] == "adaptive":
+        # 自适应采样的点数已远少于固定步长，整条曲线一次求出后再按块交给接收端
+        xs, ys = adaptive_points(ctx, start_val, end_val, step_val, x_expr, y_expr)
+        chunks = ((xs[i:i + chunk_size], ys[i:i + chunk_size]) for i in range(0, len(xs), chunk_size))
+    else:
+        chunks = iter_point_chunks(ctx, start_val, end_val, step_val, x_expr, y_expr, chunk_size)
+
+    for sink in sinks:
+        sink.begin(ctx.StyleConfig)
+    total = 0
+    for xs, ys in chunks:
+        for sink in sinks:
+            sink.write(xs, ys)
+        total += len(xs)
+    for sink in sinks:
+        sink.end()
+
+    logger.debug("流式生成坐标点数量：%d（每块最多 %d 个）", total, chunk_size)
+    return total
+
 
-    print(f"缓存坐标点数量：{len(sc.CachedPoints['x'])}")
+def get_bounds(values) -> tuple[float, float]:
+    """求坐标序列的最小/最大值（NumPy 数组直接走 C 实现）"""
+    if isinstance(values, np.ndarray):
+        return float(values.min()), float(values.max())
+    return min(values), max(values)
 
 
-def batch_draw(ax: plt.Axes) -> None:
+def batch_draw(ctx: Context, ax: plt.Axes, renderer: DeferredRenderer = None) -> None:
     """
     新增：批量绘制缓存的坐标点（Matplotlib 核心绘图函数）
-    ax：Matplotlib 的坐标轴对象（用于绘图）
+    ax：Matplotlib 的坐标轴对象（用于绘图；为 None 时只更新坐标范围）
+    renderer：延迟绘制时只把曲线记入 renderer，程序结束后统一绘制，不在此处重绘画布
     """
 
     # 获取样式配置
-    color = sc.StyleConfig["color"]
-    line_width = sc.StyleConfig["line_width"]
-    alpha = sc.StyleConfig.get("opacity", 1.0)  # 获取透明度值，默认不透明
+    color = ctx.StyleConfig["color"]
+    line_width = ctx.StyleConfig["line_width"]
+    alpha = ctx.StyleConfig.get("opacity", 1.0)  # 获取透明度值，默认不透明
 
     # 批量绘制曲线（Matplotlib plot 自动连接点为线）
-    ax.plot(
-        sc.CachedPoints["x"], sc.CachedPoints["y"],
-        color=color,
-        linewidth=line_width,
-        alpha=alpha
-    )
+    if ax is not None:
+        xs, ys = ctx.CachedPoints["x"], ctx.CachedPoints["y"]
+        if ctx.Options["decimate"]:
+            # 按坐标轴像素分辨率抽稀，同一像素内的点不必交给 Matplotlib
+            xs, ys = decimate_for_axes(ax, xs, ys)
+            report_decimation(len(ctx.CachedPoints["x"]), len(xs))
+        if renderer is not None:
+            renderer.add(xs, ys, ctx.StyleConfig)
+        else:
+            ax.plot(
+                xs, ys,
+                color=color,
+                linewidth=line_width,
+                alpha=alpha
+            )
+            if ctx.profiler is not None:
+                ctx.profiler.count("draw_calls")
 
     # 如果有坐标点，计算并返回范围用于后续设置坐标轴
-    if len(sc.CachedPoints["x"]) > 0 and len(sc.CachedPoints["y"]) > 0:
-        x_min = min(sc.CachedPoints["x"])
-        x_max = max(sc.CachedPoints["x"])
-        y_min = min(sc.CachedPoints["y"])
-        y_max = max(sc.CachedPoints["y"])
+    if len(ctx.CachedPoints["x"]) > 0 and len(ctx.CachedPoints["y"]) > 0:
+        x_min, x_max = get_bounds(ctx.CachedPoints["x"])
+        y_min, y_max = get_bounds(ctx.CachedPoints["y"])
 
         # 存储范围信息供外部使用
-        sc.AxisRange = {
-            "x_min": x_min if sc.AxisRange["x_min"] is None or x_min < sc.AxisRange["x_min"] else sc.AxisRange["x_min"],
-            "x_max": x_max if sc.AxisRange["x_max"] is None or x_max > sc.AxisRange["x_max"] else sc.AxisRange["x_max"],
-            "y_min": y_min if sc.AxisRange["y_min"] is None or y_min < sc.AxisRange["y_min"] else sc.AxisRange["y_min"],
-            "y_max": y_max if sc.AxisRange["y_max"] is None or y_max > sc.AxisRange["y_max"] else sc.AxisRange["y_max"]
+        ctx.AxisRange = {
+            "x_min": x_min if ctx.AxisRange["x_min"] is None or x_min < ctx.AxisRange["x_min"] else ctx.AxisRange["x_min"],
+            "x_max": x_max if ctx.AxisRange["x_max"] is None or x_max > ctx.AxisRange["x_max"] else ctx.AxisRange["x_max"],
+            "y_min": y_min if ctx.AxisRange["y_min"] is None or y_min < ctx.AxisRange["y_min"] else ctx.AxisRange["y_min"],
+            "y_max": y_max if ctx.AxisRange["y_max"] is None or y_max > ctx.AxisRange["y_max"] else ctx.AxisRange["y_max"]
         }
 
     # 刷新画布（立即显示绘制结果）
-    ax.figure.canvas.draw()
+    if ax is not None and renderer is None:
+        with measure(ctx.profiler, "canvas_draw"):
+            ax.figure.canvas.draw()
+        if ctx.profiler is not None:
+            ctx.profiler.count("canvas_draws")
@@ -0,0 +1,155 @@
+import math
+import numpy as np
+from src.parser.ExprNode import ExprNode
+from src.parser.ExprDag import small_power
+from src.scanner.TokenType import TokenType
+from src.semantics.SemanticContext import Context
+from src.semantics.AffineTransform import apply_arrays
+
+# 符号表中的函数指针 → NumPy ufunc（未登记的函数退化为逐元素调用原函数）
+UFUNC_MAP = {
+    math.sin: np.sin,
+    math.cos: np.cos,
+    math.tan: np.tan,
+    math.sqrt: np.sqrt,
+    math.exp: np.exp,
+    math.log: np.log,
+}
+
+
+class ScalarFallback(Exception):
+    """向量化求值遇到除零、定义域错误或溢出，需回退到逐点求值以得到一致的报错"""
+
+
+def get_ufunc(func_ptr):
+    """返回函数指针对应的 ufunc"""
+    ufunc = UFUNC_MAP.get(func_ptr)
+    if ufunc is None:
+        ufunc = np.frompyfunc(func_ptr, 1, 1)
+    return ufunc
+
+
+def get_expr_array(root: ExprNode, t_values: np.ndarray, memo: dict = None):
+    """
+    深度优先后序遍历语法树，以整段 T 数组为操作数一次性求值
+    与 T 无关的子树返回标量，由 NumPy 广播
+    memo：节点 id → 已求出的数组，共享子表达式（DAG）只计算一次
+    """
+    if root is None:
+        return 0.0
+    if memo is None:
+        memo = {}
+    elif id(root) in memo:
+        return memo[id(root)]
+    result = memo[id(root)] = eval_node(root, t_values, memo)
+    return result
+
+
+def eval_node(root: ExprNode, t_values: np.ndarray, memo: dict):
+    """计算单个节点（子节点经 get_expr_array 求值并记入 memo）"""
+
+    op_code = root.op_code
+    if op_code == TokenType.CONST_ID:
+        return root.const_val
+    elif op_code == TokenType.T:
+        return t_values
+    elif op_code == TokenType.FUNC:
+        child_val = get_expr_array(root.child, t_values, memo)
+        if root.func_ptr is None:
+            return 0.0
+        result = np.asarray(get_ufunc(root.func_ptr)(child_val), dtype=float)
+        # math 模块遇到定义域错误/溢出会抛异常，ufunc 只会给出 nan/inf
+        if not np.isfinite(result).all():
+            raise ScalarFallback
+        return result
+    elif op_code == TokenType.MINUS and root.child is not None:
+        return np.negative(get_expr_array(root.child, t_values, memo))
+    elif op_code in (TokenType.PLUS, TokenType.MINUS, TokenType.MUL, TokenType.DIV, TokenType.POWER):
+        left_val = get_expr_array(root.left, t_values, memo)
+        right_val = get_expr_array(root.right, t_values, memo)
+        if op_code == TokenType.PLUS:
+            return np.add(left_val, right_val)
+        elif op_code == TokenType.MINUS:
+            return np.subtract(left_val, right_val)
+        elif op_code == TokenType.MUL:
+            return np.multiply(left_val, right_val)
+        elif op_code == TokenType.DIV:
+            if np.any(np.equal(right_val, 0)):
+                raise ScalarFallback
+            return np.divide(left_val, right_val)
+        elif op_code == TokenType.POWER:
+            exponent = small_power(root)
+            if exponent is None:
+                result = np.power(left_val, right_val)
+            else:
+                # 与逐点求值相同的连乘顺序，保证结果逐位一致
+                result = np.multiply(left_val, left_val)
+                if exponent == 3.0:
+                    result = np.multiply(result, left_val)
+            if not np.isfinite(result).all():
+                raise ScalarFallback
+            return result
+    else:
+        return 0.0
+
+
+def make_t_array(start_val: float, end_val: float, step_val: float) -> np.ndarray:
+    """
+    生成与逐点循环完全一致的 T 序列
+    逐点循环使用 T += step 累加，这里用 np.add.accumulate 按相同顺序累加
+    """
+    count = int((end_val - start_val) / step_val) + 2
+    while True:
+        steps = np.full(count, step_val)
+        steps[0] = start_val
+        t_values = np.add.accumulate(steps)
+        if t_values[-1] > end_val:
+            break
+        if count > 1 and t_values[-1] == t_values[-2]:
+            raise SyntaxError("Step value too small (T does not advance)")
+        count *= 2
+    return t_values[:np.searchsorted(t_values, end_val, side="right")]
+
+
+def iter_t_chunks(start_val: float, end_val: float, step_val: float, chunk_size: int):
+    """
+    分块生成 T 序列：每块最多 chunk_size 个值，拼接起来与 make_t_array 逐位相同
+    下一块的首个值由上一块末尾再累加一次步长得到，累加顺序与逐点循环一致
+    """
+    next_t = start_val
+    while True:
+        steps = np.full(chunk_size, step_val, dtype=float)
+        steps[0] = next_t
+        t_values = np.add.accumulate(steps)
+        # T 单调不减：只保留开头连续满足 T <= end 的部分（end 为 NaN 时一个也不保留）
+        in_range = t_values <= end_val
+        count = chunk_size if in_range[-1] else int(np.argmin(in_range))
+        if count:
+            yield t_values[:count]
+        if count < chunk_size:
+            return
+        if chunk_size > 1 and t_values[-1] == t_values[0]:
+            raise SyntaxError("Step value too small (T does not advance)")
+        next_t = t_values[-1] + step_val
+
+
+def count_t_values(start_val: float, end_val: float, step_val: float, chunk_size: int = 1 << 20) -> tuple[int, float]:
+    """逐点循环会取到的 T 的个数与最后一个 T（分块累加，不保存整段序列）"""
+    count = 0
+    last_t = start_val
+    for t_values in iter_t_chunks(start_val, end_val, step_val, chunk_size):
+        count += len(t_values)
+        last_t = float(t_values[-1])
+    return count, last_t
+
+
+def calc_coord_array(ctx: Context, x_expr: ExprNode, y_expr: ExprNode, t_values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    向量化坐标变换：原始坐标 → 缩放 → 旋转 → 平移
+    整段原始坐标一次乘以 ctx.Transform（与逐点路径的 transform_coord 运算顺序相同）
+    """
+    memo = {}
+    with np.errstate(all="ignore"):
+        local_x = np.broadcast_to(get_expr_array(x_expr, t_values, memo), t_values.shape)
+        local_y = np.broadcast_to(get_expr_array(y_expr, t_values, memo), t_values.shape)
+    return apply_arrays(ctx.Transform, local_x, local_y)
@@ -0,0 +1,126 @@
+import os
+import random
+import tempfile
+import tracemalloc
+from src.parser.Parser import Parser
+from src.scanner.Lexer import Lexer
+from src.scanner.TokenType import TokenType
+from src.semantics.SemanticContext import Context
+
+
+class LegacyToken:
+    """原记号类（带 __dict__），仅用于对比内存"""
+
+    def __init__(self):
+        self.type = TokenType.ERRTOKEN
+        self.lexeme = ""
+        self.value = 0.0
+        self.func_ptr = None
+
+
+class LegacyExprNode:
+    """原语法树节点类（带 __dict__，T 节点各自持有一个 lambda），仅用于对比内存"""
+
+    def __init__(self, op_code: TokenType):
+        self.op_code = op_code
+        self.left = None
+        self.right = None
+        self.child = None
+        self.const_val = 0.0
+        self.param_ptr = None
+        self.func_ptr = None
+
+
+# 原节点类的 T 节点通过函数读取参数 T
+LEGACY_CONTEXT = Context()
+
+
+def to_legacy(node):
+    """把语法树复制为原节点类表示"""
+    if node is None:
+        return None
+    legacy = LegacyExprNode(node.op_code)
+    legacy.left = to_legacy(node.left)
+    legacy.right = to_legacy(node.right)
+    legacy.child = to_legacy(node.child)
+    legacy.const_val = node.const_val
+    legacy.func_ptr = node.func_ptr
+    if node.op_code == TokenType.T:
+        legacy.param_ptr = lambda: LEGACY_CONTEXT.Parameter_T
+    return legacy
+
+
+def random_expr(depth: int) -> str:
+    """生成随机表达式"""
+    if depth == 0:
+        return random.choice(["T", "PI", "2", "0.5", "E"])
+    kind = random.random()
+    if kind < 0.2:
+        return f"{random.choice(['SIN', 'COS', 'SQRT', 'EXP', 'LN'])}({random_expr(depth - 1)})"
+    if kind < 0.3:
+        return f"-({random_expr(depth - 1)})"
+    op = random.choice(["+", "-", "*", "/", "**"])
+    return f"({random_expr(depth - 1)} {op} {random_expr(depth - 1)})"
+
+
+def bench_memory(statements: int, depth: int):
+    """对比记号与语法树在新旧表示下的内存占用"""
+    random.seed(0)
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as file:
+        for _ in range(statements):
+            file.write(random_expr(depth) + ";\n")
+        file_path = file.name
+
+    try:
+        print("="*80)
+        print(f"语句数：{statements}  表达式深度：{depth}")
+        print("="*80)
+
+        # 记号：符号表中的记号为共享模板，其余为 __slots__ 记号
+        lexer = Lexer(file_path)
+        tracemalloc.start()
+        tokens = []
+        while True:
+            token = lexer.get_token()
+            if token.type == TokenType.NONTOKEN:
+                break
+            tokens.append(token)
+        token_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        legacy_tokens = []
+        for token in tokens:
+            legacy = LegacyToken()
+            legacy.type, legacy.lexeme, legacy.value, legacy.func_ptr = token.type, token.lexeme, token.value, token.func_ptr
+            legacy_tokens.append(legacy)
+        legacy_token_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        # 语法树
+        parser = Parser(Lexer(file_path))
+        tracemalloc.start()
+        trees = []
+        parser.fetch_token()
+        while parser.current_token.type != TokenType.NONTOKEN:
+            trees.append(parser.expression())
+            parser.match_token(TokenType.SEMICO)
+        tree_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        legacy_trees = [to_legacy(tree) for tree in trees]
+        legacy_tree_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        print(f"{'':<10} {'原表示':>14} {'现表示':>14} {'节省':>8}")
+        print(f"{'记号':<10} {legacy_token_size / 1024:12.1f}KB {token_size / 1024:12.1f}KB {1 - token_size / legacy_token_size:8.1%}")
+        print(f"{'语法树':<10} {legacy_tree_size / 1024:12.1f}KB {tree_size / 1024:12.1f}KB {1 - tree_size / legacy_tree_size:8.1%}")
+        print(f"记号数：{len(tokens)}  语法树数：{len(legacy_trees)}")
+        print("测试完成！\n")
+    finally:
+        os.remove(file_path)
+
+
+if __name__ == "__main__":
+    bench_memory(statements=2000, depth=6)
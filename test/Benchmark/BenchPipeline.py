@@ -0,0 +1,290 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+from src.parser.Parser import Parser, new_lexer
+from src.parser.Program import ForStatement
+from src.scanner.TokenType import TokenType
+from src.semantics.SemanticContext import Context
+from src.semantics.SemanticUtils import cache_points, batch_draw
+
+
+# ---------------------------
+# 合成脚本生成器：返回脚本源码
+# ---------------------------
+def gen_many_statements(count: int) -> str:
+    """大量短语句：四种设置语句与 FOR 语句交替出现"""
+    random.seed(0)
+    lines = []
+    for i in range(count):
+        kind = i % 5
+        if kind == 0:
+            lines.append(f"ORIGIN IS ({random.randint(-300, 300)}, {random.randint(-300, 300)});")
+        elif kind == 1:
+            lines.append(f"SCALE IS ({random.randint(1, 100)}, {random.randint(1, 100)});")
+        elif kind == 2:
+            lines.append(f"ROT IS PI/{random.randint(1, 12)};")
+        elif kind == 3:
+            lines.append(f"STYLE IS (RED, 0.{random.randint(1, 9)}, {random.randint(1, 3)});")
+        else:
+            lines.append("FOR T FROM 0 TO 2*PI STEP PI/50 DRAW (COS(T), SIN(T));")
+    return "\n".join(lines) + "\n"
+
+
+def random_expr(depth: int) -> str:
+    """生成深度为 depth 的随机表达式（只含 T 的定义域安全函数，执行不会出错）"""
+    if depth == 0:
+        return random.choice(["T", "PI", "2", "0.5", "E"])
+    kind = random.random()
+    if kind < 0.25:
+        return f"{random.choice(['SIN', 'COS'])}({random_expr(depth - 1)})"
+    if kind < 0.35:
+        return f"-({random_expr(depth - 1)})"
+    return f"({random_expr(depth - 1)} {random.choice(['+', '-', '*'])} {random_expr(depth - 1)})"
+
+
+def gen_nested_exprs(count: int, depth: int = 8) -> str:
+    """深层嵌套表达式：count 条 FOR 语句，x、y 各为深度 depth 的随机表达式"""
+    random.seed(1)
+    return "".join(
+        f"FOR T FROM 0 TO 1 STEP 0.01 DRAW ({random_expr(depth)}, {random_expr(depth)});\n"
+        for _ in range(count)
+    )
+
+
+def gen_huge_steps(points: int) -> str:
+    """步数极多的单条 FOR 语句：心形线，共 points 个点"""
+    return (
+        "SCALE IS (10, 10);\n"
+        f"FOR T FROM 0 TO 2*PI STEP 2*PI/{points - 1} "
+        "DRAW (16*SIN(T)**3, 13*COS(T) - 5*COS(2*T) - 2*COS(3*T) - COS(4*T));\n"
+    )
+
+
+def gen_comment_heavy(count: int, comments_per_statement: int = 5) -> str:
+    """注释为主的源码：每条语句前后有多行 // 与 -- 注释"""
+    random.seed(2)
+    lines = []
+    for i in range(count):
+        for j in range(comments_per_statement):
+            marker = "//" if j % 2 == 0 else "--"
+            lines.append(f"{marker} 第 {i} 条语句的注释 {j}：" + "x" * random.randint(10, 60))
+        lines.append(f"ROT IS {i % 7}; -- 行尾注释")
+    return "\n".join(lines) + "\n"
+
+
+# 各规模的生成参数
+SCALES = {
+    "small": {"many_statements": 1_000, "nested_exprs": 50, "huge_steps": 100_000, "comment_heavy": 1_000},
+    "medium": {"many_statements": 10_000, "nested_exprs": 200, "huge_steps": 1_000_000, "comment_heavy": 10_000},
+    "large": {"many_statements": 50_000, "nested_exprs": 1_000, "huge_steps": 5_000_000, "comment_heavy": 50_000},
+}
+
+GENERATORS = {
+    "many_statements": gen_many_statements,
+    "nested_exprs": gen_nested_exprs,
+    "huge_steps": gen_huge_steps,
+    "comment_heavy": gen_comment_heavy,
+}
+
+
+# ---------------------------
+# 各阶段计时：均取 repeat 次中最快的一次
+# ---------------------------
+def best_time(func, repeat: int) -> float:
+    """执行 repeat 次 func，返回最短耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def count_tokens(file_path: str, options: dict) -> int:
+    lexer = new_lexer(options, file_path)
+    count = 0
+    while lexer.get_token().type != TokenType.NONTOKEN:
+        count += 1
+    return count
+
+
+def compile_file(file_path: str, options: dict):
+    return Parser(new_lexer(options, file_path), options).program()
+
+
+def bench_lexer(file_path: str, repeat: int, options: dict) -> dict:
+    """Lexer.get_token 吞吐量（记号/秒，引擎由 options["lexer"] 选择）"""
+    tokens = count_tokens(file_path, options)
+    seconds = best_time(lambda: count_tokens(file_path, options), repeat)
+    return {"tokens": tokens, "seconds": seconds, "tokens_per_second": tokens / seconds}
+
+
+def bench_parser(file_path: str, repeat: int, options: dict) -> dict:
+    """Parser.program 吞吐量（语句/秒，含词法分析与表达式优化）"""
+    statements = len(compile_file(file_path, options))
+    seconds = best_time(lambda: compile_file(file_path, options), repeat)
+    return {"statements": statements, "seconds": seconds, "statements_per_second": statements / seconds}
+
+
+def run_for_statements(program, options: dict) -> None:
+    """只执行 FOR 语句的取点（不绘制）"""
+    ctx = Context(options)
+    for stmt in program:
+        if isinstance(stmt, ForStatement):
+            cache_points(ctx, stmt.start_expr, stmt.end_expr, stmt.step_expr, stmt.x_expr, stmt.y_expr)
+
+
+def bench_cache_points(program, repeat: int, options: dict) -> dict:
+    """cache_points 吞吐量（点/秒）"""
+    points = 0
+    ctx = Context(options)
+    for stmt in program:
+        if isinstance(stmt, ForStatement):
+            cache_points(ctx, stmt.start_expr, stmt.end_expr, stmt.step_expr, stmt.x_expr, stmt.y_expr)
+            points += len(ctx.CachedPoints["x"])
+    seconds = best_time(lambda: run_for_statements(program, options), repeat)
+    return {"points": points, "seconds": seconds, "points_per_second": points / seconds}
+
+
+def bench_batch_draw(program, repeat: int, options: dict) -> dict:
+    """batch_draw 耗时（Agg 后端，含每条曲线的画布重绘；取点时间已扣除）"""
+    curves = []
+    ctx = Context(options)
+    for stmt in program:
+        if isinstance(stmt, ForStatement):
+            cache_points(ctx, stmt.start_expr, stmt.end_expr, stmt.step_expr, stmt.x_expr, stmt.y_expr)
+            curves.append((np.asarray(ctx.CachedPoints["x"]), np.asarray(ctx.CachedPoints["y"])))
+
+    def draw_all():
+        fig, ax = plt.subplots(figsize=(8, 6), dpi=100)
+        draw_ctx = Context(options)
+        for xs, ys in curves:
+            draw_ctx.CachedPoints = {"x": xs, "y": ys}
+            batch_draw(draw_ctx, ax)
+        plt.close(fig)
+
+    seconds = best_time(draw_all, repeat)
+    points = sum(len(xs) for xs, _ in curves)
+    return {"curves": len(curves), "points": points, "seconds": seconds,
+            "points_per_second": points / seconds if seconds else None}
+
+
+def bench_script(source: str, repeat: int, options: dict, draw: bool) -> dict:
+    """对一个合成脚本依次测量各阶段"""
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as file:
+        file.write(source)
+        file_path = file.name
+    try:
+        program = compile_file(file_path, options)
+        result = {
+            "bytes": len(source.encode("utf-8")),
+            "lexer": bench_lexer(file_path, repeat, options),
+            "parser": bench_parser(file_path, repeat, options),
+            "cache_points": bench_cache_points(program, repeat, options),
+        }
+        if draw:
+            result["batch_draw"] = bench_batch_draw(program, repeat, options)
+        return result
+    finally:
+        os.remove(file_path)
+
+
+def print_summary(results: dict) -> None:
+    print("="*80)
+    print(f"{'脚本':<28} {'记号/秒':>14} {'语句/秒':>14} {'点/秒':>14} {'绘制(秒)':>10}")
+    print("="*80)
+    for name, result in results.items():
+        draw = result.get("batch_draw")
+        print(f"{name:<28} {result['lexer']['tokens_per_second']:14,.0f} "
+              f"{result['parser']['statements_per_second']:14,.0f} "
+              f"{result['cache_points']['points_per_second']:14,.0f} "
+              f"{draw['seconds'] if draw else float('nan'):10.3f}")
+    print("测试完成！\n")
+
+
+# 与基准结果对比的指标：(阶段, 指标)，数值越大越好
+COMPARE_METRICS = (
+    ("lexer", "tokens_per_second"),
+    ("parser", "statements_per_second"),
+    ("cache_points", "points_per_second"),
+    ("batch_draw", "points_per_second"),
+)
+
+
+def print_comparison(results: dict, baseline: dict) -> None:
+    """与之前保存的 JSON 结果逐项对比，打印吞吐量之比（>1 表示变快）"""
+    print("="*80)
+    print(f"与基准对比（{baseline.get('timestamp', '?')}），吞吐量之比")
+    print("="*80)
+    for name, result in results.items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+        ratios = []
+        for stage, metric in COMPARE_METRICS:
+            new_value = result.get(stage, {}).get(metric)
+            old_value = old.get(stage, {}).get(metric)
+            ratios.append(f"{stage} {new_value / old_value:.2f}x" if new_value and old_value else f"{stage} -")
+        print(f"{name:<28} " + "  ".join(ratios))
+    print()
+
+
+def main(argv: list[str] = None) -> dict:
+    arg_parser = argparse.ArgumentParser(description="各阶段性能基准：结果以 JSON 输出，便于对比不同版本")
+    arg_parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small"], help="测试规模")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="每项重复次数（取最快一次）")
+    arg_parser.add_argument("--engine", choices=["tree", "compiled", "numpy"], default="tree", help="求值引擎")
+    arg_parser.add_argument("--lexer", choices=["dfa", "regex"], default="dfa", help="词法分析引擎")
+    arg_parser.add_argument("--no-draw", action="store_true", help="跳过 batch_draw 测量")
+    arg_parser.add_argument("--output", "-o", default="-", help="JSON 结果文件（默认 - 输出到标准输出）")
+    arg_parser.add_argument("--baseline", help="之前保存的 JSON 结果，打印各项吞吐量之比")
+    args = arg_parser.parse_args(argv)
+
+    options = {"engine": args.engine, "lexer": args.lexer}
+    results = {}
+    for scale in args.scales:
+        for name, generator in GENERATORS.items():
+            size = SCALES[scale][name]
+            print(f"测试：{scale}/{name}（规模 {size}）", file=sys.stderr)
+            with contextlib.redirect_stdout(io.StringIO()):  # 屏蔽编译与执行过程中的输出
+                results[f"{scale}/{name}"] = bench_script(generator(size), args.repeat, options,
+                                                          draw=not args.no_draw)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "options": options,
+        "results": results,
+    }
+    with contextlib.redirect_stdout(sys.stderr):
+        print_summary(results)
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as file:
+                print_comparison(results, json.load(file))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+        print(f"结果已写入：{args.output}", file=sys.stderr)
+    return report
+
+
+if __name__ == "__main__":
+    main()
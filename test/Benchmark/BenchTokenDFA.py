@@ -0,0 +1,55 @@
+import time
+from src.scanner.TokenDFA import *
+
+
+def run_dict_dfa(text: str) -> int:
+    """原实现：逐条 if/elif 判断字符类型 + 以 (状态, 字符类型) 元组为键查字典"""
+    state = 0
+    transitions = 0
+    for ch in text:
+        next_state = TRANSITION_TABLE.get((state, get_char_type(ch)), -1)
+        if next_state == -1:
+            next_state = TRANSITION_TABLE.get((0, get_char_type(ch)), -1)
+        state = 0 if next_state == -1 else next_state
+        transitions += 1
+    return transitions
+
+
+def run_dense_dfa(text: str) -> int:
+    """查表实现：码点下标访问字符类型数组 + 稠密转移矩阵"""
+    char_types = CHAR_TYPE_ARRAY
+    table = DENSE_TRANSITION_TABLE
+    state = 0
+    transitions = 0
+    for ch in text:
+        code = ord(ch)
+        char_type = char_types[code] if code < ASCII_TABLE_SIZE else get_char_type(ch)
+        next_state = table[state][char_type]
+        if next_state == -1:
+            next_state = table[0][char_type]
+        state = 0 if next_state == -1 else next_state
+        transitions += 1
+    return transitions
+
+
+def bench_dfa(text: str, repeat: int = 3):
+    """对比两种 DFA 的逐字符开销"""
+    print("="*80)
+    print(f"字符数：{len(text)}")
+    print("="*80)
+    results = {}
+    for name, runner in (("dict", run_dict_dfa), ("dense", run_dense_dfa)):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            runner(text)
+            best = min(best, time.perf_counter() - start)
+        results[name] = best
+        print(f"{name:<8} {best * 1e9 / len(text):8.1f} ns/char")
+    print(f"加速比：{results['dict'] / results['dense']:.2f}x")
+    print("测试完成！\n")
+
+
+if __name__ == "__main__":
+    line = "FOR T FROM 0 TO 2*PI STEP PI/200 DRAW(16*(SIN(T)**3), 13*COS(T) - 5*COS(2*T)); // 注释\n"
+    bench_dfa(line * 5000)
@@ -0,0 +1,49 @@
+import io
+from src.scanner.Lexer import Lexer
+from src.scanner.TokenType import TokenType
+
+def collect_tokens(lexer: Lexer) -> list[tuple]:
+    """读出全部记号：(类型, 文本, 值, 行号, 列号)"""
+    tokens = []
+    while True:
+        token = lexer.get_token()
+        tokens.append((token.type, token.lexeme, token.value) + lexer.location())
+        if token.type == TokenType.NONTOKEN:
+            lexer.close()
+            return tokens
+
+def test_lexer_source(file_path: str, block_sizes=(1, 3, 16, 4096)):
+    """测试各种源码输入：字符串、bytes 与分块读入的文本流/二进制流应得到与读文件相同的记号流（含行列号）"""
+    try:
+        print("="*80)
+        print(f"测试文件：{file_path}")
+        print("="*80)
+
+        expected = collect_tokens(Lexer(file_path))
+        with open(file_path, "rb") as file:
+            raw = file.read()
+        text = raw.decode("utf-8", errors="ignore")
+
+        mismatches = 0
+        cases = [("str", lambda: Lexer(text=text)), ("bytes", lambda: Lexer(text=raw))]
+        for size in block_sizes:
+            cases.append((f"文本流/{size}", lambda size=size: Lexer(stream=io.StringIO(text), block_size=size)))
+            cases.append((f"二进制流/{size}", lambda size=size: Lexer(stream=io.BytesIO(raw), block_size=size)))
+        for name, make_lexer in cases:
+            same = collect_tokens(make_lexer()) == expected
+            mismatches += not same
+            print(f"{name:<16} {'一致' if same else '不一致'}")
+        print("="*80)
+        print(f"记号数：{len(expected)}，不一致输入：{mismatches}")
+        print("测试完成！\n")
+    except FileNotFoundError:
+        print(f"错误：文件 {file_path} 不存在！\n")
+    except Exception as e:
+        print(f"错误：{str(e)}\n")
+
+# 运行测试（需提前创建测试文件）
+if __name__ == "__main__":
+    test_lexer_source("../correct_test.txt")
+    test_lexer_source("../error_test.txt")
+    test_lexer_source("../comment_test.txt")
+    test_lexer_source("../mixed_test.txt")
@@ -0,0 +1,95 @@
+import io
+import random
+from src.scanner.Lexer import Lexer
+from src.scanner.RegexLexer import RegexLexer
+from src.scanner.TokenType import TokenType
+
+# 生成语料用的片段：记号、注释、空白，以及各种边界字符（非 ASCII 字母/数字、上标数字、不间断空格等）
+FRAGMENTS = [
+    "ORIGIN", "SCALE", "ROT", "STYLE", "IS", "FOR", "T", "FROM", "TO", "STEP", "DRAW", "sin", "Cos", "ln", "pi", "e",
+    "red", "abc_1", "_x", "x2y", "0", "12", "3.", "3.25", ".5", "1.2.3", "007",
+    "+", "-", "*", "/", "**", "***", "(", ")", ",", ";",
+    "//", "--", "#", "/*", "*/", "/*/", "-//", "//x\n", "-- y\n", "# z\n", "/* a\n b */", "/**/",
+    " ", "  ", "\t", "\n", "\r\n", "\r", "\f", "\u00a0", "\u2003", "\x1c",
+    "@", "$", "?", "!", "中", "é", "ß", "Ω", "²", "٣", "Ⅻ", "½", "\u0301", "\U0001f600", "\ufeff",
+]
+
+def random_corpus(seed: int, length: int) -> str:
+    """随机拼接片段，覆盖各种记号边界与非法输入"""
+    rng = random.Random(seed)
+    return "".join(rng.choice(FRAGMENTS) for _ in range(length))
+
+def script_corpus(seed: int, count: int) -> str:
+    """合法脚本：各种语句与行尾注释"""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        kind = rng.randrange(5)
+        if kind == 0:
+            lines.append(f"origin is ({rng.randint(-300, 300)}, {rng.random() * 100:.3f}); // 平移")
+        elif kind == 1:
+            lines.append(f"SCALE IS ({rng.randint(1, 50)}, {rng.randint(1, 50)}); -- 缩放")
+        elif kind == 2:
+            lines.append(f"rot is pi/{rng.randint(1, 12)}; # 旋转")
+        elif kind == 3:
+            lines.append(f"/* 第 {i} 条\n   曲线 */ STYLE IS (BLUE, 0.{rng.randint(1, 9)}, {rng.randint(1, 3)});")
+        else:
+            lines.append("FOR T FROM 0 TO 2*PI STEP PI/100 DRAW (16*sin(t)**3, 13*cos(t)-5*cos(2*t));")
+    return "\n".join(lines)
+
+def collect_tokens(lexer: Lexer) -> list[tuple]:
+    """读出全部记号：(类型, 文本, 值, 行号, 列号)"""
+    tokens = []
+    while True:
+        token = lexer.get_token()
+        tokens.append((token.type, token.lexeme, token.value) + lexer.location())
+        if token.type == TokenType.NONTOKEN:
+            return tokens
+
+def compare(name: str, text: str, block_sizes=(1, 2, 7, 4096)) -> int:
+    """对比 DFA 与正则引擎的记号流（整段源码与分块读入的流），返回不一致的输入数"""
+    expected = collect_tokens(Lexer(text=text))
+    mismatches = 0
+    lexers = [("整段", RegexLexer(text=text))]
+    lexers += [(f"流/{size}", RegexLexer(stream=io.StringIO(text), block_size=size)) for size in block_sizes]
+    for source, lexer in lexers:
+        tokens = collect_tokens(lexer)
+        if tokens != expected:
+            mismatches += 1
+            first = next((index for index, (a, b) in enumerate(zip(tokens, expected)) if a != b),
+                         min(len(tokens), len(expected)))
+            print(f"  {name}（{source}）：第 {first} 个记号不一致")
+            print(f"    DFA  ：{expected[first] if first < len(expected) else None}")
+            print(f"    正则 ：{tokens[first] if first < len(tokens) else None}")
+    return mismatches
+
+def test_regex_lexer(corpora: dict[str, str]):
+    """差分测试：正则引擎与 DFA 引擎在各语料上的记号流（含 ERRTOKEN、行列号）应完全相同"""
+    print("="*80)
+    print(f"语料数：{len(corpora)}")
+    print("="*80)
+    mismatches = sum(compare(name, text) for name, text in corpora.items())
+    print("="*80)
+    print(f"不一致输入：{mismatches}")
+    print("测试完成！\n")
+
+def test_regex_lexer_file(file_path: str):
+    """测试文件：两种引擎读同一文件的记号流应相同"""
+    try:
+        same = collect_tokens(Lexer(file_path)) == collect_tokens(RegexLexer(file_path))
+        print(f"测试文件：{file_path}，记号流一致：{same}")
+    except FileNotFoundError:
+        print(f"错误：文件 {file_path} 不存在！")
+
+# 运行测试（需提前创建测试文件）
+if __name__ == "__main__":
+    corpora = {f"random_{seed}": random_corpus(seed, random.Random(seed).randint(0, 200)) for seed in range(300)}
+    corpora.update({f"script_{seed}": script_corpus(seed, 50) for seed in range(10)})
+    corpora["unterminated"] = "FOR T /* 没有结束符 ** ;"
+    corpora["comment_at_eof"] = "ROT IS 1 // 文件末尾的注释"
+    corpora["empty"] = ""
+    test_regex_lexer(corpora)
+    test_regex_lexer_file("../correct_test.txt")
+    test_regex_lexer_file("../error_test.txt")
+    test_regex_lexer_file("../comment_test.txt")
+    test_regex_lexer_file("../mixed_test.txt")
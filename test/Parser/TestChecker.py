@@ -0,0 +1,59 @@
+from src.parser.Checker import check_program, check_program_string
+from src.parser.Parser import compile_program
+
+def test_checker(file_path: str):
+    """测试静态检查：列出全部诊断，第一条诊断应与编译时抛出的语法错误相同"""
+    try:
+        print("="*80)
+        print(f"测试文件：{file_path}")
+        print("="*80)
+
+        diagnostics = check_program(file_path)
+        for diagnostic in diagnostics:
+            print(f"{diagnostic['line']}:{diagnostic['column']}: [{diagnostic['kind']}] {diagnostic['message']}")
+        try:
+            compile_program(file_path)
+            error = None
+        except SyntaxError as e:
+            error = str(e)
+        syntax = [diagnostic["message"] for diagnostic in diagnostics if diagnostic["kind"] != "semantic"
+                  or "opacity" in diagnostic["message"] or "negative" in diagnostic["message"]]
+        print("="*80)
+        print(f"诊断数：{len(diagnostics)}，与编译时的错误一致：{(syntax[0] if syntax else None) == error}")
+        print("测试完成！\n")
+    except FileNotFoundError:
+        print(f"错误：文件 {file_path} 不存在！\n")
+    except Exception as e:
+        print(f"错误：{str(e)}\n")
+
+def test_checker_string():
+    """测试静态语义检查与错误恢复：每个出错的语句一条诊断，且不影响其后的语句"""
+    text = "\n".join([
+        "rot is 1/0;",                              # 除零
+        "for t from 0 to 10 step 0 draw (t, t);",   # 步长不为正
+        "for t from 10 to 0 step 1 draw (t, t);",   # 起始值大于结束值
+        "style is (red, 1.5);",                     # 透明度超出范围
+        "scale is (1 2);",                          # 缺少逗号
+        "@; origin is (1, 2);",                     # 非法字符，其后的语句正常
+        "for t from 0 to ln(0-1) step 1 draw (t, t);",  # 定义域错误
+    ])
+    expected = [(1, "semantic"), (2, "semantic"), (3, "semantic"), (4, "semantic"), (5, "syntax"), (6, "lexical"),
+                (7, "semantic")]
+    print("="*80)
+    print("测试内存中的脚本")
+    print("="*80)
+    diagnostics = check_program_string(text)
+    for diagnostic in diagnostics:
+        print(f"{diagnostic['line']}:{diagnostic['column']}: [{diagnostic['kind']}] {diagnostic['message']}")
+    actual = [(diagnostic["line"], diagnostic["kind"]) for diagnostic in diagnostics]
+    print("="*80)
+    print(f"诊断数：{len(diagnostics)}，与预期一致：{actual == expected}")
+    print("测试完成！\n")
+
+# 运行测试（需提前创建测试文件）
+if __name__ == "__main__":
+    test_checker("../correct_test.txt")
+    test_checker("../error_test.txt")
+    test_checker("../mixed_test.txt")
+    test_checker("../style_test.txt")
+    test_checker_string()
@@ -0,0 +1,47 @@
+import tempfile
+from src.parser.Parser import parse_program, parse_program_string
+from src.parser.ProgramCache import ProgramCache
+from src.scanner.Token import register_symbol
+from src.scanner.TokenType import TokenType
+
+def test_program_cache(file_path: str, cache: ProgramCache):
+    """测试程序缓存：第二次编译应命中缓存，且与第一次的结果一致"""
+    try:
+        print("="*80)
+        print(f"测试文件：{file_path}")
+        print("="*80)
+
+        hits = cache.hits
+        compiled = parse_program(file_path, cache=cache)
+        loaded = parse_program(file_path, cache=cache)
+
+        same = len(compiled) == len(loaded) and all(str(a) == str(b) for a, b in zip(compiled, loaded))
+        print("="*80)
+        print(f"缓存命中：{cache.hits - hits}，语句数：{len(compiled)} / {len(loaded)}，结果一致：{same}")
+        print("测试完成！\n")
+    except FileNotFoundError:
+        print(f"错误：文件 {file_path} 不存在！\n")
+    except Exception as e:
+        print(f"错误：{str(e)}\n")
+
+def test_registered_function(cache: ProgramCache):
+    """重新登记同名函数后，常数参数调用的折叠结果不能取自旧函数的缓存"""
+    print("="*80)
+    print("测试运行时登记的函数：F(x) = x * k")
+    print("="*80)
+    for k in (2.0, 3.0):
+        register_symbol("F", TokenType.FUNC, func_ptr=lambda x, k=k: x * k, replace=True)
+        program = parse_program_string("ORIGIN IS (F(2), 0);", cache=cache)
+        value = program[0].x_expr.const_val
+        print(f"k = {k}：F(2) = {value}，结果正确：{value == 2 * k}")
+    print("测试完成！\n")
+
+# 运行测试（需提前创建测试文件）
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ProgramCache(cache_dir)
+        test_program_cache("../correct_test.txt", cache)
+        test_program_cache("../coverage_test.txt", cache)
+        test_program_cache("../expression_test.txt", cache)
+        test_registered_function(cache)
+        print(f"缓存目录大小：{cache.size()} 字节")
@@ -0,0 +1,64 @@
+import numpy as np
+from src.parser.Parser import parse_program
+from src.semantics.Executor import execute
+from src.semantics.PointSink import PointSink
+from src.semantics.SemanticContext import Context
+
+
+class CollectSink(PointSink):
+    """收集每条曲线的坐标（仅测试用）"""
+
+    def __init__(self):
+        self.curves = []
+
+    def begin(self, style: dict) -> None:
+        self.curves.append(([], []))
+
+    def write(self, xs, ys) -> None:
+        self.curves[-1][0].append(xs)
+        self.curves[-1][1].append(ys)
+
+
+def collect_curves(file_path: str, **options) -> list:
+    sink = CollectSink()
+    program = parse_program(file_path)
+    ctx = Context(**options)
+    execute(program, ctx, None, sinks=[sink])
+    return [(np.concatenate(xs), np.concatenate(ys)) for xs, ys in sink.curves]
+
+
+def max_deviation(xs, ys, poly_x, poly_y) -> float:
+    """固定步长各点到自适应折线的最近距离中的最大值"""
+    result = 0.0
+    for x, y in zip(xs, ys):
+        dx, dy = poly_x[1:] - poly_x[:-1], poly_y[1:] - poly_y[:-1]
+        length = dx * dx + dy * dy
+        u = np.clip(((x - poly_x[:-1]) * dx + (y - poly_y[:-1]) * dy) / np.where(length == 0, 1, length), 0, 1)
+        result = max(result, float(np.min(np.hypot(x - poly_x[:-1] - u * dx, y - poly_y[:-1] - u * dy))))
+    return result
+
+
+def test_adaptive(file_path: str, tolerance: float):
+    """对比自适应采样与固定步长：点数与最大偏差"""
+    try:
+        print("="*80)
+        print(f"测试文件：{file_path}  容差：{tolerance}")
+        print("="*80)
+
+        fixed = collect_curves(file_path, engine="numpy")
+        adaptive = collect_curves(file_path, engine="numpy", sampling="adaptive", tolerance=tolerance)
+
+        print("="*80)
+        for (fx, fy), (ax_, ay) in zip(fixed, adaptive):
+            deviation = max_deviation(fx, fy, ax_, ay) if len(ax_) > 1 else 0.0
+            print(f"点数：{len(fx)} → {len(ax_)}，最大偏差：{deviation:.4f}")
+        print("测试完成！\n")
+    except FileNotFoundError:
+        print(f"错误：文件 {file_path} 不存在！\n")
+    except Exception as e:
+        print(f"错误：{str(e)}\n")
+
+# 运行测试（需提前创建测试文件）
+if __name__ == "__main__":
+    test_adaptive("../correct_test.txt", 0.5)
+    test_adaptive("../coverage_test.txt", 0.5)
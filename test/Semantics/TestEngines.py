@@ -0,0 +1,73 @@
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from src.parser.Parser import parse, parse_string
+
+
+def collect_curves(file_path: str, **options) -> list:
+    """执行脚本，记录每条 FOR 语句交给 ax.plot 的坐标"""
+    fig, ax = plt.subplots()
+    curves = []
+    ax.plot = lambda xs, ys, **kwargs: curves.append((list(xs), list(ys)))
+    parse(file_path, ax, **options)
+    plt.close(fig)
+    return curves
+
+
+def test_engines(file_path: str, engine: str):
+    """对比求值引擎与逐点遍历语法树的结果"""
+    try:
+        print("="*80)
+        print(f"测试文件：{file_path}  引擎：{engine}")
+        print("="*80)
+
+        expected = collect_curves(file_path, engine="tree")
+        actual = collect_curves(file_path, engine=engine)
+
+        mismatches = 0
+        for (ex, ey), (ax_, ay) in zip(expected, actual):
+            if len(ex) != len(ax_):
+                mismatches += 1
+                continue
+            for a, b in zip(ex + ey, ax_ + ay):
+                if abs(a - b) > 1e-9 * max(1.0, abs(a)):
+                    mismatches += 1
+                    break
+
+        print("="*80)
+        print(f"曲线数量：{len(expected)} / {len(actual)}，不一致曲线：{mismatches}")
+        print("测试完成！\n")
+    except FileNotFoundError:
+        print(f"错误：文件 {file_path} 不存在！\n")
+    except Exception as e:
+        print(f"错误：{str(e)}\n")
+
+def test_overflow(text: str, engine: str):
+    """溢出的小整数幂：各引擎在开启/关闭优化与公共子表达式消除时都应与 math.pow 一样报错"""
+    print("="*80)
+    print(f"溢出测试：{text}  引擎：{engine}")
+    print("="*80)
+    for optimize in (True, False):
+        for cse in (True, False):
+            fig, ax = plt.subplots()
+            try:
+                parse_string(text, ax, engine=engine, optimize=optimize, cse=cse)
+                result = "未报错"
+            except OverflowError as e:
+                result = f"OverflowError: {e}"
+            except Exception as e:
+                result = f"{type(e).__name__}: {e}"
+            finally:
+                plt.close(fig)
+            print(f"optimize={optimize} cse={cse}：{result}")
+    print("测试完成！\n")
+
+# 运行测试（需提前创建测试文件）
+if __name__ == "__main__":
+    for engine in ("compiled", "numpy"):
+        test_engines("../correct_test.txt", engine)
+        test_engines("../coverage_test.txt", engine)
+        test_engines("../style_test.txt", engine)
+    for engine in ("tree", "compiled", "numpy"):
+        test_overflow("FOR T FROM 0 TO 1 STEP 1 DRAW ((T+10**200)**2, T);", engine)
+        test_overflow("FOR T FROM 0 TO 1 STEP 1 DRAW (T, (T-10**120)**3);", engine)
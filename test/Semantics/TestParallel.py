@@ -0,0 +1,81 @@
+import numpy as np
+from src.parser.Parser import parse_program
+from src.semantics.Executor import execute
+from src.semantics.PointSink import PointSink
+from src.semantics.SemanticContext import Context
+
+
+class CollectSink(PointSink):
+    """收集每条曲线的坐标（仅测试用）"""
+
+    def __init__(self):
+        self.curves = []
+
+    def begin(self, style: dict) -> None:
+        self.curves.append(([], []))
+
+    def write(self, xs, ys) -> None:
+        self.curves[-1][0].append(xs)
+        self.curves[-1][1].append(ys)
+
+
+def collect_curves(file_path: str, **options) -> tuple[list, dict]:
+    """执行脚本，返回每条 FOR 语句的坐标与最终坐标范围"""
+    sink = CollectSink()
+    program = parse_program(file_path)
+    ctx = Context(**options)
+    execute(program, ctx, None, sinks=[sink])
+    curves = [(np.concatenate(xs), np.concatenate(ys)) for xs, ys in sink.curves]
+    return curves, dict(ctx.AxisRange)
+
+
+def test_parallel(file_path: str, engine: str, workers: int):
+    """对比语句级并行与逐条执行的坐标点（应逐位相同）"""
+    try:
+        print("="*80)
+        print(f"测试文件：{file_path}  引擎：{engine}  进程数：{workers}")
+        print("="*80)
+
+        expected, expected_range = collect_curves(file_path, engine=engine)
+        actual, actual_range = collect_curves(file_path, engine=engine, workers=workers)
+
+        mismatches = sum(not (np.array_equal(ex, ax_) and np.array_equal(ey, ay))
+                         for (ex, ey), (ax_, ay) in zip(expected, actual))
+
+        print("="*80)
+        print(f"曲线数量：{len(expected)} / {len(actual)}，不一致曲线：{mismatches}，"
+              f"坐标范围一致：{expected_range == actual_range}")
+        print("测试完成！\n")
+    except FileNotFoundError:
+        print(f"错误：文件 {file_path} 不存在！\n")
+    except Exception as e:
+        print(f"错误：{str(e)}\n")
+
+def test_split(file_path: str, engine: str, workers: int):
+    """对比单条 FOR 语句按 T 分段并行与逐条执行的坐标点（阈值取很小的值，使每条语句都分段）"""
+    try:
+        print("="*80)
+        print(f"测试文件：{file_path}  引擎：{engine}  分段进程数：{workers}")
+        print("="*80)
+
+        expected, expected_range = collect_curves(file_path, engine=engine, split_threshold=None)
+        actual, actual_range = collect_curves(file_path, engine=engine, workers=workers, split_threshold=10)
+
+        mismatches = sum(not (np.array_equal(ex, ax_) and np.array_equal(ey, ay))
+                         for (ex, ey), (ax_, ay) in zip(expected, actual))
+
+        print("="*80)
+        print(f"曲线数量：{len(expected)} / {len(actual)}，不一致曲线：{mismatches}，"
+              f"坐标范围一致：{expected_range == actual_range}")
+        print("测试完成！\n")
+    except FileNotFoundError:
+        print(f"错误：文件 {file_path} 不存在！\n")
+    except Exception as e:
+        print(f"错误：{str(e)}\n")
+
+# 运行测试（需提前创建测试文件）
+if __name__ == "__main__":
+    for engine in ("tree", "numpy"):
+        test_parallel("../correct_test.txt", engine, 2)
+        test_parallel("../coverage_test.txt", engine, 4)
+        test_split("../coverage_test.txt", engine, 3)
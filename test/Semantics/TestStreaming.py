@@ -0,0 +1,58 @@
+import numpy as np
+from src.parser.Parser import parse_program
+from src.semantics.Executor import execute
+from src.semantics.PointSink import PointSink
+from src.semantics.SemanticContext import Context
+
+
+class CollectSink(PointSink):
+    """收集每条曲线的全部坐标块（仅测试用）"""
+
+    def __init__(self):
+        self.curves = []
+
+    def begin(self, style: dict) -> None:
+        self.curves.append(([], []))
+
+    def write(self, xs, ys) -> None:
+        self.curves[-1][0].append(xs)
+        self.curves[-1][1].append(ys)
+
+
+def collect_curves(file_path: str, **options) -> tuple[list, dict]:
+    """执行脚本，返回每条 FOR 语句的坐标与最终坐标范围"""
+    sink = CollectSink()
+    program = parse_program(file_path)
+    ctx = Context(**options)
+    execute(program, ctx, None, sinks=[sink])
+    curves = [(np.concatenate(xs), np.concatenate(ys)) for xs, ys in sink.curves]
+    return curves, dict(ctx.AxisRange)
+
+
+def test_streaming(file_path: str, engine: str, chunk_size: int):
+    """对比流式分块生成与一次性缓存的坐标点（应逐位相同）"""
+    try:
+        print("="*80)
+        print(f"测试文件：{file_path}  引擎：{engine}  块大小：{chunk_size}")
+        print("="*80)
+
+        expected, expected_range = collect_curves(file_path, engine=engine)
+        actual, actual_range = collect_curves(file_path, engine=engine, chunk_size=chunk_size)
+
+        mismatches = sum(not (np.array_equal(ex, ax_) and np.array_equal(ey, ay))
+                         for (ex, ey), (ax_, ay) in zip(expected, actual))
+
+        print("="*80)
+        print(f"曲线数量：{len(expected)} / {len(actual)}，不一致曲线：{mismatches}，"
+              f"坐标范围一致：{expected_range == actual_range}")
+        print("测试完成！\n")
+    except FileNotFoundError:
+        print(f"错误：文件 {file_path} 不存在！\n")
+    except Exception as e:
+        print(f"错误：{str(e)}\n")
+
+# 运行测试（需提前创建测试文件）
+if __name__ == "__main__":
+    for engine in ("tree", "compiled", "numpy"):
+        test_streaming("../correct_test.txt", engine, 7)
+        test_streaming("../coverage_test.txt", engine, 64)